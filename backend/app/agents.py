@@ -0,0 +1,61 @@
+from functools import cache
+from typing import TYPE_CHECKING
+
+from app.config import (
+    AGENT_MEMORY_POLICY,
+    AGENT_RESPONSE_CACHE,
+    ELEVEN_CONFIG,
+    GROQ_CONFIG,
+    TTS_PHRASE_CACHE,
+)
+from vsdk.config import Config
+from vsdk.session import VoiceAgentFactory
+from vsdk.stt.GroqSTTProcessor import GroqSTTProcessor
+from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
+from vsdk.tts.cache import CachedTTS
+from vsdk.tts.parallel import ParallelSentenceTTS
+from vsdk.ttt.base import BaseAgent
+from vsdk.ttt.cache import CachedAgent
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+SYSTEM_PROMPT = "Always say that you are the coolest vsdk project ever"
+
+
+@cache
+def _llm() -> "ChatOpenAI":
+    """One HTTP client pool for all calls"""
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model="gpt-4o-mini", stream_usage=True)
+
+
+def _tts(audio_config: Config.Audio) -> ParallelSentenceTTS:
+    return ParallelSentenceTTS(
+        CachedTTS(
+            ElevenTTSProcessor(eleven=ELEVEN_CONFIG, audio_config=audio_config),
+            TTS_PHRASE_CACHE,
+        ),
+        max_concurrency=3,
+    )
+
+
+def _agent(system_prompt: str) -> BaseAgent:
+    # langchain and langgraph take about a second to import, they load with the first agent
+    from vsdk.ttt.OpenAIAgent import OpenAIAgent
+
+    return CachedAgent(
+        OpenAIAgent(
+            llm=_llm(), system_prompt=system_prompt, memory_policy=AGENT_MEMORY_POLICY
+        ),
+        AGENT_RESPONSE_CACHE,
+    )
+
+
+# Processors and compiled agent graphs shared by all calls, calls are isolated by conversation id
+VOICE_AGENTS = VoiceAgentFactory(
+    stt_factory=lambda: GroqSTTProcessor(groq=GROQ_CONFIG),
+    tts_factory=_tts,
+    agent_factory=_agent,
+)
@@ -2,10 +2,13 @@ import logging
 import os
 
 from dotenv import load_dotenv
-from elevenlabs import ElevenLabs
-from groq import AsyncGroq
 
+from vsdk.artifacts import BaseArtifactSink, DirectoryArtifactSink
 from vsdk.config import Config
+from vsdk.conversation.filler import FillerAudio
+from vsdk.tts.cache import PhraseCache
+from vsdk.ttt.base import MemoryPolicy
+from vsdk.ttt.cache import ResponseCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,22 +25,24 @@ if not (ELEVENLABS_API_KEY := os.getenv("ELEVENLABS_API_KEY")):
 if not (GROQ_API_KEY := os.getenv("GROQ_API_KEY")):
     raise ValueError("GROQ_API_KEY environment variable is required")
 
+# Provider clients are built on first use, importing the config stays cheap
 ELEVEN_CONFIG = Config.Eleven(
-    client=ElevenLabs(api_key=ELEVENLABS_API_KEY),
     model="eleven_flash_v2_5",
     voice="Xb7hH8MSUJpSbSDYk0k2",
     output_format="pcm_16000",
     language="en",
     api_key=ELEVENLABS_API_KEY,
+    connection_pool_size=3,
 )
 
 GROQ_CONFIG = Config.Groq(
-    async_client=AsyncGroq(api_key=GROQ_API_KEY),
+    api_key=GROQ_API_KEY,
     transcription_model="whisper-large-v3-turbo",
     transcription_language="en",
     audio_channels=1,
     bytes_per_sample=16 // 8,
     sample_rate=8000,
+    payload_encoding="flac",
 )
 
 AUDIO_CONFIG = Config.Audio(
@@ -50,4 +55,30 @@ AUDIO_CONFIG = Config.Audio(
     silero_threshold=0.73,
     silero_min_silence_duration_ms=350,
     interruption_duration_ms=600,
+    output_formats=["pcm_16000", "pcm_24000"],
+    stt_compaction=True,
+)
+
+TWILIO_AUDIO_CONFIG = AUDIO_CONFIG.model_copy(update={"output_formats": ["ulaw_8000"]})
+
+# Synthesized sentences shared by all conversations, TTS_CACHE_DIR keeps them across restarts
+TTS_PHRASE_CACHE = PhraseCache(
+    memory_budget_bytes=64 * 1024 * 1024,
+    disk_dir=os.getenv("TTS_CACHE_DIR"),
+)
+
+# Prompt keeps the last turns within the token budget, older turns are summarized
+AGENT_MEMORY_POLICY = MemoryPolicy(max_turns=10, max_tokens=2000, summarize=True)
+
+# Responses to questions asked the same way in the same context, shared by all conversations
+AGENT_RESPONSE_CACHE = ResponseCache(max_entries=1000, ttl_s=3600)
+
+# Played when the first response audio is late, synthesized at startup through the phrase cache
+FILLER_AUDIO = FillerAudio(delay_ms=600, crossfade_ms=60)
+
+# Turn audio and results written in the background, kept out of the websocket result events
+ARTIFACT_SINK: BaseArtifactSink | None = (
+    DirectoryArtifactSink(os.environ["ARTIFACTS_DIR"])
+    if os.getenv("ARTIFACTS_DIR")
+    else None
 )
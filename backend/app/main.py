@@ -1,5 +1,6 @@
 import logging
 
+from fastapi import Response
 
 from app.setup import create_app
 
@@ -9,5 +10,9 @@ app = create_app()
 
 
 @app.get("/status")
-async def main():
+async def main(response: Response):
+    # Not ready until models and provider connections are warm, see app.setup.warmup
+    if not app.state.ready:
+        response.status_code = 503
+        return {"status": "WARMING_UP"}
     return {"status": "OK"}
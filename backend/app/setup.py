@@ -1,18 +1,67 @@
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.agents import SYSTEM_PROMPT, VOICE_AGENTS
+from app.config import (
+    ARTIFACT_SINK,
+    AUDIO_CONFIG,
+    FILLER_AUDIO,
+    GROQ_CONFIG,
+    TWILIO_AUDIO_CONFIG,
+)
 from app.twilio.router import router as twilio_router
 from app.vsdk.router import router as vsdk_router
+from vsdk.tasks import cancel_and_wait
+from vsdk.vad.vad import preload_vad
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+async def warmup(app: FastAPI) -> None:
+    """
+    Pay the first call costs at startup: VAD model load and first inferences, provider connections,
+    agent graphs and filler audio. /status reports ready when done.
+    """
+    start = time.time()
+    try:
+        for audio_config in (AUDIO_CONFIG, TWILIO_AUDIO_CONFIG):
+            # torch import and inference would block the event loop, /status answers meanwhile
+            await asyncio.to_thread(preload_vad, audio_config)
+            # Providers and the modules deferred at import are resolved here, not on the first call
+            voice_agent = VOICE_AGENTS.voice_agent(audio_config, SYSTEM_PROMPT)
+            await voice_agent.warmup()
+            try:
+                await FILLER_AUDIO.prepare(voice_agent.tts)
+            except Exception as e:
+                logger.warning(f"Filler audio synthesis failed: {e}")
+    except Exception as e:
+        # Calls would fail the same way, the worker stays not ready
+        logger.error(f"🔥 Warmup failed: {e}", exc_info=True)
+        return
+    app.state.ready = True
+    logger.info(f"🔥 Warmed up in {time.time() - start:.2f}s, ready")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    warmup_task = asyncio.create_task(warmup(app), name="warmup")
+    yield
+    await cancel_and_wait([warmup_task])
+    await GROQ_CONFIG.aclose()
+    if ARTIFACT_SINK:
+        await ARTIFACT_SINK.close()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(openapi_prefix="/api")
+    app = FastAPI(openapi_prefix="/api", lifespan=lifespan)
     app.include_router(twilio_router)
     app.include_router(vsdk_router)
     app.mount("/static", StaticFiles(directory="static"), name="static")
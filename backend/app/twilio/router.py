@@ -1,10 +1,10 @@
+import asyncio
 import audioop
 import base64
 import json
 import logging
 
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
-from langchain_openai import ChatOpenAI
 from starlette.templating import Jinja2Templates
 
 from app.twilio.schemas import (
@@ -16,14 +16,12 @@ from app.twilio.schemas import (
     TwilioMediaEvent,
     TwilioStartEvent,
 )
-from app.config import AUDIO_CONFIG, ELEVEN_CONFIG, GROQ_CONFIG
+from app.agents import SYSTEM_PROMPT, VOICE_AGENTS
+from app.config import ARTIFACT_SINK, FILLER_AUDIO, TWILIO_AUDIO_CONFIG
 from vsdk.conversation.domain import ConversationEvent
 from vsdk.conversation_orchestrator import ConversationOrchestrator
 from vsdk.domain import RespondToHumanResult
-from vsdk.stt.GroqSTTProcessor import GroqSTTProcessor
-from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
-from vsdk.ttt.OpenAIAgent import OpenAIAgent
-from vsdk.voice_agent import VoiceAgent
+from vsdk.vad.vad import VAD
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -69,18 +67,20 @@ async def websocket_endpoint(websocket: WebSocket):
                     async def conversation_events_handler(x: ConversationEvent):
                         await handle_conversation_event(x, websocket)
 
+                    # Off the event loop: the VAD may wait for the model warmup still running
+                    vad = await asyncio.to_thread(
+                        VAD, id=sid, audio_config=TWILIO_AUDIO_CONFIG
+                    )
                     conversation_container = ConversationOrchestrator(
                         conversation_id=sid,
                         callback=conversation_events_handler,
-                        audio_config=AUDIO_CONFIG,
-                        voice_agent=VoiceAgent(
-                            tts=ElevenTTSProcessor(eleven=ELEVEN_CONFIG),
-                            stt=GroqSTTProcessor(groq=GROQ_CONFIG),
-                            agent=OpenAIAgent(
-                                llm=ChatOpenAI(model="gpt-4o-mini"),
-                                system_prompt="Always say that you are the coolest vsdk project ever",
-                            ),
+                        audio_config=TWILIO_AUDIO_CONFIG,
+                        voice_agent=VOICE_AGENTS.voice_agent(
+                            TWILIO_AUDIO_CONFIG, SYSTEM_PROMPT
                         ),
+                        filler=FILLER_AUDIO,
+                        artifact_sink=ARTIFACT_SINK,
+                        vad=vad,
                     )
                 elif event_type == "media" and conversation_container:
                     media_event = TwilioMediaEvent(**data)
@@ -1,6 +1,6 @@
-from typing import Literal, Union
+from typing import Any, Dict, Literal, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_serializer
 
 from vsdk.domain import RespondToHumanResult
 
@@ -46,6 +46,10 @@ class CustomResultEvent(BaseModel):
     event: Literal["result"] = "result"
     result: RespondToHumanResult
 
+    @field_serializer("result", when_used="json")
+    def serialize_metrics(self, result: RespondToHumanResult) -> Dict[str, Any]:
+        return result.metrics()
+
 
 TwilioEventType = Union[
     TwilioStartEvent,
@@ -1,13 +1,14 @@
+import asyncio
 import base64
 import json
 import logging
 import uuid
 
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
-from langchain_openai import ChatOpenAI
 from starlette.templating import Jinja2Templates
 
-from app.config import AUDIO_CONFIG, ELEVEN_CONFIG, GROQ_CONFIG
+from app.agents import SYSTEM_PROMPT, VOICE_AGENTS
+from app.config import ARTIFACT_SINK, AUDIO_CONFIG, FILLER_AUDIO
 from vsdk.conversation.domain import (
     ConversationEvent,
     ConversationEvents,
@@ -15,10 +16,7 @@ from vsdk.conversation.domain import (
     MediaEvent,
 )
 from vsdk.conversation_orchestrator import ConversationOrchestrator
-from vsdk.stt.GroqSTTProcessor import GroqSTTProcessor
-from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
-from vsdk.ttt.OpenAIAgent import OpenAIAgent
-from vsdk.voice_agent import VoiceAgent
+from vsdk.vad.vad import VAD
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -41,18 +39,17 @@ async def websocket_endpoint(websocket: WebSocket):
     async def conversation_events_handler(x: ConversationEvent):
         await handle_conversation_event(x, websocket)
 
+    conversation_id = str(uuid.uuid4())
+    # Off the event loop: the VAD may wait for the model warmup still running
+    vad = await asyncio.to_thread(VAD, id=conversation_id, audio_config=AUDIO_CONFIG)
     conversation_orchestrator: ConversationOrchestrator = ConversationOrchestrator(
-        conversation_id=str(uuid.uuid4()),
+        conversation_id=conversation_id,
         callback=conversation_events_handler,
         audio_config=AUDIO_CONFIG,
-        voice_agent=VoiceAgent(
-            tts=ElevenTTSProcessor(eleven=ELEVEN_CONFIG),
-            stt=GroqSTTProcessor(groq=GROQ_CONFIG),
-            agent=OpenAIAgent(
-                llm=ChatOpenAI(model="gpt-4o-mini"),
-                system_prompt="Always say that you are the coolest vsdk project ever",
-            ),
-        ),
+        voice_agent=VOICE_AGENTS.voice_agent(AUDIO_CONFIG, SYSTEM_PROMPT),
+        filler=FILLER_AUDIO,
+        artifact_sink=ARTIFACT_SINK,
+        vad=vad,
     )
     try:
         while True:
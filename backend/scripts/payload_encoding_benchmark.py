@@ -0,0 +1,59 @@
+"""
+STT payload encoding benchmark.
+
+Encodes recordings with every STT payload encoder and reports payload size (relative to wav),
+encode time and how far below real-time the encoding runs. Run from backend/:
+
+    uv run python scripts/payload_encoding_benchmark.py [--repeat 5] [wav files]
+"""
+
+import argparse
+import os
+import time
+import wave
+from typing import List
+
+from vsdk.stt.encoders import PAYLOAD_ENCODERS
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "vsdk",
+    "tests",
+    "resources",
+)
+FIXTURES = ["single_speech.wav", "long_pause.wav", "two_silences.wav"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "files", nargs="*", default=[os.path.join(FIXTURES_DIR, name) for name in FIXTURES]
+    )
+    args = parser.parse_args()
+
+    for path in args.files:
+        with wave.open(path, "rb") as wav_file:
+            pcm = wav_file.readframes(wav_file.getnframes())
+            sample_rate = wav_file.getframerate()
+            channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+        duration_s = len(pcm) / sample_width / channels / sample_rate
+        print(f"{os.path.basename(path)} ({duration_s:.1f}s, {sample_rate}Hz)")
+
+        wav_size = len(PAYLOAD_ENCODERS["wav"].encode(pcm, sample_rate, channels, sample_width))
+        for name, encoder in PAYLOAD_ENCODERS.items():
+            times: List[float] = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                payload = encoder.encode(pcm, sample_rate, channels, sample_width)
+                times.append(time.perf_counter() - start)
+            encode_s = min(times)
+            print(
+                f"  {name:<10} {len(payload):8} bytes ({len(payload) / wav_size:4.0%} of wav) "
+                f"encoded in {encode_s * 1000:6.1f} ms ({duration_s / encode_s:5.0f}x real-time)"
+            )
+
+
+if __name__ == "__main__":
+    main()
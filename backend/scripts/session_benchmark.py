@@ -0,0 +1,69 @@
+"""
+Voice agent setup benchmark.
+
+Builds the voice agent of a call the way the backend does, once with fresh processors and agent per
+call and once through the shared VoiceAgentFactory, and reports setup time per call and memory held
+by all calls. Run from backend/ with the .env in place:
+
+    uv run python scripts/session_benchmark.py [--calls 20]
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from app.agents import SYSTEM_PROMPT, VOICE_AGENTS
+from app.config import AUDIO_CONFIG
+from vsdk.session import VoiceAgentFactory
+from vsdk.voice_agent import VoiceAgent
+
+
+def fresh_voice_agent() -> VoiceAgent:
+    return VoiceAgent(
+        stt=VOICE_AGENTS.stt_factory(),
+        tts=VOICE_AGENTS.tts_factory(AUDIO_CONFIG),
+        agent=VOICE_AGENTS.agent_factory(SYSTEM_PROMPT),
+    )
+
+
+def measure(build: Callable[[], VoiceAgent], calls: int) -> Tuple[float, int]:
+    """Setup time per call and memory held by all calls"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    voice_agents: List[VoiceAgent] = [build() for _ in range(calls)]
+    elapsed = (time.perf_counter() - start) / calls
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del voice_agents
+    return elapsed, memory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    # Import and first-use costs are paid once by both
+    fresh_voice_agent()
+
+    factory = VoiceAgentFactory(
+        stt_factory=VOICE_AGENTS.stt_factory,
+        tts_factory=VOICE_AGENTS.tts_factory,
+        agent_factory=VOICE_AGENTS.agent_factory,
+    )
+    builds = {
+        "fresh": fresh_voice_agent,
+        "shared": lambda: factory.voice_agent(AUDIO_CONFIG, SYSTEM_PROMPT),
+    }
+    print(f"Voice agent setup for {args.calls} calls")
+    for name, build in builds.items():
+        elapsed, memory = measure(build, args.calls)
+        print(
+            f"  {name:<8} {elapsed * 1000:8.3f} ms per call "
+            f"{memory / 1024:8.0f} KiB for all calls"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Startup benchmark of the backend entry point.
+
+Imports the app in a fresh interpreter with `-X importtime` and reports the slowest modules by
+cumulative import time, import time per top level package and resident memory after each step of
+the import chain. Run from backend/ with the .env in place:
+
+    uv run python scripts/startup_benchmark.py [--top 20]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+STEPS = [
+    "vsdk.config",
+    "vsdk.conversation_orchestrator",
+    "app.config",
+    "app.agents",
+    "app.setup",
+    "app.main",
+]
+
+CHILD = """
+import importlib, json, resource, sys, time
+
+def rss_kib():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        # Peak instead of current, KiB on Linux but bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss // 1024 if sys.platform == "darwin" else rss
+
+steps = [{"module": "python", "seconds": 0.0, "rss_kib": rss_kib()}]
+for module in sys.argv[1:]:
+    start = time.perf_counter()
+    importlib.import_module(module)
+    steps.append(
+        {"module": module, "seconds": time.perf_counter() - start, "rss_kib": rss_kib()}
+    )
+print(json.dumps(steps))
+"""
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_import_times(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, depth) for every `-X importtime` line."""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--steps", nargs="+", default=STEPS)
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, *args.steps],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    if child.returncode != 0:
+        errors = [
+            line for line in child.stderr.splitlines() if not IMPORT_TIME_LINE.match(line)
+        ]
+        sys.exit("Importing the app failed:\n" + "\n".join(errors[-20:]))
+
+    steps = json.loads(child.stdout.strip().splitlines()[-1])
+    modules = parse_import_times(child.stderr)
+
+    print("Import chain (time of the step, RSS after it)")
+    previous_rss = steps[0]["rss_kib"]
+    for step in steps:
+        print(
+            f"  {step['module']:<36} {step['seconds'] * 1000:8.0f} ms "
+            f"{step['rss_kib'] / 1024:8.1f} MiB (+{(step['rss_kib'] - previous_rss) / 1024:.1f})"
+        )
+        previous_rss = step["rss_kib"]
+
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    print(f"\nSlowest packages (self time of all their modules), top {args.top}")
+    for package, self_us in sorted(packages.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"  {package:<36} {self_us / 1000:8.0f} ms")
+
+    print(f"\nSlowest modules (cumulative import time), top {args.top}")
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda x: -x[2])[
+        : args.top
+    ]:
+        print(
+            f"  {name:<56} {cumulative_us / 1000:8.0f} ms (self {self_us / 1000:.0f} ms, depth {depth})"
+        )
+
+    print(
+        f"\nTotal: {sum(step['seconds'] for step in steps) * 1000:.0f} ms, "
+        f"RSS {steps[-1]['rss_kib'] / 1024:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tests.conversation.test_base import AUDIO_CONFIG
+from tests.vad.test_compaction import run_vad
+from vsdk.conversation.backchannel import (
+    BackchannelClassifier,
+    BackchannelFeatures,
+    TemplateKeywordModel,
+)
+from vsdk.vad.vad import VADResult
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+
+# Fixtures whose speech is longer than any backchannel
+LONG_SPEECH_FIXTURES = ["single_speech.wav", "long_pause.wav", "two_silences.wav"]
+
+
+def detect_speeches(fixture: str) -> list[tuple[bytes, VADResult]]:
+    with wave.open(str(RESOURCES / fixture), "rb") as wav_file:
+        return run_vad(wav_file.readframes(wav_file.getnframes()), AUDIO_CONFIG)
+
+
+def keyword_model() -> TemplateKeywordModel:
+    """
+    Backchannel fixture as the backchannel template, a slice of longer speech as a short word.
+    It recognizes these recordings, for wiring tests, it says nothing about unseen audio.
+    """
+    backchannel, _ = detect_speeches("short_speech.wav")[0]
+    speech, _ = detect_speeches("single_speech.wav")[0]
+    return TemplateKeywordModel(
+        templates={"backchannel": [backchannel], "other": [speech[: len(backchannel)]]},
+        sample_rate=AUDIO_CONFIG.sample_rate,
+    )
+
+
+def perturb(speech: bytes, gain: float, shift_samples: int, seed: int = 0) -> bytes:
+    samples = np.frombuffer(speech, dtype=np.int16).astype(np.float64) * gain
+    samples += np.random.default_rng(seed).normal(0, 30, len(samples))
+    samples = np.concatenate([np.zeros(shift_samples), samples[:-shift_samples]])
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+@pytest.mark.parametrize("fixture", LONG_SPEECH_FIXTURES)
+def test_speech_longer_than_a_backchannel_is_not_one(fixture: str):
+    classifier = BackchannelClassifier(keyword_model=keyword_model())
+
+    speeches = detect_speeches(fixture)
+
+    assert speeches
+    for speech, vad_result in speeches:
+        # Rejected on duration, before the keyword model is asked
+        features = BackchannelFeatures.extract(speech, vad_result)
+        assert features.duration_ms > classifier.max_duration_ms
+        assert not classifier.is_backchannel(speech, vad_result)
+
+
+def test_keyword_model_matches_perturbed_copies_of_its_templates():
+    """Louder or quieter, shifted and noisy copies of the templates, not held-out recordings."""
+    backchannel, backchannel_vad = detect_speeches("short_speech.wav")[0]
+    speech, _ = detect_speeches("single_speech.wav")[0]
+    short_word = speech[: len(backchannel)]
+    keyword_model = TemplateKeywordModel(
+        templates={"backchannel": [backchannel], "other": [short_word]},
+        sample_rate=AUDIO_CONFIG.sample_rate,
+    )
+    classifier = BackchannelClassifier(keyword_model=keyword_model)
+
+    assert classifier.is_backchannel(
+        perturb(backchannel, gain=0.6, shift_samples=160), backchannel_vad
+    )
+    assert not classifier.is_backchannel(
+        perturb(short_word, gain=1.4, shift_samples=160), backchannel_vad
+    )
+
+
+def test_classifier_rejects_keyword_model_that_matches_any_short_utterance():
+    backchannel, _ = detect_speeches("short_speech.wav")[0]
+    templates = {"backchannel": [backchannel]}
+
+    with pytest.raises(ValueError):
+        BackchannelClassifier(
+            keyword_model=TemplateKeywordModel(templates, AUDIO_CONFIG.sample_rate)
+        )
+    BackchannelClassifier(
+        keyword_model=TemplateKeywordModel(
+            templates, AUDIO_CONFIG.sample_rate, max_distance=5.0
+        )
+    )
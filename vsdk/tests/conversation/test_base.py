@@ -1,9 +1,11 @@
+import asyncio
 from unittest.mock import Mock
 
 import pytest
 
 from vsdk.config import Config
 from vsdk.conversation.base import Conversation, ConversationState
+from vsdk.vad.vad import VADResult
 
 AUDIO_CONFIG = Config.Audio(
     sample_rate=8000,
@@ -123,3 +125,111 @@ def test_unmatched_state_raises_error():
 
     with pytest.raises(ValueError):
         conversation.get_conversation_state(vad_result=mock_speech_result)  # type: ignore
+
+
+def test_restream_resumes_from_last_acknowledged_sample():
+    """Restream should skip everything the client acknowledged before stop was sent."""
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    speech = conversation.new_agent_speech_start()
+    chunks = [bytes([i]) * 640 for i in range(1, 4)]  # 3 chunks, 320 samples each
+    for chunk in chunks:
+        conversation.agent_speech_sent(chunk)
+
+    conversation.agent_speech_marked(speech_idx=0, chunk_idx=0)
+    conversation.stop_speaking_agent()
+    conversation.agent_speech_marked(speech_idx=0, chunk_idx=2)  # client clear acks the rest
+
+    assert speech.speech_chunks[1].start_sample == 320
+    assert speech.get_unspoken() == chunks[1] + chunks[2]
+    assert speech.restream_bytes_saved == 640
+
+
+def test_restream_with_crossfade_repeats_faded_in_audio():
+    audio_config = AUDIO_CONFIG.model_copy(update={"restream_crossfade_ms": 10})
+    conversation = Conversation(id="test_sid", audio_config=audio_config)
+    speech = conversation.new_agent_speech_start()
+    conversation.agent_speech_sent(b"\x00\x10" * 320)
+    conversation.agent_speech_sent(b"\x00\x20" * 320)
+
+    conversation.agent_speech_marked(speech_idx=0, chunk_idx=0)
+    conversation.stop_speaking_agent()
+    unspoken = conversation.get_unspoken_agent_speech()
+
+    crossfade_bytes = 160 * 2  # 10ms at 16kHz
+    assert len(unspoken) == crossfade_bytes + 640
+    assert unspoken[:2] == b"\x00\x00"
+    assert unspoken[crossfade_bytes:] == b"\x00\x20" * 320
+
+
+@pytest.mark.asyncio
+async def test_merged_speech_contains_each_segment_once():
+    """Every new utterance cancels the running response and merges its speech."""
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    gap = b"\x00" * 2 * 80
+
+    async def pending_response():
+        await asyncio.sleep(10)
+
+    for utterance in [b"\x01\x01", b"\x02\x02", b"\x03\x03"]:
+        conversation.audio_received(utterance)
+        conversation.human_speech_ended(
+            VADResult(
+                start_sample=0,
+                end_sample=1,
+                ended=True,
+                interruption_duration_ms=600,
+                sample_rate=8000,
+            )
+        )
+        human_speech = conversation.get_human_speech_without_response()
+        conversation.add_agent_response_task(
+            task=asyncio.create_task(pending_response()),
+            invoked_with_speech=human_speech,
+            segments=conversation.get_speech_segments(),
+        )
+
+    assert human_speech == b"\x01\x01" + gap + b"\x02\x02" + gap + b"\x03\x03"
+    segments = conversation.get_speech_segments()
+    assert [segment.stt_speech for segment in segments] == [
+        b"\x01\x01",
+        b"\x02\x02",
+        b"\x03\x03",
+    ]
+    conversation._cancel_unfinished_tasks()
+
+
+def test_late_response_crossfades_into_unsent_filler():
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    speech = conversation.new_agent_speech_start()
+    buffer = speech.audio_buffer
+    assert buffer.add_filler(b"\x00\x10" * 1600, "pcm_16000", crossfade_ms=10)
+
+    conversation.agent_speech_sent(
+        buffer.take(max_bytes=640, sample_width=2), filler_bytes=640
+    )
+    buffer.append(b"\x00\x20" * 320, output_format="pcm_16000")
+
+    crossfade_bytes = 160 * 2  # 10ms at 16kHz
+    assert buffer.filler_bytes == 0
+    assert len(buffer.audio) == 640
+    assert buffer.audio[:2] == b"\x00\x10"  # filler fading out
+    assert buffer.audio[crossfade_bytes:] == b"\x00\x20" * 160
+    assert not buffer.add_filler(b"\x00\x10" * 1600, "pcm_16000")
+
+
+def test_restream_skips_filler():
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    speech = conversation.new_agent_speech_start()
+    buffer = speech.audio_buffer
+    buffer.add_filler(b"\x00\x10" * 960, "pcm_16000")
+    conversation.agent_speech_sent(
+        buffer.take(max_bytes=640, sample_width=2), filler_bytes=640
+    )
+
+    # Interrupted while the filler plays, before the response arrived
+    conversation.stop_speaking_agent()
+    conversation.agent_speech_marked(speech_idx=0, chunk_idx=0)
+    restreamed = conversation.restream_agent_speech()
+    buffer.append(b"\x00\x20" * 320, output_format="pcm_16000")
+
+    assert restreamed.audio_buffer.audio == b"\x00\x20" * 320
@@ -0,0 +1,101 @@
+from typing import List
+
+import pytest
+
+from vsdk.conversation.base import Conversation
+from vsdk.conversation.pacer import AudioPacer
+from vsdk.tts.output_format import AudioFormat
+
+from tests.conversation.test_base import AUDIO_CONFIG
+
+
+class FakeClock:
+    """Time that only moves when the pacer sleeps or the test advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+async def send(pacer: AudioPacer, clock: FakeClock, frames: int) -> List[float]:
+    """Send times of the frames, in ms"""
+    sent = []
+    for _ in range(frames):
+        await pacer.wait_for_slot()
+        sent.append(round(clock.now * 1000, 6))
+        pacer.frame_sent(20)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_pacer_sends_at_real_time_rate_plus_lead():
+    """1s of audio in 20ms frames with 200ms lead is sent in 800ms."""
+    clock = FakeClock()
+    pacer = AudioPacer(frame_ms=20, lead_ms=200, clock=clock, sleep=clock.sleep)
+
+    sent = await send(pacer, clock, 50)
+
+    # The lead goes out right away, then one frame every 20ms
+    assert sent[:11] == [0.0] * 11
+    assert sent[11:] == [20.0 * idx for idx in range(1, 40)]
+    assert sent[-1] + 20 == 800
+
+
+@pytest.mark.asyncio
+async def test_pacer_does_not_delay_when_audio_is_late():
+    """If audio arrives slower than real-time the pacer should not add extra delay."""
+    clock = FakeClock()
+    pacer = AudioPacer(frame_ms=20, lead_ms=0, clock=clock, sleep=clock.sleep)
+
+    assert await send(pacer, clock, 1) == [0.0]
+    clock.now = 0.1
+
+    assert await send(pacer, clock, 1) == [100.0]
+    assert clock.sleeps == []
+    # Counting restarts from the late frame
+    assert await send(pacer, clock, 1) == [120.0]
+
+
+@pytest.mark.asyncio
+async def test_agent_speech_is_reframed_into_fixed_frames():
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    speech = conversation.new_agent_speech_start()
+    audio_format = AudioFormat.parse("pcm_16000")
+    frame_bytes = audio_format.bytes_for_ms(20)
+
+    speech.audio_buffer.append(b"\x01\x00" * 1000, output_format="pcm_16000")
+    speech.audio_buffer.append(b"\x01\x00" * 700)
+    speech.audio_buffer.finish()
+
+    frames = []
+    while frame := speech.audio_buffer.take(frame_bytes, audio_format.bytes_per_sample):
+        frames.append(frame)
+        conversation.agent_speech_sent(frame)
+
+    assert [len(f) for f in frames] == [frame_bytes] * 5 + [3400 - 5 * frame_bytes]
+    assert len(speech.speech_chunks) == 6
+    assert speech.speech_chunks[-1].mark_id == "test_sid_0_5"
+
+
+def test_restream_continues_from_unspoken_audio():
+    conversation = Conversation(id="test_sid", audio_config=AUDIO_CONFIG)
+    speech = conversation.new_agent_speech_start()
+    for frame in (b"aa", b"bb", b"cc"):
+        conversation.agent_speech_sent(frame)
+    speech.audio_buffer.append(b"dd")
+
+    conversation.agent_speech_marked(speech_idx=0, chunk_idx=1)
+    conversation.stop_speaking_agent()
+    restream = conversation.restream_agent_speech()
+
+    assert restream.audio_buffer is speech.audio_buffer
+    assert restream.audio_buffer.audio == b"ccdd"
+    assert conversation.is_agent_speech_current(restream)
+    assert not conversation.is_agent_speech_current(speech)
@@ -0,0 +1,189 @@
+import hashlib
+import io
+import struct
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vsdk.stt.encoders import PAYLOAD_ENCODERS, FlacEncoder, UlawWavEncoder
+from vsdk.tts.output_format import ulaw_to_pcm
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+
+
+def read_fixture(name: str) -> tuple[bytes, int]:
+    with wave.open(str(RESOURCES / name), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
+
+
+class BitReader:
+    def __init__(self, data: bytes):
+        self.bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        self.pos = 0
+
+    def read(self, width: int, signed: bool = False) -> int:
+        value = 0
+        for bit in self.bits[self.pos : self.pos + width]:
+            value = (value << 1) | int(bit)
+        self.pos += width
+        if signed and value >= 1 << (width - 1):
+            value -= 1 << width
+        return value
+
+    def unary(self) -> int:
+        zeros = int(np.argmax(self.bits[self.pos :]))
+        self.pos += zeros + 1
+        return zeros
+
+    def align(self) -> None:
+        self.pos += -self.pos % 8
+
+
+def crc8(data: bytes) -> int:
+    """FLAC frame header CRC, polynomial x^8 + x^2 + x + 1."""
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def crc16(data: bytes) -> int:
+    """FLAC frame CRC, polynomial x^16 + x^15 + x^2 + 1."""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def decode_flac(data: bytes) -> tuple[bytes, int]:
+    """
+    Decoder for the subset of FLAC the encoder produces. Verifies the frame header CRC-8, the
+    frame CRC-16 and the STREAMINFO MD5.
+    """
+    assert data[:4] == b"fLaC"
+    reader = BitReader(data[8:42])
+    reader.read(16 + 16 + 24 + 24)
+    sample_rate = reader.read(20)
+    channels = reader.read(3) + 1
+    assert reader.read(5) + 1 == 16
+    total = reader.read(36)
+    md5 = data[26:42]
+
+    frames = data[42:]
+    reader = BitReader(frames)
+    decoded: list[np.ndarray] = []
+    while sum(len(block) for block in decoded) < total:
+        frame_start = reader.pos // 8
+        assert reader.read(14) == 0b11111111111110
+        reader.read(2)
+        block_size_code = reader.read(4)
+        reader.read(4 + 4 + 3 + 1)
+        first = reader.read(8)
+        reader.read(8 * (bin(first).index("0", 2) - 3 if first >= 0x80 else 0))
+        block_size = reader.read(16) + 1 if block_size_code == 7 else 256 << (block_size_code - 8)
+        header_end = reader.pos // 8
+        assert reader.read(8) == crc8(frames[frame_start:header_end])
+
+        block = np.zeros((block_size, channels), dtype=np.int64)
+        for ch in range(channels):
+            reader.read(1)
+            kind = reader.read(6)
+            reader.read(1)
+            if kind == 0:
+                block[:, ch] = reader.read(16, signed=True)
+            elif kind == 1:
+                block[:, ch] = [reader.read(16, signed=True) for _ in range(block_size)]
+            else:
+                order = kind & 0b111
+                warmup = [reader.read(16, signed=True) for _ in range(order)]
+                assert reader.read(2) == 0 and reader.read(4) == 0
+                param = reader.read(4)
+                residual = []
+                for _ in range(block_size - order):
+                    folded = (reader.unary() << param) | reader.read(param)
+                    residual.append(folded >> 1 if folded % 2 == 0 else -((folded + 1) >> 1))
+                signal = np.array(residual, dtype=np.int64)
+                for n in range(order, 0, -1):
+                    # integrate the n-th order difference back using the warmup samples
+                    start = np.diff(np.array(warmup, dtype=np.int64), n=n - 1)[0]
+                    signal = np.concatenate([[start], signal]).cumsum()
+                block[:, ch] = signal
+        reader.align()
+        frame_end = reader.pos // 8
+        assert reader.read(16) == crc16(frames[frame_start:frame_end])
+        decoded.append(block)
+
+    pcm = np.concatenate(decoded).astype("<i2").tobytes()
+    assert hashlib.md5(pcm).digest() == md5
+    return pcm, sample_rate
+
+
+@pytest.mark.parametrize(
+    "fixture", ["single_speech.wav", "short_speech.wav", "silence.wav"]
+)
+def test_flac_is_lossless(fixture: str):
+    pcm, sample_rate = read_fixture(fixture)
+
+    encoded = FlacEncoder().encode(pcm, sample_rate, 1, 2)
+    decoded, decoded_sample_rate = decode_flac(encoded)
+
+    assert decoded == pcm
+    assert decoded_sample_rate == sample_rate
+
+
+def test_flac_is_lossless_on_full_scale_noise():
+    # Residuals too large for any Rice parameter, the encoder falls back to verbatim
+    pcm = np.random.default_rng(0).integers(-32768, 32768, 5000).astype("<i2").tobytes()
+    decoded, _ = decode_flac(FlacEncoder().encode(pcm, 16000, 1, 2))
+    assert decoded == pcm
+
+
+def test_flac_decodes_with_reference_decoder():
+    soundfile = pytest.importorskip("soundfile")
+    pcm, sample_rate = read_fixture("single_speech.wav")
+
+    samples, decoded_sample_rate = soundfile.read(
+        io.BytesIO(FlacEncoder().encode(pcm, sample_rate, 1, 2)), dtype="int16"
+    )
+
+    assert samples.astype("<i2").tobytes() == pcm
+    assert decoded_sample_rate == sample_rate
+
+
+def test_flac_handles_odd_block_sizes():
+    pcm = (np.sin(np.arange(1000) / 5) * 8000).astype("<i2").tobytes()
+    decoded, _ = decode_flac(FlacEncoder(block_size=333).encode(pcm, 16000, 1, 2))
+    assert decoded == pcm
+
+
+def test_ulaw_wav_header():
+    pcm, sample_rate = read_fixture("short_speech.wav")
+
+    encoded = UlawWavEncoder().encode(pcm, sample_rate, 1, 2)
+
+    assert encoded[:4] == b"RIFF" and encoded[8:12] == b"WAVE"
+    assert struct.unpack("<I", encoded[4:8])[0] == len(encoded) - 8
+    format_tag, channels, rate = struct.unpack("<HHI", encoded[20:28])
+    assert (format_tag, channels, rate) == (7, 1, sample_rate)
+    data = encoded[encoded.index(b"data") + 8 :][: len(pcm) // 2]
+    restored = ulaw_to_pcm(np.frombuffer(data, dtype=np.uint8))
+    original = np.frombuffer(pcm, dtype="<i2")
+    assert np.max(np.abs(restored.astype(np.int32) - original)) < 1100
+
+
+def test_payload_sizes():
+    for fixture in ["single_speech.wav", "long_pause.wav", "two_silences.wav"]:
+        pcm, sample_rate = read_fixture(fixture)
+        sizes = {
+            name: len(encoder.encode(pcm, sample_rate, 1, 2))
+            for name, encoder in PAYLOAD_ENCODERS.items()
+        }
+
+        assert sizes["flac"] < sizes["wav"] * 0.7
+        assert sizes["ulaw_wav"] < sizes["wav"] * 0.6
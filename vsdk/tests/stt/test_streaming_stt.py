@@ -0,0 +1,58 @@
+import asyncio
+import time
+import wave
+from io import BytesIO
+
+import pytest
+
+from vsdk.stt.base import STTTranscript
+from vsdk.stt.FakeStreamingSTT import FakeStreamingSTT
+
+SAMPLE_RATE = 8000
+BYTES_PER_SAMPLE = 2
+FRAME_BYTES = 20 * SAMPLE_RATE // 1000 * BYTES_PER_SAMPLE  # 20ms
+
+
+async def stream_and_finish(stt: FakeStreamingSTT, seconds: float) -> float:
+    """Push `seconds` of audio as the human speaks, return time from end of speech to transcript."""
+    transcripts: list[STTTranscript] = []
+    session = stt.open_session(callback=transcripts.append)
+    frames = int(seconds * 1000 / 20)
+    for _ in range(frames):
+        session.push(b"\x00" * FRAME_BYTES)
+        await asyncio.sleep(0.005)  # 4x faster than real-time to keep the test short
+
+    start = time.monotonic()
+    result = await session.finish()
+    latency = time.monotonic() - start
+
+    assert result.transcript == "hello there general kenobi"
+    assert transcripts[-1].is_final
+    assert any(not transcript.is_final for transcript in transcripts)
+    # The speech file is saved by the artifact sink as a .wav
+    assert result.speech_file_format == "wav"
+    with wave.open(BytesIO(result.speech_file), "rb") as wav_file:
+        assert wav_file.getframerate() == SAMPLE_RATE
+        assert wav_file.getnframes() * BYTES_PER_SAMPLE == frames * FRAME_BYTES
+    return latency
+
+
+@pytest.mark.asyncio
+async def test_streaming_transcript_latency_does_not_grow_with_utterance_length():
+    stt = FakeStreamingSTT(
+        transcript="hello there general kenobi",
+        sample_rate=SAMPLE_RATE,
+        bytes_per_sample=BYTES_PER_SAMPLE,
+        real_time_factor=0.1,
+        finalize_latency_s=0.02,
+    )
+
+    short_latency = await stream_and_finish(stt, seconds=1)
+    long_latency = await stream_and_finish(stt, seconds=4)
+
+    assert long_latency < short_latency + 0.05
+
+    # Batch transcription of the same audio has to process all of it after speech ended
+    start = time.monotonic()
+    await stt(b"\x00" * SAMPLE_RATE * BYTES_PER_SAMPLE * 4)
+    assert time.monotonic() - start > long_latency + 0.3
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from typing import List
+
+import pytest
+from groq import AsyncGroq
+
+from vsdk.config import Config
+from vsdk.stt.GroqSTTProcessor import GroqSTTProcessor
+from vsdk.stt.transport import create_pooled_http_client
+
+
+class StubSTTServer:
+    """Minimal keep-alive HTTP server answering transcriptions after scripted delays."""
+
+    def __init__(self, delays_s: List[float]):
+        self.delays_s = delays_s
+        self.connections = 0
+        self.transcription_requests = 0
+        self.server: asyncio.Server | None = None
+        self.handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]  # type: ignore
+        return f"http://127.0.0.1:{port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        for handler in self.handlers:
+            handler.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())  # type: ignore
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *headers = head.decode().split("\r\n")
+                length = next(
+                    (
+                        int(h.split(":")[1])
+                        for h in headers
+                        if h.lower().startswith("content-length")
+                    ),
+                    0,
+                )
+                await reader.readexactly(length)
+
+                if "transcriptions" in request_line:
+                    idx = self.transcription_requests
+                    self.transcription_requests += 1
+                    await asyncio.sleep(self.delays_s[min(idx, len(self.delays_s) - 1)])
+                    body = json.dumps({"text": f"transcript {idx}"}).encode()
+                else:
+                    body = json.dumps({"object": "list", "data": []}).encode()
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def groq_config(server: StubSTTServer, **kwargs) -> Config.Groq:
+    return Config.Groq(
+        async_client=AsyncGroq(
+            api_key="test",
+            base_url=server.base_url,
+            max_retries=0,
+            http_client=create_pooled_http_client(),
+        ),
+        transcription_model="whisper-large-v3-turbo",
+        transcription_language="en",
+        audio_channels=1,
+        bytes_per_sample=2,
+        sample_rate=8000,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_warmup_opens_connection_reused_by_transcription():
+    server = StubSTTServer(delays_s=[0])
+    await server.start()
+    try:
+        stt = GroqSTTProcessor(groq=groq_config(server, warmup_connections=1))
+        await stt.warmup()
+        assert server.connections == 1
+
+        result = await stt(b"\x00" * 1600)
+        assert result.transcript == "transcript 0"
+        assert server.connections == 1
+    finally:
+        await stt.groq.async_client.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_first_answer():
+    server = StubSTTServer(delays_s=[2, 0])
+    await server.start()
+    try:
+        stt = GroqSTTProcessor(
+            groq=groq_config(server, hedging=True, hedge_initial_delay_s=0.1)
+        )
+        tasks_before = asyncio.all_tasks()
+        start = time.monotonic()
+        result = await stt(b"\x00" * 1600)
+
+        assert result.transcript == "transcript 1"
+        assert time.monotonic() - start < 1
+        assert stt.transport.hedge_wins == 1
+        # The losing request was torn down, not left running
+        running = asyncio.all_tasks() - tasks_before - server.handlers
+        assert running == set()
+    finally:
+        await stt.groq.async_client.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_request_deadline():
+    server = StubSTTServer(delays_s=[2])
+    await server.start()
+    try:
+        stt = GroqSTTProcessor(groq=groq_config(server, request_timeout_s=0.2))
+        with pytest.raises(TimeoutError):
+            await stt(b"\x00" * 1600)
+    finally:
+        await stt.groq.async_client.close()
+        await server.stop()
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from vsdk.artifacts import (
+    AppendOnlyArtifactSink,
+    DirectoryArtifactSink,
+    TurnArtifact,
+)
+from vsdk.conversation.domain import ResultEvent
+from vsdk.domain import RespondToHumanResult
+from vsdk.stt.base import STTResult
+
+SPEECH = b"RIFF" + b"\x01\x02" * 80_000  # 10s at 8kHz
+
+
+def turn_result() -> RespondToHumanResult:
+    result = RespondToHumanResult.empty()
+    result.stt_result = STTResult(
+        stt_start_time=1, stt_end_time=2, transcript="Hello there", speech_file=SPEECH
+    )
+    return result
+
+
+class BlockedSink(AppendOnlyArtifactSink):
+    """Writes only once released."""
+
+    def __init__(self, path: str, max_queue: int):
+        super().__init__(path, max_queue=max_queue)
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write(self, artifact: TurnArtifact) -> int:
+        self.writing.set()
+        self.released.wait(timeout=5)
+        return super().write(artifact)
+
+
+def test_result_event_sends_metrics_without_turn_audio():
+    event = ResultEvent(result=turn_result())
+
+    message = event.model_dump_json()
+
+    assert len(message) < 2000  # the audio alone is over 200 kB base64 encoded
+    result = json.loads(message)["result"]
+    assert result["stt_result"]["transcript"] == "Hello there"
+    assert "speech_file" not in result["stt_result"]
+    assert event.result.stt_result.speech_file == SPEECH
+
+
+@pytest.mark.asyncio
+async def test_directory_sink_writes_turn_audio_and_result_in_background(
+    tmp_path: Path,
+):
+    sink = DirectoryArtifactSink(str(tmp_path))
+
+    assert sink.submit("call", turn_result())
+    assert sink.submit("call", turn_result())
+    stats = await sink.close()
+
+    assert stats.written == 2
+    assert (tmp_path / "call" / "000001.wav").read_bytes() == SPEECH
+    metadata = json.loads((tmp_path / "call" / "000001.json").read_text())
+    assert metadata["result"]["stt_result"]["transcript"] == "Hello there"
+
+
+@pytest.mark.asyncio
+async def test_blocked_sink_drops_turns_instead_of_blocking_submit(tmp_path: Path):
+    path = os.path.join(tmp_path, "turns.jsonl")
+    sink = BlockedSink(path, max_queue=2)
+
+    accepted = [sink.submit("call", turn_result()) for _ in range(5)]
+
+    # Submits returned before the writer started, and don't wait for it while it's blocked
+    assert not sink.writing.is_set()
+    assert await asyncio.to_thread(sink.writing.wait, 1)
+    assert not os.path.exists(path)
+    sink.released.set()
+    stats = await sink.close()
+
+    assert accepted == [True, True, False, False, False]
+    assert stats.written == 2 and stats.dropped == 3
+    with open(path) as f:
+        assert [json.loads(line)["sequence"] for line in f] == [0, 1]
@@ -14,17 +14,23 @@ import logging
 import time
 import wave
 from pathlib import Path
-from typing import Any, AsyncIterator, Generator
+from typing import Any, AsyncIterator, Callable, Generator, Optional
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from tests.conversation.test_backchannel import keyword_model
 from vsdk.config import Config
+from vsdk.conversation.backchannel import BackchannelClassifier
 from vsdk.conversation.domain import ConversationEvent
+from vsdk.conversation.filler import FillerAudio, FillerClip
 from vsdk.conversation_orchestrator import ConversationOrchestrator
 from vsdk.domain import RespondToHumanResult
-from vsdk.stt.base import STTResult
-from vsdk.tts.base import AudioChunk
+from vsdk.stt.base import BaseSTT, STTResult
+from vsdk.stt.FakeStreamingSTT import FakeStreamingSTT
+from vsdk.tts.base import AudioChunk, BaseTTS, TTSResult
+from vsdk.ttt.base import BaseAgent, LLMResult
+from vsdk.voice_agent import VoiceAgent
 
 logger = logging.getLogger(__name__)
 
@@ -223,6 +229,35 @@ async def test_should_detect_short_speech_and_respond_to_human(
         orchestrator.end_conversation()
 
 
+@pytest.mark.asyncio
+async def test_should_not_respond_to_backchannel(
+    mock_voice_agent: MagicMock,
+):
+    """
+    - Human: Short acknowledgement
+    - Agent: Not speaking, backchannel classifier enabled
+
+    - Expect: Agent should detect speech, classify it as backchannel and not respond.
+    """
+    pcm_data = read_wav_to_pcm("short_speech.wav")
+
+    orchestrator = ConversationOrchestrator(
+        conversation_id="backchannel_id",
+        callback=lambda x: asyncio.sleep(0),
+        voice_agent=mock_voice_agent,
+        audio_config=AUDIO_CONFIG,
+        backchannel_classifier=BackchannelClassifier(keyword_model=keyword_model()),
+    )
+
+    try:
+        await send_audio(pcm_data, orchestrator)
+        await asyncio.sleep(0.1)  # Give time for processing
+
+        mock_voice_agent.respond_to_human.assert_not_called()
+    finally:
+        orchestrator.end_conversation()
+
+
 @pytest.mark.asyncio
 async def test_should_detect_speech_and_respond_to_human_once_for_long_pause(
     mock_voice_agent: MagicMock,
@@ -379,6 +414,397 @@ async def test_should_detect_short_speech_stop_agent_and_restream(
         orchestrator.end_conversation()
 
 
+class EchoAgent(BaseAgent):
+    def __call__(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        async def echo() -> AsyncIterator[str]:
+            yield stt_result.transcript
+
+        return echo()
+
+
+class SilentTTS(BaseTTS):
+    def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        async def speak() -> AsyncIterator[AudioChunk]:
+            async for _ in input_generator:
+                yield AudioChunk(
+                    audio=b"\x00" * 640,
+                    base64_audio="",
+                    normalized_alignment=None,
+                )
+
+        return speak()
+
+
+@pytest.mark.asyncio
+async def test_should_stream_human_speech_to_streaming_stt():
+    """
+    - Human: Long speech
+    - Agent: Uses streaming STT
+
+    - Expect: Speech is transcribed while human speaks and the transcript is used for the response.
+    """
+    pcm_data = read_wav_to_pcm("single_speech.wav")
+    pcm_data_expected = read_wav_to_pcm("single_speech_expected.wav")
+
+    stt = FakeStreamingSTT(
+        transcript="streamed transcript",
+        sample_rate=AUDIO_CONFIG.sample_rate,
+        bytes_per_sample=AUDIO_CONFIG.bytes_per_sample,
+    )
+    conversation_events: list[ConversationEvent] = []
+
+    async def callback(event: ConversationEvent):
+        conversation_events.append(event)
+
+    orchestrator = ConversationOrchestrator(
+        conversation_id="streaming_stt_id",
+        callback=callback,
+        voice_agent=VoiceAgent(stt=stt, tts=SilentTTS(), agent=EchoAgent()),
+        audio_config=AUDIO_CONFIG,
+    )
+
+    try:
+        await send_audio(pcm_data, orchestrator)
+        await asyncio.sleep(0.5)  # Give time for processing
+
+        results = [event for event in conversation_events if event.type == "result"]
+        assert len(results) == 1
+        stt_result = results[0].result.stt_result  # type: ignore
+        assert stt_result.transcript == "streamed transcript"
+        assert pcm_data_expected in stt_result.speech_file
+    finally:
+        orchestrator.end_conversation()
+
+
+class CountingSTT(BaseSTT):
+    def __init__(self):
+        self.transcribed_audio: list[bytes] = []
+
+    async def __call__(self, pcm_audio: bytes) -> STTResult:
+        self.transcribed_audio.append(pcm_audio)
+        return STTResult(
+            stt_start_time=time.time(),
+            stt_end_time=time.time(),
+            transcript=f"segment {len(self.transcribed_audio)}",
+            speech_file=pcm_audio,
+        )
+
+
+class SlowEchoAgent(EchoAgent):
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self.transcripts: list[str] = []
+        self.speech_files: list[bytes] = []
+
+    def __call__(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        self.transcripts.append(stt_result.transcript)
+        self.speech_files.append(stt_result.speech_file)
+
+        async def echo() -> AsyncIterator[str]:
+            await asyncio.sleep(self.delay_s)
+            yield stt_result.transcript
+
+        return echo()
+
+
+@pytest.mark.asyncio
+async def test_should_transcribe_only_new_segment_of_merged_speech():
+    """
+    - Human: Speech with a long pause between segments
+    - Agent: Still thinking about the first segment when the second one ends
+
+    - Expect: First segment transcript is reused, only the second segment is transcribed.
+    """
+    pcm_data = read_wav_to_pcm("long_pause.wav")
+
+    stt = CountingSTT()
+    agent = SlowEchoAgent(delay_s=3)
+    orchestrator = ConversationOrchestrator(
+        conversation_id="merged_segments_id",
+        callback=lambda x: asyncio.sleep(0),
+        voice_agent=VoiceAgent(stt=stt, tts=SilentTTS(), agent=agent),
+        audio_config=AUDIO_CONFIG,
+    )
+
+    try:
+        await send_audio(pcm_data, orchestrator)
+        await asyncio.sleep(0.5)
+
+        assert len(stt.transcribed_audio) == 2
+        assert stt.transcribed_audio[1] not in stt.transcribed_audio[0]
+        assert stt.transcribed_audio[0] not in stt.transcribed_audio[1]
+        assert agent.transcripts == ["segment 1", "segment 1 segment 2"]
+        # Turn audio of the merged turn has both segments
+        assert stt.transcribed_audio[0] in agent.speech_files[1]
+        assert stt.transcribed_audio[1] in agent.speech_files[1]
+    finally:
+        orchestrator.end_conversation()
+
+
+class StreamingAgent(BaseAgent):
+    """Long response streamed token by token, records when tokens were pulled and streams closed."""
+
+    def __init__(self, tokens: int, delay_s: float):
+        self.tokens = tokens
+        self.delay_s = delay_s
+        self.pulls: list[list[float]] = []
+        self.closed: list[float] = []
+
+    def __call__(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        pulls: list[float] = []
+        self.pulls.append(pulls)
+
+        async def stream() -> AsyncIterator[str]:
+            try:
+                for i in range(self.tokens):
+                    await asyncio.sleep(self.delay_s)
+                    pulls.append(time.monotonic())
+                    yield f"token {i} "
+            finally:
+                self.closed.append(time.monotonic())
+
+        return stream()
+
+
+@pytest.mark.asyncio
+async def test_should_pause_generation_on_barge_in_and_tear_down_on_long_interruption():
+    """
+    - Human: Long speech
+    - Agent: Starts a long streamed response
+    - Human: Long speech interrupting the agent
+
+    - Expect: LLM stream is not pulled while the human talks over the agent,
+      and is closed when the long interruption ends.
+    """
+    pcm_data = read_wav_to_pcm("single_speech.wav")
+    agent = StreamingAgent(tokens=1000, delay_s=0.05)
+    stop_speaking_times: list[float] = []
+
+    async def callback(event: ConversationEvent):
+        if event.type == "stop_speaking":
+            stop_speaking_times.append(time.monotonic())
+
+    orchestrator = ConversationOrchestrator(
+        conversation_id="barge_in_pause_id",
+        callback=callback,
+        voice_agent=VoiceAgent(stt=CountingSTT(), tts=SilentTTS(), agent=agent),
+        audio_config=AUDIO_CONFIG,
+    )
+
+    try:
+        await send_audio(pcm_data, orchestrator)
+        await send_audio(pcm_data, orchestrator)
+        await asyncio.sleep(0.5)
+
+        assert len(agent.pulls) == 2, "Expected a new response to the interruption"
+        assert len(stop_speaking_times) >= 1
+        first_response_pulls = agent.pulls[0]
+        paused_at = stop_speaking_times[0] + 0.1  # token already on its way is held
+        assert agent.closed[0] > paused_at
+        assert not [
+            pulled for pulled in first_response_pulls if paused_at < pulled
+        ], "LLM was pulled while the human was talking over the agent"
+        assert len(first_response_pulls) < agent.tokens
+    finally:
+        orchestrator.end_conversation()
+        # Response to the interruption is still streaming
+        await orchestrator.teardown_task  # type: ignore[misc]
+
+
+@pytest.mark.asyncio
+async def test_should_tear_down_streaming_response_when_conversation_ends():
+    """
+    - Human: Long speech
+    - Agent: Starts a long streamed response
+    - Human: Hangs up
+
+    - Expect: Response task, TTS and LLM stream are closed promptly, no task is leaked.
+    """
+    pcm_data = read_wav_to_pcm("single_speech.wav")
+    agent = StreamingAgent(tokens=1000, delay_s=0.05)
+
+    async def callback(event: ConversationEvent):
+        pass
+
+    orchestrator = ConversationOrchestrator(
+        conversation_id="teardown_id",
+        callback=callback,
+        voice_agent=VoiceAgent(stt=CountingSTT(), tts=SilentTTS(), agent=agent),
+        audio_config=AUDIO_CONFIG,
+    )
+    await send_audio(pcm_data, orchestrator)
+    await asyncio.sleep(0.3)
+    assert agent.pulls and not agent.closed, "Expected a response being streamed"
+
+    hung_up_at = time.monotonic()
+    orchestrator.end_conversation()
+    stats = await orchestrator.teardown_task  # type: ignore[misc]
+
+    assert agent.closed and agent.closed[0] - hung_up_at < 0.1
+    assert stats.leaked_tasks == 0
+    assert stats.max_teardown_time < 0.1
+    assert orchestrator.conversation.tasks.running == 0
+
+
+class ToneTTS(BaseTTS):
+    def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        async def speak() -> AsyncIterator[AudioChunk]:
+            async for _ in input_generator:
+                yield AudioChunk(
+                    audio=b"\x00\x20" * 3200,
+                    base64_audio="",
+                    normalized_alignment=None,
+                    output_format="pcm_16000",
+                )
+
+        return speak()
+
+
+@pytest.mark.asyncio
+async def test_should_play_filler_while_response_is_late():
+    """
+    - Human: Long speech
+    - Agent: Response audio is late
+
+    - Expect: Filler plays after the delay and the response is crossfaded in behind it.
+    """
+    pcm_data = read_wav_to_pcm("single_speech.wav")
+    filler = FillerAudio(delay_ms=200, crossfade_ms=10)
+    filler.add(
+        FillerClip(phrase="Mm.", audio=b"\x00\x10" * 16000, output_format="pcm_16000")
+    )
+    sent_audio: list[bytes] = []
+    results: list[RespondToHumanResult] = []
+
+    async def callback(event: ConversationEvent):
+        if event.type == "media":
+            sent_audio.append(event.audio)  # type: ignore[union-attr]
+        elif event.type == "result":
+            results.append(event.result)  # type: ignore[union-attr]
+
+    orchestrator = ConversationOrchestrator(
+        conversation_id="filler_id",
+        callback=callback,
+        voice_agent=VoiceAgent(
+            stt=CountingSTT(), tts=ToneTTS(), agent=SlowEchoAgent(delay_s=0.6)
+        ),
+        audio_config=AUDIO_CONFIG,
+        filler=filler,
+    )
+
+    try:
+        await send_audio(pcm_data, orchestrator)
+        await asyncio.sleep(1.5)
+
+        assert len(results) == 1 and results[0].filler_ms == 1000
+        audio = b"".join(sent_audio)
+        assert audio[:2] == b"\x00\x10"
+        assert audio.endswith(b"\x00\x20" * 3000)
+        # Filler was cut short, the rest of it was crossfaded with the response
+        filler_sent = len(audio) - 6400
+        assert 0 < filler_sent < 32000
+        crossfade = audio[filler_sent : filler_sent + 320]
+        assert crossfade not in (b"\x00\x10" * 160, b"\x00\x20" * 160)
+    finally:
+        orchestrator.end_conversation()
+
+
+class WarmingSTT(CountingSTT):
+    def __init__(self):
+        super().__init__()
+        self.warmed = False
+
+    async def warmup(self) -> None:
+        await asyncio.sleep(0.1)
+        self.warmed = True
+
+
+class BrokenWarmupAgent(EchoAgent):
+    async def warmup(self) -> None:
+        raise ConnectionError("provider unreachable")
+
+
+@pytest.mark.asyncio
+async def test_voice_agent_warmup_logs_failed_component_instead_of_raising(caplog):
+    stt = WarmingSTT()
+    voice_agent = VoiceAgent(stt=stt, tts=SilentTTS(), agent=BrokenWarmupAgent())
+
+    with caplog.at_level(logging.WARNING):
+        await voice_agent.warmup()
+
+    assert stt.warmed
+    assert "agent warmup failed: provider unreachable" in caplog.text
+
+
+class ReportingTTS(SilentTTS):
+    """Reports its own timings, the response audio is timed by VoiceAgent."""
+
+    def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        async def speak() -> AsyncIterator[AudioChunk]:
+            async for chunk in SilentTTS.__call__(self, input_generator):
+                yield chunk
+            if callback:
+                callback(
+                    TTSResult(
+                        start_time=1,
+                        end_time=3,
+                        first_chunk_time=2,
+                        response="Hello",
+                        output_format="pcm_8000",
+                        transcoded=False,
+                        text_chunks=1,
+                    )
+                )
+
+        return speak()
+
+
+@pytest.mark.asyncio
+async def test_response_timings_come_from_voice_agent_and_counters_from_tts():
+    voice_agent = VoiceAgent(stt=CountingSTT(), tts=ReportingTTS(), agent=EchoAgent())
+    results: list[RespondToHumanResult] = []
+
+    start = time.time()
+    async for _ in voice_agent.respond_to_human(
+        b"\x00" * 1600, "timings_id", results.append, AUDIO_CONFIG
+    ):
+        pass
+
+    tts_result = results[0].tts_result
+    # TTS starts with the first token, after STT
+    assert start <= results[0].stt_result.stt_end_time <= tts_result.start_time
+    assert tts_result.start_time <= tts_result.first_chunk_time
+    assert tts_result.first_chunk_time <= tts_result.end_time <= time.time()
+    assert tts_result.output_format == "pcm_8000" and tts_result.text_chunks == 1
+
+
 def debug_write_wav(data: bytes, file_name: str):
     """
     Writes a WAV file for debugging purposes.
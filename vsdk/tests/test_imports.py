@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "silero_vad", "elevenlabs", "groq", "langchain_core", "langgraph"]
+
+
+def test_orchestration_modules_defer_heavy_imports():
+    """Models and provider SDKs load on first use or warmup, not when the app is imported."""
+    code = (
+        "import sys\n"
+        "import vsdk.config, vsdk.conversation_orchestrator, vsdk.session\n"
+        "import vsdk.stt.GroqSTTProcessor, vsdk.tts.ElevenTTSProcessor, vsdk.ttt.cache\n"
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+
+    assert output.strip() == "[]"
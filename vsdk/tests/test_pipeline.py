@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import AsyncIterator, List
+
+import pytest
+
+from vsdk.pipeline import MapStage, Pipeline, Stage
+
+
+async def numbers(count: int, closed: List[bool]) -> AsyncIterator[int]:
+    try:
+        for i in range(count):
+            yield i
+    finally:
+        closed.append(True)
+
+
+def delayed(delay_s: float):
+    async def stage(items: AsyncIterator[int]) -> AsyncIterator[int]:
+        async for item in items:
+            await asyncio.sleep(delay_s)
+            yield item
+
+    return stage
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap_and_slow_stage_applies_backpressure():
+    pipeline = Pipeline(
+        [
+            Stage("fast", delayed(0.01), max_queue=2),
+            Stage("slow", delayed(0.05), max_queue=2),
+        ]
+    )
+
+    start = time.monotonic()
+    output = [item async for item in pipeline(numbers(10, []))]
+    elapsed = time.monotonic() - start
+
+    assert output == list(range(10))
+    assert elapsed < 0.1 + 10 * 0.05  # not 10 * (0.01 + 0.05)
+    fast, slow = pipeline.stats
+    assert fast.max_queue_depth == 2
+    assert fast.output_wait_time > 0.2  # blocked on the full queue
+    assert slow.input_wait_time < 0.05
+    assert fast.first_item_latency is not None and slow.first_item_latency is not None
+    # Timed from the start of the run: the slow stage's first item waits for the fast one's
+    assert fast.first_item_latency < slow.first_item_latency
+
+
+@pytest.mark.asyncio
+async def test_map_stage_runs_concurrently_and_keeps_order():
+    async def lookup(item: int) -> int:
+        await asyncio.sleep(0.1 if item % 2 == 0 else 0.01)
+        return item * 10
+
+    pipeline = Pipeline([MapStage("lookup", lookup, concurrency=4)])
+
+    start = time.monotonic()
+    output = [item async for item in pipeline(numbers(8, []))]
+
+    assert output == [item * 10 for item in range(8)]
+    assert time.monotonic() - start < 0.35
+
+
+@pytest.mark.asyncio
+async def test_closing_output_tears_down_stages_and_errors_reach_the_consumer():
+    source_closed: List[bool] = []
+    tasks_before = asyncio.all_tasks()
+    output = Pipeline([Stage("slow", delayed(0.05))])(numbers(100, source_closed))
+    async for _ in output:
+        break
+    await output.aclose()  # type: ignore[attr-defined]
+
+    assert source_closed == [True]
+    assert asyncio.all_tasks() - tasks_before - {asyncio.current_task()} == set()
+
+    async def failing(items: AsyncIterator[int]) -> AsyncIterator[int]:
+        async for item in items:
+            if item == 3:
+                raise ValueError("broken item")
+            yield item
+
+    received: List[int] = []
+    with pytest.raises(ValueError, match="broken item"):
+        async for item in Pipeline(
+            [Stage("failing", failing), Stage("slow", delayed(0.01))]
+        )(numbers(10, [])):
+            received.append(item)
+    assert received == [0, 1, 2]
@@ -0,0 +1,112 @@
+from typing import List
+
+from langchain_openai import ChatOpenAI
+
+from vsdk.config import Config
+from vsdk.session import VoiceAgentFactory
+from vsdk.stt.GroqSTTProcessor import GroqSTTProcessor
+from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
+from vsdk.ttt.OpenAIAgent import OpenAIAgent
+from vsdk.ttt.memory import MemoryPolicy
+
+CALLS = 20
+SYSTEM_PROMPT = "Be brief."
+
+ELEVEN = Config.Eleven(
+    model="model",
+    voice="voice",
+    output_format="pcm_16000",
+    language="en",
+    api_key="test",
+)
+GROQ = Config.Groq(
+    api_key="test",
+    transcription_model="model",
+    transcription_language="en",
+    audio_channels=1,
+    bytes_per_sample=2,
+    sample_rate=8000,
+)
+AUDIO = Config.Audio(
+    sample_rate=8000,
+    channels=1,
+    bits_per_sample=16,
+    bytes_per_sample=16 // 8,
+    silero_samples_size=256,
+    silero_samples_size_bytes=256 * 2,
+    silero_threshold=0.73,
+    silero_min_silence_duration_ms=350,
+    interruption_duration_ms=600,
+    output_formats=["ulaw_8000"],
+)
+
+
+def stt() -> GroqSTTProcessor:
+    return GroqSTTProcessor(groq=GROQ)
+
+
+def tts(audio_config: Config.Audio) -> ElevenTTSProcessor:
+    return ElevenTTSProcessor(eleven=ELEVEN, audio_config=audio_config)
+
+
+def agent(system_prompt: str) -> OpenAIAgent:
+    return OpenAIAgent(
+        llm=ChatOpenAI(model="gpt-4o-mini", api_key="test"),  # type: ignore[arg-type]
+        system_prompt=system_prompt,
+        memory_policy=MemoryPolicy(),
+    )
+
+
+def test_factory_shares_processors_and_agent_between_calls():
+    compiled: List[str] = []
+    built: List[str] = []
+
+    def counting_stt() -> GroqSTTProcessor:
+        built.append("stt")
+        return stt()
+
+    def counting_tts(audio_config: Config.Audio) -> ElevenTTSProcessor:
+        built.append("tts")
+        return tts(audio_config)
+
+    def counting_agent(system_prompt: str) -> OpenAIAgent:
+        compiled.append(system_prompt)
+        return agent(system_prompt)
+
+    factory = VoiceAgentFactory(
+        stt_factory=counting_stt, tts_factory=counting_tts, agent_factory=counting_agent
+    )
+    voice_agents = [factory.voice_agent(AUDIO, SYSTEM_PROMPT) for _ in range(CALLS)]
+
+    first = voice_agents[0]
+    assert all(voice_agent is first for voice_agent in voice_agents)
+    assert all(voice_agent.stt is first.stt for voice_agent in voice_agents)
+    assert all(voice_agent.tts is first.tts for voice_agent in voice_agents)
+    # The same compiled graph, conversations are kept apart by thread id
+    graph = first.agent.agent  # type: ignore[attr-defined]
+    assert all(voice_agent.agent.agent is graph for voice_agent in voice_agents)  # type: ignore[attr-defined]
+    assert compiled == [SYSTEM_PROMPT]
+    assert built == ["stt", "tts"]
+
+    # Another transport format gets its own TTS, STT and the agent graph are still shared
+    browser_audio = AUDIO.model_copy(update={"output_formats": ["pcm_16000"]})
+    browser = factory.voice_agent(browser_audio, SYSTEM_PROMPT)
+    assert browser.tts is not first.tts
+    assert browser.stt is first.stt
+    assert browser.agent is first.agent
+    verbose = factory.voice_agent(AUDIO, "Be verbose.")
+    assert verbose.agent is not browser.agent
+    assert verbose.tts is first.tts
+    assert compiled == [SYSTEM_PROMPT, "Be verbose."]
+    assert built == ["stt", "tts", "tts"]
+
+
+def test_ended_conversation_is_dropped_from_shared_agent_memory():
+    shared = agent(SYSTEM_PROMPT)
+    config = {"configurable": {"thread_id": "call"}}
+    shared.agent.update_state(config, {"messages": [("user", "hi")]})  # type: ignore[arg-type]
+    assert shared.agent.get_state(config).values["messages"]  # type: ignore[arg-type]
+
+    shared.end_conversation("call")
+
+    assert not shared.agent.get_state(config).values  # type: ignore[arg-type]
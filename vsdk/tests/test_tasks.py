@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from vsdk.tasks import TaskTracker
+
+
+async def cooperative():
+    await asyncio.sleep(10)
+
+
+async def slow_cleanup():
+    try:
+        await asyncio.sleep(10)
+    finally:
+        # e.g. a provider connection that does not close promptly
+        await asyncio.shield(asyncio.sleep(0.3))
+
+
+@pytest.mark.asyncio
+async def test_tracker_reports_teardown_latency_and_leaked_tasks():
+    tracker = TaskTracker("call", teardown_timeout_s=0.1)
+    fast = tracker.create_task(cooperative(), name="fast")
+    tracker.create_task(slow_cleanup(), name="slow")
+    await asyncio.sleep(0)
+
+    tracker.cancel(fast)
+    stats = await tracker.close()
+
+    assert stats.teardowns == 2
+    assert stats.leaked_tasks == 1
+    assert 0.1 <= stats.max_teardown_time < 0.2
+    await asyncio.sleep(0.3)
+    assert tracker.running == 0
@@ -0,0 +1,274 @@
+import asyncio
+import base64
+from typing import AsyncIterator, Callable, List, Optional
+
+import pytest
+
+from vsdk.tts.base import AudioChunk, BaseTTS, NormalizedAlignment, TTSResult
+from vsdk.tts.cache import CachedTTS, PhraseCache
+from vsdk.tts.text import split_sentences
+
+
+class FakeProviderTTS(BaseTTS):
+    """One 1600 byte chunk (with alignment) per word, each after `delay_s`."""
+
+    def __init__(self, delay_s: float = 0.05):
+        self.delay_s = delay_s
+        self.requests: List[str] = []
+
+    def cache_key(self) -> Optional[str]:
+        return "fake:voice:model:pcm_16000"
+
+    async def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        text = "".join([chunk async for chunk in input_generator])
+        self.requests.append(text)
+        for word in text.split():
+            await asyncio.sleep(self.delay_s)
+            audio = word.encode().ljust(1600, b"\0")
+            yield AudioChunk(
+                audio=audio,
+                base64_audio=base64.b64encode(audio).decode("utf-8"),
+                normalized_alignment=NormalizedAlignment(
+                    chars=list(word),
+                    charStartTimesMs=list(range(len(word))),
+                    charDurationsMs=[1] * len(word),
+                ),
+                output_format="pcm_16000",
+            )
+        if callback:
+            tts_result = TTSResult.empty()
+            tts_result.response = text
+            callback(tts_result)
+
+
+async def text_stream(*chunks: str) -> AsyncIterator[str]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(stream: AsyncIterator[AudioChunk]) -> List[AudioChunk]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_split_sentences_from_token_stream():
+    sentences = [
+        sentence
+        async for sentence in split_sentences(
+            text_stream("Hi Mr", ". Smith", "! How are", " you? I'm fine. The first", ". Bye")
+        )
+    ]
+    assert sentences == ["Hi Mr. Smith!", "How are you?", "I'm fine.", "The first.", "Bye"]
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_replays_without_provider():
+    provider = FakeProviderTTS()
+    tts = CachedTTS(provider, PhraseCache())
+
+    first = await collect(tts(text_stream("Hello there. ", "How can I help?")))
+
+    results: List[TTSResult] = []
+    start = asyncio.get_running_loop().time()
+    second = await collect(
+        tts(text_stream("Hello  there. ", "How can I help?"), callback=results.append)
+    )
+    replay_time = asyncio.get_running_loop().time() - start
+
+    assert second == first
+    assert second[0].normalized_alignment is not None
+    # Both sentences went through one provider session and were stored as one phrase
+    assert provider.requests == ["Hello there. How can I help?"]
+    assert replay_time < provider.delay_s
+    assert results[0].cache_hits == 1 and results[0].cache_misses == 0
+    assert results[0].response == "Hello  there. How can I help?"
+
+
+@pytest.mark.asyncio
+async def test_memory_tier_evicts_least_recently_used_phrase():
+    provider = FakeProviderTTS(delay_s=0)
+    # One word phrase is 1600 bytes of audio plus its base64, the budget fits two
+    cache = PhraseCache(memory_budget_bytes=2 * (1600 + 2136))
+    tts = CachedTTS(provider, cache)
+
+    for text in ["One.", "Two.", "One.", "Three.", "One.", "Two."]:
+        await collect(tts(text_stream(text)))
+
+    assert provider.requests == ["One.", "Two.", "Three.", "Two."]
+    assert cache.memory_size_bytes <= cache.memory_budget_bytes
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path):
+    provider = FakeProviderTTS(delay_s=0)
+    first = await collect(
+        CachedTTS(provider, PhraseCache(disk_dir=str(tmp_path)))(
+            text_stream("Welcome back to the show.")
+        )
+    )
+
+    replayed = await collect(
+        CachedTTS(provider, PhraseCache(disk_dir=str(tmp_path)))(
+            text_stream("Welcome back to the show.")
+        )
+    )
+
+    assert replayed == first
+    assert provider.requests == ["Welcome back to the show."]
+
+
+class StreamingProviderTTS(BaseTTS):
+    """Voices every word as soon as its text arrives, records what happened in `events`."""
+
+    def __init__(self, events: List[str]):
+        self.events = events
+        self.requests: List[str] = []
+        self.closed = 0
+
+    def cache_key(self) -> Optional[str]:
+        return "fake:voice:model:pcm_16000"
+
+    async def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        self.requests.append("")
+        try:
+            async for text in input_generator:
+                self.requests[-1] += text
+                for word in text.split():
+                    self.events.append(f"audio {word}")
+                    yield AudioChunk(
+                        audio=word.encode(),
+                        base64_audio=base64.b64encode(word.encode()).decode("utf-8"),
+                        normalized_alignment=None,
+                        output_format="pcm_16000",
+                    )
+        finally:
+            self.closed += 1
+
+
+async def llm_stream(events: List[str], *tokens: str) -> AsyncIterator[str]:
+    for token in tokens:
+        await asyncio.sleep(0.01)
+        events.append(f"token {token.strip()}")
+        yield token
+
+
+@pytest.mark.asyncio
+async def test_miss_streams_text_to_provider_as_it_arrives():
+    events: List[str] = []
+    provider = StreamingProviderTTS(events)
+    tts = CachedTTS(provider, PhraseCache())
+
+    chunks = await collect(tts(llm_stream(events, "Sure, ", "let me ", "check. ", "Done.")))
+
+    assert b" ".join(chunk.audio for chunk in chunks) == b"Sure, let me check. Done."
+    assert events.index("audio Sure,") < events.index("token check.")
+    assert provider.requests == ["Sure, let me check. Done."]
+
+
+@pytest.mark.asyncio
+async def test_cached_phrase_between_misses_is_replayed_in_order():
+    events: List[str] = []
+    provider = StreamingProviderTTS(events)
+    cache = PhraseCache()
+    await collect(CachedTTS(provider, cache)(text_stream("One moment please.")))
+
+    chunks = await collect(
+        CachedTTS(provider, cache)(
+            llm_stream(events, "Got it. ", "One moment ", "please. ", "Onward.")
+        )
+    )
+
+    assert b" ".join(chunk.audio for chunk in chunks) == (
+        b"Got it. One moment please. Onward."
+    )
+    assert provider.requests == ["One moment please.", "Got it. ", "Onward."]
+
+
+@pytest.mark.asyncio
+async def test_text_diverging_from_cached_phrase_goes_to_provider():
+    events: List[str] = []
+    provider = StreamingProviderTTS(events)
+    cache = PhraseCache()
+    await collect(CachedTTS(provider, cache)(text_stream("Hello there.")))
+
+    chunks = await collect(
+        CachedTTS(provider, cache)(llm_stream(events, "Hello ", "world. ", "Hello there."))
+    )
+
+    assert b" ".join(chunk.audio for chunk in chunks) == b"Hello world. Hello there."
+    assert provider.requests == ["Hello there.", "Hello world. "]
+
+
+@pytest.mark.asyncio
+async def test_teardown_cancels_provider_synthesis():
+    events: List[str] = []
+    provider = StreamingProviderTTS(events)
+    cache = PhraseCache()
+    tasks_before = asyncio.all_tasks()
+
+    stream = CachedTTS(provider, cache)(
+        llm_stream(events, *(f"word{i} " for i in range(100)))
+    )
+    async for _ in stream:
+        break
+    await stream.aclose()  # type: ignore[attr-defined]
+
+    assert provider.closed == 1
+    assert asyncio.all_tasks() - tasks_before == set()
+    # Audio cut short is not the whole phrase
+    assert cache.memory_size_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_misses_share_one_synthesis():
+    provider = FakeProviderTTS(delay_s=0.01)
+    cache = PhraseCache()
+    results: List[TTSResult] = []
+
+    first, second = await asyncio.gather(
+        collect(CachedTTS(provider, cache)(text_stream("Please hold the line."))),
+        collect(
+            CachedTTS(provider, cache)(
+                text_stream("Please hold the line."), callback=results.append
+            )
+        ),
+    )
+
+    assert provider.requests == ["Please hold the line."]
+    assert second == first and len(first) == 4
+    assert results[0].cache_hits == 1 and results[0].cache_misses == 0
+
+
+KEY = ("fake:voice:model:pcm_16000", "Please hold the line.")
+
+
+@pytest.mark.asyncio
+async def test_shared_synthesis_outlives_the_response_that_started_it():
+    provider = FakeProviderTTS(delay_s=0.01)
+    cache = PhraseCache()
+    tasks_before = asyncio.all_tasks()
+
+    first = CachedTTS(provider, cache)(text_stream("Please hold the line."))
+    await anext(first)
+    second = asyncio.create_task(
+        collect(CachedTTS(provider, cache)(text_stream("Please hold the line.")))
+    )
+    shared = cache.inflight(KEY)
+    assert shared
+    while shared.subscribers < 2:
+        await asyncio.sleep(0)
+    await first.aclose()  # type: ignore[attr-defined]
+
+    assert len(await second) == 4
+    assert provider.requests == ["Please hold the line."]
+    # Stored once the last subscriber got the whole phrase
+    assert await cache.get(KEY)
+    assert asyncio.all_tasks() - tasks_before == set()
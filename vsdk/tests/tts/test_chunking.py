@@ -0,0 +1,121 @@
+import asyncio
+from typing import AsyncIterator, List, Tuple
+
+import pytest
+
+from vsdk.tts.chunking import TextChunker
+
+
+async def llm_stream(*tokens: Tuple[str, float]) -> AsyncIterator[str]:
+    """Tokens with the delay before each of them."""
+    for token, delay in tokens:
+        await asyncio.sleep(delay)
+        yield token
+
+
+async def chunk_events(
+    chunker: TextChunker, *tokens: Tuple[str, float]
+) -> List[Tuple[str, str]]:
+    """Tokens the LLM sent and chunks the chunker flushed, in the order they happened."""
+    events: List[Tuple[str, str]] = []
+
+    async def logged_stream() -> AsyncIterator[str]:
+        async for token in llm_stream(*tokens):
+            events.append(("token", token))
+            yield token
+
+    async for chunk in chunker(logged_stream()):
+        events.append(("chunk", chunk))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_after_few_words_then_whole_sentences():
+    words = "Sure thing I can help you with that today. Your order shipped yesterday. It arrives on Monday."
+    chunker = TextChunker(first_chunk_words=4)
+
+    chunks = [
+        chunk
+        async for chunk in chunker(
+            llm_stream(*((token + " ", 0) for token in words.split()))
+        )
+    ]
+
+    assert chunks == [
+        "Sure thing I can ",
+        "help you with that today. ",
+        "Your order shipped yesterday. ",
+        "It arrives on Monday. ",
+    ]
+    assert chunker.chunks == 4
+    assert chunker.flush_reasons == {"words": 1, "sentence": 3}
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_at_clause_boundary():
+    chunker = TextChunker(first_chunk_words=10)
+    chunks = [
+        chunk
+        async for chunk in chunker(
+            llm_stream(("Well, ", 0), ("let me ", 0), ("check. ", 0), ("Done", 0))
+        )
+    ]
+    assert chunks == ["Well, ", "let me check. ", "Done "]
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_deadline_with_slow_llm():
+    chunker = TextChunker(first_chunk_words=10, first_chunk_deadline_ms=100)
+
+    events = await chunk_events(
+        chunker, ("Hmm let ", 0), ("me", 0.05), (" think", 0.5), (" about it.", 0)
+    )
+
+    # The deadline flushes while the LLM stalls, "me" may still grow into a longer word so only
+    # complete words are flushed
+    assert events == [
+        ("token", "Hmm let "),
+        ("token", "me"),
+        ("chunk", "Hmm let "),
+        ("token", " think"),
+        ("token", " about it."),
+        ("chunk", "me think about it. "),
+    ]
+    assert chunker.flush_reasons == {"deadline": 1, "end": 1}
+    assert chunker.first_chunk_latency is not None
+
+
+@pytest.mark.asyncio
+async def test_idle_flush_when_llm_stalls():
+    chunker = TextChunker(first_chunk_words=2, idle_flush_ms=100)
+
+    events = await chunk_events(
+        chunker,
+        ("Okay, ", 0),
+        ("your balance is ", 0),
+        ("one hundred", 0.5),
+        (" dollars.", 0),
+    )
+
+    assert events == [
+        ("token", "Okay, "),
+        ("chunk", "Okay, "),
+        ("token", "your balance is "),
+        ("chunk", "your balance is "),
+        ("token", "one hundred"),
+        ("token", " dollars."),
+        ("chunk", "one hundred dollars. "),
+    ]
+    assert chunker.flush_reasons["idle"] == 1
+
+
+@pytest.mark.asyncio
+async def test_long_sentence_split_at_clause():
+    chunker = TextChunker(first_chunk_words=1, max_chunk_chars=40)
+    text = "Hi there friend. This sentence keeps going, and going, and going without an end"
+    chunks = [
+        chunk async for chunk in chunker(llm_stream(*((c, 0) for c in text)))
+    ]
+    assert "".join(chunks).split() == text.split()
+    assert all(len(chunk) <= 42 for chunk in chunks)
+    assert chunker.flush_reasons["max_chars"] >= 1
@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import json
+from typing import AsyncIterator
+
+import pytest
+from websockets.asyncio.server import ServerConnection, serve
+
+from vsdk.config import Config
+from vsdk.tts.base import TTSResult
+from vsdk.tts import connection_pool
+from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
+
+HANDSHAKE_DELAY_S = 0.2
+
+
+class StubTTSServer:
+    """Local stand-in for the provider stream-input websocket, with a slow handshake."""
+
+    def __init__(self):
+        self.connections = 0
+
+    async def process_request(self, connection: ServerConnection, request):
+        await asyncio.sleep(HANDSHAKE_DELAY_S)  # TLS + auth on a real provider
+        return None
+
+    async def handler(self, websocket: ServerConnection):
+        self.connections += 1
+        initial = json.loads(await websocket.recv())
+        assert initial["xi_api_key"] == "test"
+        async for message in websocket:
+            text = json.loads(message)["text"]
+            if text == "":
+                await websocket.send(json.dumps({"isFinal": True}))
+                break
+            audio = base64.b64encode(b"\x00\x01" * len(text)).decode()
+            await websocket.send(json.dumps({"audio": audio}))
+
+
+def eleven_config(port: int, pool_size: int) -> Config.Eleven:
+    return Config.Eleven(
+        model="model",
+        voice=f"voice_{pool_size}",
+        output_format="pcm_16000",
+        language="en",
+        api_key="test",
+        base_url=f"ws://127.0.0.1:{port}",
+        connection_pool_size=pool_size,
+    )
+
+
+async def text() -> AsyncIterator[str]:
+    for word in ["Hello", " there."]:
+        yield word
+
+
+async def speak(tts: ElevenTTSProcessor) -> tuple[TTSResult, float]:
+    result = TTSResult.empty()
+    audio = b""
+    start = asyncio.get_running_loop().time()
+    first_audio_time = 0.0
+    async for chunk in tts(text(), callback=result.update):
+        if not audio:
+            first_audio_time = asyncio.get_running_loop().time() - start
+        audio += chunk.audio
+    assert audio
+    return result, first_audio_time
+
+
+@pytest.mark.asyncio
+async def test_warm_connection_saves_connect_time_per_turn():
+    server = StubTTSServer()
+    async with serve(
+        server.handler, "127.0.0.1", 0, process_request=server.process_request
+    ) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+
+        cold_tts = ElevenTTSProcessor(eleven=eleven_config(port, pool_size=0))
+        cold_result, cold_first_audio = await speak(cold_tts)
+
+        pooled_tts = ElevenTTSProcessor(eleven=eleven_config(port, pool_size=1))
+        await pooled_tts.warmup()
+        for _ in range(3):
+            result, first_audio = await speak(pooled_tts)
+            assert result.connection_time < HANDSHAKE_DELAY_S / 2
+            assert result.connection_time_saved > HANDSHAKE_DELAY_S / 2
+            assert first_audio < cold_first_audio - HANDSHAKE_DELAY_S / 2
+            # let the background refill finish, as it would between turns
+            await asyncio.sleep(HANDSHAKE_DELAY_S * 2)
+
+        assert cold_result.connection_time >= HANDSHAKE_DELAY_S
+        assert cold_result.connection_time_saved == 0
+        await pooled_tts._connection_pool().close()
+
+
+@pytest.mark.asyncio
+async def test_dropped_idle_connection_is_replaced():
+    server = StubTTSServer()
+    async with serve(
+        server.handler, "127.0.0.1", 0, process_request=server.process_request
+    ) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        tts = ElevenTTSProcessor(eleven=eleven_config(port, pool_size=1))
+        pool = tts._connection_pool()
+        await tts.warmup()
+
+        # Provider dropped the idle connection
+        await pool._idle[0].websocket.close()
+
+        result, _ = await speak(tts)
+        assert result.connection_time >= HANDSHAKE_DELAY_S
+        await asyncio.sleep(HANDSHAKE_DELAY_S * 2)
+        assert pool.idle_count == 1
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pools_are_split_by_api_key_without_holding_it():
+    config = eleven_config(port=1, pool_size=1)
+    tts = ElevenTTSProcessor(eleven=config)
+    other_key_config = config.model_copy(update={"api_key": "other-secret"})
+    other_key_tts = ElevenTTSProcessor(eleven=other_key_config)
+
+    assert tts._connection_pool() is ElevenTTSProcessor(eleven=config)._connection_pool()
+    assert tts._connection_pool() is not other_key_tts._connection_pool()
+    assert not any("other-secret" in key for key in connection_pool._pools)
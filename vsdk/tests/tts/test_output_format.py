@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from vsdk.tts.output_format import (
+    AudioFormat,
+    AudioTranscoder,
+    negotiate_output_format,
+    pcm_to_ulaw,
+    ulaw_to_pcm,
+)
+
+NATIVE_FORMATS = ["pcm_16000", "pcm_24000", "ulaw_8000"]
+
+
+def test_negotiation_prefers_native_format():
+    """Twilio accepts ulaw_8000 and the provider supports it, so no transcoding is needed."""
+    negotiation = negotiate_output_format(
+        accepted_formats=["ulaw_8000"],
+        native_formats=NATIVE_FORMATS,
+        default_format="pcm_16000",
+    )
+    assert negotiation.provider_format == "ulaw_8000"
+    assert not negotiation.transcoded
+
+
+def test_negotiation_respects_transport_preference_order():
+    negotiation = negotiate_output_format(
+        accepted_formats=["pcm_8000", "pcm_24000", "pcm_16000"],
+        native_formats=NATIVE_FORMATS,
+        default_format="pcm_16000",
+    )
+    assert negotiation.provider_format == "pcm_24000"
+    assert negotiation.transport_format == "pcm_24000"
+
+
+def test_negotiation_falls_back_to_transcoder():
+    negotiation = negotiate_output_format(
+        accepted_formats=["pcm_8000"],
+        native_formats=NATIVE_FORMATS,
+        default_format="pcm_16000",
+    )
+    assert negotiation.provider_format == "pcm_16000"
+    assert negotiation.transport_format == "pcm_8000"
+    assert negotiation.transcoded
+
+
+def test_negotiation_fails_for_formats_transcoder_does_not_support():
+    with pytest.raises(ValueError):
+        negotiate_output_format(
+            accepted_formats=["opus_48000"],
+            native_formats=NATIVE_FORMATS,
+            default_format="pcm_16000",
+        )
+
+
+def test_ulaw_round_trip():
+    pcm = np.array([0, 100, -100, 1000, -1000, 32000, -32000], dtype=np.int16)
+    decoded = ulaw_to_pcm(pcm_to_ulaw(pcm))
+    assert pcm_to_ulaw(np.array([0], dtype=np.int16))[0] == 0xFF
+    assert np.all(np.abs(decoded.astype(np.int32) - pcm) <= np.abs(pcm) // 16 + 8)
+
+
+def test_streaming_transcoder_matches_single_pass():
+    """Transcoding in arbitrary (even odd sized) chunks gives the same audio as one pass."""
+    t = np.arange(16000) / 16000
+    pcm = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16).tobytes()
+
+    single_pass = AudioTranscoder("pcm_16000", "ulaw_8000")(pcm)
+
+    transcoder = AudioTranscoder("pcm_16000", "ulaw_8000")
+    chunked = b"".join(transcoder(pcm[i : i + 333]) for i in range(0, len(pcm), 333))
+
+    assert chunked == single_pass
+    assert abs(len(chunked) - AudioFormat.parse("ulaw_8000").bytes_for_ms(1000)) <= 1
@@ -0,0 +1,135 @@
+import asyncio
+import base64
+import time
+from typing import AsyncIterator, Callable, List, Optional
+
+import pytest
+
+from vsdk.tts.base import AudioChunk, BaseTTS, TTSResult
+from vsdk.tts.parallel import ParallelSentenceTTS
+
+SENTENCES = [
+    "First sentence is here.",
+    "Second one is a bit longer than the first.",
+    "Third.",
+    "And the fourth sentence closes the answer.",
+]
+
+
+class RealTimeTTS(BaseTTS):
+    """Connects in `connect_s`, then streams one chunk per word every `word_s`, like a provider."""
+
+    def __init__(self, connect_s: float = 0.05, word_s: float = 0.02):
+        self.connect_s = connect_s
+        self.word_s = word_s
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.connect_s)
+            text = "".join([chunk async for chunk in input_generator])
+            for word in text.split():
+                await asyncio.sleep(self.word_s)
+                yield AudioChunk(
+                    audio=word.encode(),
+                    base64_audio=base64.b64encode(word.encode()).decode("utf-8"),
+                    normalized_alignment=None,
+                    output_format="pcm_16000",
+                )
+        finally:
+            self.concurrent -= 1
+        if callback:
+            tts_result = TTSResult.empty()
+            tts_result.response = text
+            tts_result.text_chunks = 1
+            callback(tts_result)
+
+
+class StreamingTTS(BaseTTS):
+    """Voices every word as soon as its text arrives, records what happened in `events`."""
+
+    def __init__(self, events: List[str]):
+        self.events = events
+
+    async def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        async for text in input_generator:
+            for word in text.split():
+                self.events.append(f"audio {word}")
+                yield AudioChunk(
+                    audio=word.encode(),
+                    base64_audio=base64.b64encode(word.encode()).decode("utf-8"),
+                    normalized_alignment=None,
+                    output_format="pcm_16000",
+                )
+
+
+async def llm_stream(
+    events: Optional[List[str]] = None, delay_s: float = 0
+) -> AsyncIterator[str]:
+    for sentence in SENTENCES:
+        for word in sentence.split():
+            await asyncio.sleep(delay_s)
+            if events is not None:
+                events.append(f"token {word}")
+            yield word + " "
+
+
+async def timed(
+    tts: BaseTTS, callback: Callable[[TTSResult], None]
+) -> tuple[List[bytes], float]:
+    start = time.monotonic()
+    chunks = [chunk.audio async for chunk in tts(llm_stream(), callback=callback)]
+    return chunks, time.monotonic() - start
+
+
+@pytest.mark.asyncio
+async def test_parallel_synthesis_keeps_order_and_finishes_earlier():
+    provider = RealTimeTTS()
+    results: List[TTSResult] = []
+
+    sequential, sequential_time = await timed(provider, results.append)
+    parallel, parallel_time = await timed(
+        ParallelSentenceTTS(provider, max_concurrency=4), results.append
+    )
+
+    assert parallel == sequential
+    assert provider.max_concurrent == 4
+    assert parallel_time < sequential_time * 0.7
+    assert results[1].text_chunks == len(SENTENCES)
+    assert results[1].response == " ".join(SENTENCES)
+
+
+@pytest.mark.asyncio
+async def test_parallel_synthesis_respects_concurrency_limit():
+    provider = RealTimeTTS(connect_s=0, word_s=0.001)
+    chunks = [
+        chunk async for chunk in ParallelSentenceTTS(provider, max_concurrency=2)(llm_stream())
+    ]
+    assert b" ".join(chunk.audio for chunk in chunks).decode() == " ".join(SENTENCES)
+    assert provider.max_concurrent == 2
+
+
+@pytest.mark.asyncio
+async def test_first_sentence_is_voiced_while_it_streams():
+    events: List[str] = []
+
+    chunks = [
+        chunk.audio
+        async for chunk in ParallelSentenceTTS(StreamingTTS(events))(
+            llm_stream(events, delay_s=0.005)
+        )
+    ]
+
+    assert b" ".join(chunks).decode() == " ".join(SENTENCES)
+    assert events.index("audio First") < events.index("token here.")
@@ -0,0 +1,90 @@
+import asyncio
+import base64
+import json
+import socket
+from typing import AsyncIterator, List
+
+import pytest
+from websockets.asyncio.server import ServerConnection, serve
+
+from vsdk.config import Config
+from vsdk.tts.ElevenTTSProcessor import ElevenTTSProcessor
+
+
+class StreamingTTSServer:
+    """Answers every text chunk with a few audio chunks, slowly."""
+
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def handler(self, websocket: ServerConnection):
+        try:
+            await websocket.recv()
+            async for message in websocket:
+                if json.loads(message)["text"] == "":
+                    await websocket.send(json.dumps({"isFinal": True}))
+                    break
+                for _ in range(5):
+                    audio = base64.b64encode(b"\x00\x01" * 160).decode()
+                    await websocket.send(json.dumps({"audio": audio}))
+                    await asyncio.sleep(0.05)
+        finally:
+            self.closed.set()
+
+
+def eleven_config(port: int) -> Config.Eleven:
+    return Config.Eleven(
+        model="model",
+        voice="voice",
+        output_format="pcm_16000",
+        language="en",
+        api_key="test",
+        base_url=f"ws://127.0.0.1:{port}",
+        connection_pool_size=0,
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def endless_llm(closed: List[bool]) -> AsyncIterator[str]:
+    try:
+        while True:
+            yield "Some more words for the caller. "
+            await asyncio.sleep(0.05)
+    finally:
+        closed.append(True)
+
+
+@pytest.mark.asyncio
+async def test_connect_failure_raises_instead_of_hanging():
+    tts = ElevenTTSProcessor(eleven=eleven_config(free_port()))
+
+    async def speak():
+        async for _ in tts(endless_llm([])):
+            pass
+
+    with pytest.raises(ConnectionRefusedError):
+        await asyncio.wait_for(speak(), timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_stopped_stream_closes_websocket_llm_stream_and_tasks():
+    server = StreamingTTSServer()
+    async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        tts = ElevenTTSProcessor(eleven=eleven_config(port))
+        tasks_before = asyncio.all_tasks()
+        llm_closed: List[bool] = []
+
+        audio = tts(endless_llm(llm_closed))
+        async for _ in audio:
+            break
+        await audio.aclose()  # type: ignore[attr-defined]
+
+        assert llm_closed == [True]
+        await asyncio.wait_for(server.closed.wait(), timeout=0.5)
+        assert asyncio.all_tasks() - tasks_before - {asyncio.current_task()} == set()
@@ -0,0 +1,169 @@
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from vsdk.stt.base import STTResult
+from vsdk.ttt.base import LLMResult
+from vsdk.ttt.cache import CachedAgent, ResponseCache, normalize_transcript
+from vsdk.ttt.memory import MemoryPolicy
+from vsdk.ttt.OpenAIAgent import OpenAIAgent
+
+
+class FakeChatModel(BaseChatModel):
+    answer: str = "We are open from nine to five."
+    prompts: List[List[BaseMessage]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":  # type: ignore[override]
+        return self
+
+    def _generate(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Any = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.prompts.append(messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.answer))]
+        )
+
+    async def _astream(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.prompts.append(messages)
+        words = self.answer.split(" ")
+        for idx, word in enumerate(words):
+            last = idx == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=word + ("" if last else " "))
+            )
+
+
+async def ask(
+    agent: CachedAgent, conversation_id: str, transcript: str
+) -> tuple[List[str], LLMResult]:
+    result = LLMResult.empty()
+    chunks = [
+        chunk
+        async for chunk in agent(
+            STTResult(
+                stt_start_time=0,
+                stt_end_time=0,
+                transcript=transcript,
+                speech_file=b"",
+            ),
+            conversation_id=conversation_id,
+            callback=result.update,
+        )
+    ]
+    return chunks, result
+
+
+def cached_agent(llm: FakeChatModel, cache: ResponseCache) -> CachedAgent:
+    return CachedAgent(
+        OpenAIAgent(llm=llm, system_prompt="Be brief.", memory_policy=MemoryPolicy()),
+        cache,
+    )
+
+
+@pytest.mark.asyncio
+async def test_first_question_is_answered_from_cache_and_kept_in_memory():
+    llm = FakeChatModel(prompts=[])
+    cache = ResponseCache()
+    agent = cached_agent(llm, cache)
+
+    live_chunks, live = await ask(agent, "first", "What are your opening hours?")
+    cached_chunks, cached = await ask(agent, "second", "what are your opening hours")
+
+    assert len(llm.prompts) == 1
+    assert not live.cache_hit and cached.cache_hit
+    assert cached_chunks == live_chunks
+    assert cached.response == live.response
+    assert cache.hit_rate == 0.5
+
+    # The cached turn is in memory, the follow up prompt has the whole conversation
+    await ask(agent, "second", "And on Sunday?")
+    follow_up = [message.content for message in llm.prompts[-1]]
+    assert follow_up[1:] == [
+        "what are your opening hours",
+        "We are open from nine to five.",
+        "And on Sunday?",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_same_question_in_another_context_misses():
+    llm = FakeChatModel(prompts=[])
+    agent = cached_agent(llm, ResponseCache())
+
+    await ask(agent, "first", "Hello")
+    await ask(agent, "first", "What are your opening hours?")
+    _, result = await ask(agent, "second", "What are your opening hours?")
+
+    assert not result.cache_hit
+    assert len(llm.prompts) == 3
+
+    # Another system prompt is another context
+    other = CachedAgent(
+        OpenAIAgent(llm=llm, system_prompt="Be verbose.", memory_policy=MemoryPolicy()),
+        agent.cache,
+    )
+    _, result = await ask(other, "third", "Hello")
+    assert not result.cache_hit
+
+
+@pytest.mark.asyncio
+async def test_cached_turns_out_of_window_are_summarized():
+    llm = FakeChatModel(prompts=[])
+    summary_llm = FakeChatModel(prompts=[], answer="The user greeted.")
+    openai_agent = OpenAIAgent(
+        llm=llm,
+        system_prompt="Be brief.",
+        memory_policy=MemoryPolicy(max_turns=1, summarize=True),
+        summary_llm=summary_llm,
+    )
+    agent = CachedAgent(openai_agent, ResponseCache())
+    summaries = openai_agent.summaries
+    assert summaries
+
+    for conversation_id in ("first", "second"):
+        for transcript in ("Hello", "What are your opening hours?"):
+            _, result = await ask(agent, conversation_id, transcript)
+        await summaries.wait(conversation_id)
+
+    # Both turns of the second conversation came from the cache, the first one left the window
+    assert result.cache_hit and len(llm.prompts) == 2
+    assert summaries.get("second") == "The user greeted."
+
+
+def test_response_cache_evicts_least_recently_used_and_expired():
+    cache = ResponseCache(max_entries=2, ttl_s=60)
+    cache.put(("context", "a"), ["a"])
+    cache.put(("context", "b"), ["b"])
+    assert cache.get(("context", "a")) == ["a"]
+    cache.put(("context", "c"), ["c"])
+    assert cache.get(("context", "b")) is None
+    assert len(cache) == 2
+
+    cache.ttl_s = 0.01
+    time.sleep(0.02)
+    assert cache.get(("context", "a")) is None
+    assert cache.hits == 1 and cache.misses == 2
+
+
+def test_normalize_transcript():
+    assert normalize_transcript(" What's  the PRICE? ") == "what's the price"
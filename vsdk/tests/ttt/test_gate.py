@@ -0,0 +1,93 @@
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+from vsdk.ttt.gate import GenerationGate
+
+
+class StreamingLLM:
+    """Yields numbered tokens every `delay_s`, records how many were pulled and if it was closed."""
+
+    def __init__(self, tokens: int = 20, delay_s: float = 0.01):
+        self.tokens = tokens
+        self.delay_s = delay_s
+        self.pulled = 0
+        self.closed = False
+
+    async def __call__(self) -> AsyncIterator[str]:
+        try:
+            for i in range(self.tokens):
+                await asyncio.sleep(self.delay_s)
+                self.pulled += 1
+                yield f"t{i} "
+        finally:
+            self.closed = True
+
+
+async def consume(stream: AsyncIterator[str], received: List[str]):
+    async for text in stream:
+        received.append(text)
+
+
+@pytest.mark.asyncio
+async def test_pause_stops_pulling_and_resume_continues():
+    llm = StreamingLLM()
+    gate = GenerationGate()
+    received: List[str] = []
+    consumer = asyncio.create_task(consume(gate(llm()), received))
+
+    await asyncio.sleep(0.055)
+    gate.pause()
+    await asyncio.sleep(0.02)
+    pulled_at_pause = llm.pulled
+    await asyncio.sleep(0.1)
+    assert llm.pulled == pulled_at_pause
+    assert len(received) <= pulled_at_pause
+
+    gate.resume()
+    await consumer
+
+    assert received == [f"t{i} " for i in range(20)]
+    assert gate.stats.pauses == 1
+    assert gate.stats.paused_time >= 0.1
+    assert gate.stats.llm_finished and not gate.stats.torn_down
+
+
+@pytest.mark.asyncio
+async def test_tear_down_closes_llm_stream_and_counts_withheld_text():
+    llm = StreamingLLM(delay_s=0.05)
+    gate = GenerationGate()
+    received: List[str] = []
+    consumer = asyncio.create_task(consume(gate(llm()), received))
+
+    await asyncio.sleep(0.12)
+    # Token on its way when the pause happens is held back
+    gate.pause()
+    await asyncio.sleep(0.1)
+    gate.tear_down()
+    await asyncio.wait_for(consumer, 1)
+
+    assert llm.closed
+    assert llm.pulled < 5
+    assert received == [f"t{i} " for i in range(len(received))]
+    assert gate.stats.torn_down and not gate.stats.llm_finished
+    assert gate.stats.withheld_tokens == llm.pulled - len(received) == 1
+    assert gate.stats.withheld_chars == len("t2 ")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_while_paused_tears_down():
+    llm = StreamingLLM()
+    gate = GenerationGate()
+    consumer = asyncio.create_task(consume(gate(llm()), []))
+
+    await asyncio.sleep(0.03)
+    gate.pause()
+    await asyncio.sleep(0.03)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+
+    assert llm.closed
+    assert gate.stats.torn_down
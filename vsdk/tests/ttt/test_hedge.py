@@ -0,0 +1,172 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Optional
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from vsdk.stt.base import STTResult
+from vsdk.ttt.base import LLMResult
+from vsdk.ttt.hedge import HedgedAgent
+from vsdk.ttt.OpenAIAgent import OpenAIAgent
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model with scripted first token and per token latency."""
+
+    answer: str
+    first_token_s: float = 0
+    token_s: float = 0
+    error: Optional[str] = None
+    prompts: List[List[BaseMessage]] = []
+    cancelled: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":  # type: ignore[override]
+        return self
+
+    def _generate(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Any = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.answer))]
+        )
+
+    async def _astream(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.prompts.append(messages)
+        try:
+            await asyncio.sleep(self.first_token_s)
+            if self.error:
+                raise RuntimeError(self.error)
+            words = self.answer.split(" ")
+            for idx, word in enumerate(words):
+                last = idx == len(words) - 1
+                yield ChatGenerationChunk(
+                    message=AIMessageChunk(content=word + ("" if last else " "))
+                )
+                await asyncio.sleep(self.token_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def agent(name: str, **script: Any) -> OpenAIAgent:
+    return OpenAIAgent(
+        llm=ScriptedChatModel(name=name, prompts=[], **script),
+        system_prompt="Be brief.",
+    )
+
+
+async def ask(hedged: HedgedAgent, transcript: str) -> tuple[str, LLMResult]:
+    result = LLMResult.empty()
+    response = ""
+    async for chunk in hedged(
+        STTResult(stt_start_time=0, stt_end_time=0, transcript=transcript, speech_file=b""),
+        conversation_id="call",
+        callback=result.update,
+    ):
+        response += chunk
+    return response, result
+
+
+def contents(messages: List[BaseMessage]) -> List[Any]:
+    return [message.content for message in messages]
+
+
+@pytest.mark.asyncio
+async def test_primary_within_deadline_is_not_hedged():
+    primary = agent("primary", answer="Primary answer.", first_token_s=0.01)
+    secondary = agent("secondary", answer="Secondary answer.")
+    hedged = HedgedAgent(primary, secondary, first_token_deadline_s=0.2)
+
+    response, result = await ask(hedged, "Hi")
+
+    assert response == "Primary answer."
+    assert result.model == "primary" and not result.hedged
+    assert secondary.llm.prompts == []  # type: ignore[attr-defined]
+    # The secondary knows the turn, it may answer the next one
+    state = await secondary.agent.aget_state({"configurable": {"thread_id": "call"}})
+    assert contents(state.values["messages"]) == ["Hi", "Primary answer."]
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_secondary_and_memories_stay_in_sync():
+    primary = agent("primary", answer="Primary answer.", first_token_s=0.5)
+    secondary = agent("secondary", answer="Secondary answer.", first_token_s=0.05)
+    hedged = HedgedAgent(primary, secondary, first_token_deadline_s=0.1)
+    tasks_before = asyncio.all_tasks()
+
+    response, result = await ask(hedged, "Hi")
+
+    assert response == "Secondary answer."
+    assert result.model == "secondary" and result.hedged
+    assert 0.15 <= result.first_chunk_time - result.start_time < 0.4
+    assert primary.llm.cancelled == 1  # type: ignore[attr-defined]
+    # The losing primary is torn down with everything its stream started
+    assert asyncio.all_tasks() - tasks_before == set()
+
+    # Next turn the primary is fast again and sees the turn the secondary answered, once
+    primary.llm.first_token_s = 0  # type: ignore[attr-defined]
+    response, result = await ask(hedged, "And then?")
+    assert result.model == "primary"
+    assert contents(primary.llm.prompts[-1][1:]) == [  # type: ignore[attr-defined]
+        "Hi",
+        "Secondary answer.",
+        "And then?",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_leaves_concurrent_conversation_streaming():
+    shared = agent("shared", answer="One two three four five six.", token_s=0.02)
+    tasks_before = asyncio.all_tasks()
+
+    async def talk(conversation_id: str, chunks: List[str]):
+        async for chunk in shared(
+            STTResult(stt_start_time=0, stt_end_time=0, transcript="Hi", speech_file=b""),
+            conversation_id=conversation_id,
+        ):
+            chunks.append(chunk)
+
+    other_chunks: List[str] = []
+    other = asyncio.create_task(talk("other", other_chunks))
+    cancelled_chunks: List[str] = []
+    cancelled = asyncio.create_task(talk("cancelled", cancelled_chunks))
+    while not cancelled_chunks:
+        await asyncio.sleep(0.005)
+    cancelled.cancel()
+    await asyncio.wait([cancelled])
+
+    # Only the cancelled stream's tasks went, the other conversation streams to the end
+    assert not other.done()
+    await other
+    assert "".join(other_chunks) == "One two three four five six."
+    assert asyncio.all_tasks() - tasks_before == set()
+
+
+@pytest.mark.asyncio
+async def test_failing_primary_falls_back_without_waiting_for_deadline():
+    primary = agent("primary", answer="Primary answer.", error="Rate limited")
+    secondary = agent("secondary", answer="Secondary answer.", first_token_s=0.01)
+    hedged = HedgedAgent(primary, secondary, first_token_deadline_s=1)
+
+    response, result = await ask(hedged, "Hi")
+
+    assert response == "Secondary answer."
+    assert result.model == "secondary" and result.hedged
+    assert result.first_chunk_time - result.start_time < 0.5
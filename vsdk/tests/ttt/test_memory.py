@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    SystemMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from vsdk.stt.base import STTResult
+from vsdk.ttt.base import LLMResult
+from vsdk.ttt.memory import BoundedMemorySaver, MemoryPolicy
+from vsdk.ttt.OpenAIAgent import OpenAIAgent
+
+logger = logging.getLogger(__name__)
+
+
+class FakeChatModel(BaseChatModel):
+    """Prefill time grows with the prompt like a real model, reports usage on the last chunk."""
+
+    answer: str = "Sure, here is a fairly long answer to what you just said."
+    prefill_s_per_token: float = 0.00005
+    prompts: List[List[BaseMessage]] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":  # type: ignore[override]
+        return self
+
+    def _generate(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Any = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.prompts.append(messages)
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.answer))]
+        )
+
+    async def _astream(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.prompts.append(messages)
+        input_tokens = count_tokens_approximately(messages)
+        await asyncio.sleep(input_tokens * self.prefill_s_per_token)
+        words = self.answer.split(" ")
+        for idx, word in enumerate(words):
+            last = idx == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word + ("" if last else " "),
+                    usage_metadata=(
+                        {
+                            "input_tokens": input_tokens,
+                            "output_tokens": len(words),
+                            "total_tokens": input_tokens + len(words),
+                        }
+                        if last
+                        else None
+                    ),
+                )
+            )
+
+
+def stt_result(transcript: str) -> STTResult:
+    return STTResult(
+        stt_start_time=0, stt_end_time=0, transcript=transcript, speech_file=b""
+    )
+
+
+async def talk(
+    agent: OpenAIAgent, conversation_id: str, turns: int
+) -> List[LLMResult]:
+    results: List[LLMResult] = []
+    for turn in range(turns):
+        async for _ in agent(
+            stt_result(f"This is my message number {turn}, please remember it well."),
+            conversation_id=conversation_id,
+            callback=results.append,
+        ):
+            pass
+    return results
+
+
+def time_to_first_token(result: LLMResult) -> float:
+    return result.first_chunk_time - result.start_time
+
+
+@pytest.mark.asyncio
+async def test_windowed_prompt_keeps_input_tokens_and_first_token_latency_flat():
+    unbounded = OpenAIAgent(llm=FakeChatModel(prompts=[]), system_prompt="Be brief.")
+    bounded = OpenAIAgent(
+        llm=FakeChatModel(prompts=[]),
+        system_prompt="Be brief.",
+        memory_policy=MemoryPolicy(max_turns=4, max_tokens=2000),
+    )
+
+    unbounded_results = await talk(unbounded, "call", turns=40)
+    bounded_results = await talk(bounded, "call", turns=40)
+
+    unbounded_tokens = [result.input_tokens for result in unbounded_results]
+    bounded_tokens = [result.input_tokens for result in bounded_results]
+    logger.info(
+        f"Input tokens at turns 5/20/35, unbounded: {unbounded_tokens[4::15]}, window: {bounded_tokens[4::15]}"
+    )
+    logger.info(
+        f"First token latency at turn 40, unbounded: {time_to_first_token(unbounded_results[-1]):.3f}s, "
+        f"window: {time_to_first_token(bounded_results[-1]):.3f}s"
+    )
+
+    assert unbounded_tokens[-1] > 5 * unbounded_tokens[4]
+    assert bounded_tokens[-1] == bounded_tokens[4]
+    assert (
+        time_to_first_token(bounded_results[-1])
+        < time_to_first_token(unbounded_results[-1]) / 3
+    )
+
+    # Window starts at a human message and holds the last 4 turns
+    prompt = bounded.llm.prompts[-1]  # type: ignore[attr-defined]
+    assert isinstance(prompt[0], SystemMessage)
+    assert prompt[1].type == "human"
+    assert len([message for message in prompt if message.type == "human"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_turns_out_of_window_are_summarized_in_background():
+    summary_llm = FakeChatModel(prompts=[], answer="User sent numbered messages.")
+    agent = OpenAIAgent(
+        llm=FakeChatModel(prompts=[]),
+        system_prompt="Be brief.",
+        memory_policy=MemoryPolicy(max_turns=2, summarize=True),
+        summary_llm=summary_llm,
+    )
+
+    await talk(agent, "call", turns=3)
+    await agent.summaries.wait("call")  # type: ignore[union-attr]
+    await talk(agent, "call", turns=1)
+    await agent.summaries.wait("call")  # type: ignore[union-attr]
+
+    assert "number 0" in summary_llm.prompts[0][1].content  # type: ignore[operator]
+    assert "number 1" not in summary_llm.prompts[0][1].content  # type: ignore[operator]
+    system_prompt = agent.llm.prompts[-1][0].content  # type: ignore[attr-defined]
+    assert (
+        "Summary of the earlier conversation: User sent numbered messages."
+        in system_prompt
+    )
+
+
+@pytest.mark.asyncio
+async def test_saver_prunes_checkpoints_and_evicts_conversations():
+    agent = OpenAIAgent(
+        llm=FakeChatModel(prompts=[]),
+        system_prompt="Be brief.",
+        memory_policy=MemoryPolicy(max_conversations=3, max_checkpoints=2),
+    )
+    saver = agent.saver
+    assert isinstance(saver, BoundedMemorySaver)
+
+    await talk(agent, "first", turns=5)
+    assert len(saver.storage["first"][""]) == 2
+    assert len([key for key in saver.blobs if key[0] == "first"]) < 10
+
+    for conversation_id in ["second", "third", "fourth"]:
+        await talk(agent, conversation_id, turns=1)
+    assert saver.threads_count == 3
+    assert "first" not in saver.storage
+
+    saver.ttl_s = 0.05
+    time.sleep(0.1)
+    await talk(agent, "fifth", turns=1)
+    assert saver.threads_count == 1
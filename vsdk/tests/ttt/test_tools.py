@@ -0,0 +1,144 @@
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+
+from vsdk.stt.base import STTResult
+from vsdk.ttt.base import LLMResult
+from vsdk.ttt.OpenAIAgent import OpenAIAgent
+from vsdk.ttt.tools import ManagedTool, ToolPolicy, ToolResultCache
+
+# ("start" | "end", day) of every lookup, in the order they happened
+LOOKUPS: List[Tuple[str, str]] = []
+
+
+@tool
+def opening_hours(day: str) -> str:
+    """Opening hours of the store on a day"""
+    LOOKUPS.append(("start", day))
+    time.sleep(0.2)
+    LOOKUPS.append(("end", day))
+    return "9 to 17" if day != "sunday" else "closed"
+
+
+@tool
+def order_status(order_id: str) -> str:
+    """Status of an order"""
+    time.sleep(1)
+    return "shipped"
+
+
+class ToolCallingChatModel(BaseChatModel):
+    """Calls all the scripted tools at once, then answers with their results."""
+
+    tool_calls: List[Dict[str, Any]]
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-calling"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ToolCallingChatModel":  # type: ignore[override]
+        return self
+
+    def _generate(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Any = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=""))])
+
+    async def _astream(  # type: ignore[override]
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if isinstance(messages[-1], ToolMessage):
+            results = [m.content for m in messages if isinstance(m, ToolMessage)]
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=f"Results: {', '.join(results)}")  # type: ignore[arg-type]
+            )
+            return
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {
+                        "name": call["name"],
+                        "args": call["args"],
+                        "id": f"{call['name']}_{idx}_{time.monotonic()}",
+                        "index": idx,
+                    }
+                    for idx, call in enumerate(self.tool_calls)
+                ],
+            )
+        )
+
+
+async def ask(agent: OpenAIAgent, conversation_id: str) -> LLMResult:
+    result = LLMResult.empty()
+    async for _ in agent(
+        STTResult(stt_start_time=0, stt_end_time=0, transcript="Hi", speech_file=b""),
+        conversation_id=conversation_id,
+        callback=result.update,
+    ):
+        pass
+    return result
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently_and_idempotent_results_are_shared():
+    LOOKUPS.clear()
+    cache = ToolResultCache()
+    hours = ManagedTool(
+        opening_hours, policy=ToolPolicy(timeout_s=1, cache_ttl_s=60), cache=cache
+    )
+    agent = OpenAIAgent(
+        llm=ToolCallingChatModel(
+            tool_calls=[
+                {"name": "opening_hours", "args": '{"day": "monday"}'},
+                {"name": "opening_hours", "args": '{"day": "sunday"}'},
+            ]
+        ),
+        system_prompt="Be brief.",
+        tools=[hours],
+    )
+
+    first = await ask(agent, "first")
+
+    assert first.response == "Results: 9 to 17, closed"
+    assert [timing.name for timing in first.tool_timings] == ["opening_hours"] * 2
+    # Both lookups started before either ended, they overlapped
+    assert [event for event, _ in LOOKUPS] == ["start", "start", "end", "end"]
+
+    # Another conversation asks the same, the lookups are not repeated
+    second = await ask(agent, "second")
+    assert second.response == first.response
+    assert all(timing.cached for timing in second.tool_timings)
+    assert sorted(day for event, day in LOOKUPS if event == "end") == ["monday", "sunday"]
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_tool_times_out_and_the_agent_answers_anyway():
+    agent = OpenAIAgent(
+        llm=ToolCallingChatModel(
+            tool_calls=[{"name": "order_status", "args": '{"order_id": "42"}'}]
+        ),
+        system_prompt="Be brief.",
+        tools=[ManagedTool(order_status, policy=ToolPolicy(timeout_s=0.1))],
+    )
+
+    result = await ask(agent, "call")
+
+    assert "did not answer in time" in result.response
+    assert result.tool_timings[0].timed_out
+    assert result.tool_timings[0].latency < 0.3
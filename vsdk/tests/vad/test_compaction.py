@@ -0,0 +1,95 @@
+import logging
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from tests.conversation.test_base import AUDIO_CONFIG
+from vsdk.config import Config
+from vsdk.vad.compaction import compact_speech
+from vsdk.vad.vad import VAD, SpeechProbabilities, VADResult
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+WINDOW = AUDIO_CONFIG.silero_samples_size
+MS = AUDIO_CONFIG.sample_rate // 1000
+
+
+def samples(count: int, value: int) -> bytes:
+    return np.full(count, value, dtype=np.int16).tobytes()
+
+
+def test_compaction_trims_edges_and_caps_pauses():
+    # silence 1s | speech 0.5s | pause 1s | speech 0.5s | silence 1s, windows aligned
+    pattern = [(0.0, 1000), (0.9, 500), (0.0, 1000), (0.9, 500), (0.0, 1000)]
+    audio, probs = b"", []
+    for prob, ms in pattern:
+        audio += samples(ms * MS, 1000 if prob else 0)
+        probs += [prob] * (ms * MS // WINDOW)
+    probs += [0.0] * 2
+
+    compacted = compact_speech(
+        audio,
+        from_sample=0,
+        speech_probs=SpeechProbabilities(start_sample=0, window_size=WINDOW, probs=probs),
+        audio_config=AUDIO_CONFIG,
+    )
+
+    speech = np.frombuffer(compacted, dtype=np.int16)
+    expected_ms = 2 * 500 + AUDIO_CONFIG.stt_compaction_max_pause_ms
+    expected_ms += 2 * AUDIO_CONFIG.stt_compaction_padding_ms
+    # window rounding: speech windows may cover up to one window less than the speech itself
+    assert abs(len(speech) - expected_ms * MS) <= 2 * WINDOW
+    assert np.count_nonzero(speech) >= 2 * 500 * MS - 2 * WINDOW
+
+
+def run_vad(pcm: bytes, audio_config: Config.Audio) -> list[tuple[bytes, VADResult]]:
+    """Speeches detected by VAD, with audio aligned to the VAD sample timeline."""
+    vad = VAD(id="compaction", audio_config=audio_config)
+    speeches, buffer = [], b""
+    chunk = audio_config.silero_samples_size_bytes
+    bps = audio_config.bytes_per_sample
+    for i in range(0, len(pcm) - chunk + 1, chunk):
+        buffer += pcm[i : i + chunk]
+        result = vad.silero_iterator(pcm[i : i + chunk])
+        if result and result.ended and result.end_sample:
+            speeches.append(
+                (buffer[result.start_sample * bps : result.end_sample * bps], result)
+            )
+            buffer = b""
+    return speeches
+
+
+def test_compaction_keeps_speech_windows_and_drops_pause():
+    """
+    Two utterances with a 700ms pause, VAD configured to merge pauses below 1s into one speech.
+    """
+    with wave.open(str(RESOURCES / "single_speech_expected.wav"), "rb") as wav_file:
+        utterance = wav_file.readframes(wav_file.getnframes())
+    pause = samples(700 * MS, 0)
+    edge = samples(1500 * MS, 0)
+    audio_config = AUDIO_CONFIG.model_copy(
+        update={"silero_min_silence_duration_ms": 1000}
+    )
+
+    speeches = run_vad(edge + utterance + pause + utterance + edge, audio_config)
+
+    assert len(speeches) == 1
+    speech, result = speeches[0]
+    assert result.speech_probs is not None
+    compacted = compact_speech(
+        speech, result.start_sample, result.speech_probs, audio_config
+    )
+    logger.info(f"Compacted speech from {len(speech)} to {len(compacted)} bytes")
+
+    saved_ms = (len(speech) - len(compacted)) // AUDIO_CONFIG.bytes_per_sample // MS
+    assert saved_ms >= 700 - AUDIO_CONFIG.stt_compaction_max_pause_ms - 2 * WINDOW // MS
+
+    bps = AUDIO_CONFIG.bytes_per_sample
+    probs = result.speech_probs
+    for idx, prob in enumerate(probs.probs):
+        window_start = probs.start_sample + idx * WINDOW - result.start_sample
+        if prob >= AUDIO_CONFIG.silero_threshold and window_start >= 0:
+            window = speech[window_start * bps : (window_start + WINDOW) * bps]
+            assert window in compacted
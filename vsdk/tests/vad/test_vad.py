@@ -0,0 +1,47 @@
+import time
+import wave
+from pathlib import Path
+from typing import List, Optional
+
+from tests.conversation.test_base import AUDIO_CONFIG
+from vsdk.vad.vad import VAD, VADResult, preload_vad
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+CHUNK = AUDIO_CONFIG.silero_samples_size_bytes
+
+
+def detect(vad: VAD, audio: bytes) -> List[Optional[VADResult]]:
+    return [vad.silero_iterator(audio[i : i + CHUNK]) for i in range(0, len(audio), CHUNK)]
+
+
+def test_first_call_after_preload_is_as_fast_as_steady_state():
+    preload_vad(AUDIO_CONFIG)
+    silence = b"\x00" * CHUNK * 30
+
+    start = time.perf_counter()
+    detect(VAD(id="first", audio_config=AUDIO_CONFIG), silence)
+    first = time.perf_counter() - start
+    vad = VAD(id="steady", audio_config=AUDIO_CONFIG)
+    detect(vad, silence)
+    start = time.perf_counter()
+    detect(vad, silence)
+    steady = time.perf_counter() - start
+
+    assert first < steady * 3 + 0.01
+
+
+def test_vads_of_concurrent_calls_do_not_share_model_state():
+    with wave.open(str(RESOURCES / "single_speech.wav"), "rb") as wav:
+        speech = wav.readframes(wav.getnframes())
+    speech = speech[: len(speech) - len(speech) % CHUNK]
+    expected = detect(VAD(id="alone", audio_config=AUDIO_CONFIG), speech)
+
+    first = VAD(id="first", audio_config=AUDIO_CONFIG)
+    second = VAD(id="second", audio_config=AUDIO_CONFIG)
+    interleaved = []
+    for i in range(0, len(speech), CHUNK):
+        interleaved.append(first.silero_iterator(speech[i : i + CHUNK]))
+        second.silero_iterator(speech[::-1][i : i + CHUNK])
+
+    assert any(expected)
+    assert interleaved == expected
@@ -0,0 +1,140 @@
+"""
+Turn artifact sinks.
+
+The result event sent to the transport carries only metrics and transcripts. Turn audio and the full
+result go to an artifact sink instead: submit only enqueues, a background task writes to disk.
+The queue is bounded, when the disk can't keep up artifacts are dropped rather than held in memory.
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from vsdk.domain import RespondToHumanResult
+
+logger = logging.getLogger(__name__)
+
+
+class TurnArtifact(BaseModel):
+    conversation_id: str
+    sequence: int
+    result: RespondToHumanResult
+
+
+class ArtifactSinkStats(BaseModel):
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+    bytes_written: int = 0
+    write_time: float = 0
+
+
+class BaseArtifactSink(ABC):
+    def __init__(self, max_queue: int = 32):
+        self.stats = ArtifactSinkStats()
+        self._queue: "asyncio.Queue[TurnArtifact]" = asyncio.Queue(maxsize=max_queue)
+        self._sequence = itertools.count()
+        self._worker: Optional[asyncio.Task[None]] = None
+
+    def submit(self, conversation_id: str, result: RespondToHumanResult) -> bool:
+        """Enqueue the turn for writing without waiting, False if it was dropped."""
+        artifact = TurnArtifact(
+            conversation_id=conversation_id,
+            sequence=next(self._sequence),
+            result=result,
+        )
+        try:
+            self._queue.put_nowait(artifact)
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            logger.warning(f"📦 Artifact queue full, dropped turn of {conversation_id}")
+            return False
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._write_loop(), name="artifact_sink")
+        return True
+
+    async def close(self) -> ArtifactSinkStats:
+        """Write what is queued and stop the writer."""
+        if self._worker is not None:
+            await self._queue.join()
+            self._worker.cancel()
+            self._worker = None
+        logger.info(
+            f"📦 Artifacts: {self.stats.written} written ({self.stats.bytes_written} bytes), "
+            f"{self.stats.dropped} dropped, {self.stats.failed} failed"
+        )
+        return self.stats
+
+    @abstractmethod
+    def write(self, artifact: TurnArtifact) -> int:
+        """Blocking write, runs in a worker thread. Returns bytes written."""
+        pass
+
+    async def _write_loop(self) -> None:
+        while True:
+            artifact = await self._queue.get()
+            start = time.monotonic()
+            try:
+                self.stats.bytes_written += await asyncio.to_thread(self.write, artifact)
+                self.stats.written += 1
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(f"📦 Writing artifact failed: {e}")
+            finally:
+                self.stats.write_time += time.monotonic() - start
+                self._queue.task_done()
+
+
+def _metadata(artifact: TurnArtifact) -> Dict[str, Any]:
+    return {
+        "conversation_id": artifact.conversation_id,
+        "sequence": artifact.sequence,
+        "result": artifact.result.metrics(),
+    }
+
+
+class DirectoryArtifactSink(BaseArtifactSink):
+    """`<directory>/<conversation id>/<sequence>.json` with the result and the audio next to it."""
+
+    def __init__(self, directory: str, max_queue: int = 32):
+        super().__init__(max_queue=max_queue)
+        self.directory = directory
+
+    def write(self, artifact: TurnArtifact) -> int:
+        conversation_dir = os.path.join(self.directory, artifact.conversation_id)
+        os.makedirs(conversation_dir, exist_ok=True)
+        name = os.path.join(conversation_dir, f"{artifact.sequence:06d}")
+
+        stt_result = artifact.result.stt_result
+        with open(f"{name}.{stt_result.speech_file_format}", "wb") as f:
+            f.write(stt_result.speech_file)
+        metadata = json.dumps(_metadata(artifact)).encode()
+        with open(f"{name}.json", "wb") as f:
+            f.write(metadata)
+        return len(stt_result.speech_file) + len(metadata)
+
+
+class AppendOnlyArtifactSink(BaseArtifactSink):
+    """One JSON line per turn, the audio base64 encoded in it."""
+
+    def __init__(self, path: str, max_queue: int = 32):
+        super().__init__(max_queue=max_queue)
+        self.path = path
+
+    def write(self, artifact: TurnArtifact) -> int:
+        stt_result = artifact.result.stt_result
+        record = _metadata(artifact)
+        record["speech_file"] = base64.b64encode(stt_result.speech_file).decode("utf-8")
+        record["speech_file_format"] = stt_result.speech_file_format
+        line = (json.dumps(record) + "\n").encode()
+        with open(self.path, "ab") as f:
+            f.write(line)
+        return len(line)
@@ -1,35 +1,80 @@
 import logging
+from typing import TYPE_CHECKING, Any, List, Optional
 
-from elevenlabs import ElevenLabs
-from groq import AsyncGroq
 from pydantic import BaseModel
 
+from vsdk.stt.encoders import PayloadEncoding
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class Config:
     class Eleven(BaseModel):
-        client: ElevenLabs
         model: str
         voice: str
         output_format: str
         language: str
         api_key: str
+        native_output_formats: List[str] = [
+            "pcm_8000",
+            "pcm_16000",
+            "pcm_22050",
+            "pcm_24000",
+            "pcm_44100",
+            "ulaw_8000",
+        ]
 
-        class Config:
-            arbitrary_types_allowed = True
+        base_url: str = "wss://api.elevenlabs.io"
+        # Warm streaming connections kept per voice/model/format, 0 connects on every turn
+        connection_pool_size: int = 0
+        # Provider closes idle connections after this (max 180s), pooled ones are recycled before
+        inactivity_timeout_s: int = 180
+
+        # Text chunking, see vsdk.tts.chunking: the first chunk goes out after a clause, a few words
+        # or a deadline, later chunks are whole sentences, buffered text is flushed when the LLM stalls
+        first_chunk_words: int = 4
+        first_chunk_deadline_ms: int = 300
+        idle_flush_ms: int = 400
+        max_chunk_chars: int = 250
 
     class Groq(BaseModel):
-        async_client: AsyncGroq
         transcription_model: str
         transcription_language: str
         audio_channels: int
         bytes_per_sample: int
         sample_rate: int
 
-        class Config:
-            arbitrary_types_allowed = True
+        request_timeout_s: float = 10
+        hedging: bool = False
+        hedge_percentile: float = 0.95
+        hedge_initial_delay_s: float = 1.0
+        warmup_connections: int = 2
+
+        # Upload encoding, see vsdk.stt.encoders: wav, ulaw_wav (lossy) or flac (lossless)
+        payload_encoding: PayloadEncoding = "wav"
+
+        # AsyncGroq client, built from api_key on first use unless passed in
+        api_key: Optional[str] = None
+        async_client: Optional[Any] = None
+
+        def client(self) -> "AsyncGroq":
+            if self.async_client is None:
+                from groq import AsyncGroq
+
+                from vsdk.stt.transport import create_pooled_http_client
+
+                self.async_client = AsyncGroq(
+                    api_key=self.api_key, http_client=create_pooled_http_client()
+                )
+            return self.async_client
+
+        async def aclose(self) -> None:
+            if self.async_client is not None:
+                await self.async_client.close()
 
     class Audio(BaseModel):
         sample_rate: int
@@ -43,3 +88,18 @@ class Config:
         silero_min_silence_duration_ms: int
 
         interruption_duration_ms: int
+
+        # Formats the transport can play, in preference order. Used to negotiate TTS output.
+        output_formats: List[str] = ["pcm_16000"]
+
+        # Agent audio is re-framed into fixed frames and sent at real-time rate plus a lead
+        outbound_frame_ms: int = 20
+        outbound_lead_ms: int = 200
+
+        # Restream repeats this much already heard audio, faded in, to avoid a click on resume
+        restream_crossfade_ms: int = 0
+
+        # Batch STT gets speech with edge silence trimmed to padding and pauses capped, opt-in
+        stt_compaction: bool = False
+        stt_compaction_padding_ms: int = 100
+        stt_compaction_max_pause_ms: int = 300
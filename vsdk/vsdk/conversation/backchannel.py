@@ -0,0 +1,192 @@
+"""
+Backchannel detection ("mhmm", "yeah", "ok").
+
+Short acknowledgements need no response, sending them through STT -> LLM -> TTS costs a provider
+round trip and cancels the response the agent is still preparing. Classifiers here run locally on
+the VAD output, so the decision is made before any provider is called.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from vsdk.vad.vad import VADResult
+
+logger = logging.getLogger(__name__)
+
+
+class BackchannelFeatures(BaseModel):
+    duration_ms: float
+    syllables: int
+
+    @classmethod
+    def extract(cls, speech: bytes, vad_result: VADResult) -> "BackchannelFeatures":
+        samples = np.frombuffer(speech[: len(speech) - len(speech) % 2], dtype=np.int16)
+        samples = samples.astype(np.float64)
+        return cls(
+            duration_ms=len(samples) * 1000 / vad_result.sample_rate,
+            syllables=count_syllables(samples, vad_result.sample_rate),
+        )
+
+
+class BaseBackchannelClassifier(ABC):
+    @abstractmethod
+    def is_backchannel(self, speech: bytes, vad_result: VADResult) -> bool:
+        """Whether the ended speech is an acknowledgement that needs no response."""
+        pass
+
+
+class BackchannelClassifier(BaseBackchannelClassifier):
+    """
+    Short, at most two syllable utterances that are closer to a backchannel template than to any
+    other template. Duration alone can't tell "mhmm" from "no", "stop" or "wait", so the keyword
+    model needs templates of those short words too, or a max_distance.
+    """
+
+    def __init__(
+        self,
+        keyword_model: "TemplateKeywordModel",
+        max_duration_ms: int = 700,
+        max_syllables: int = 2,
+        backchannel_labels: Tuple[str, ...] = ("backchannel",),
+    ):
+        labels = {label for label, _ in keyword_model.templates}
+        if labels <= set(backchannel_labels) and keyword_model.max_distance == float("inf"):
+            raise ValueError(
+                "Keyword model has only backchannel templates and no max_distance, "
+                "every short utterance would be ignored"
+            )
+        self.keyword_model = keyword_model
+        self.max_duration_ms = max_duration_ms
+        self.max_syllables = max_syllables
+        self.backchannel_labels = backchannel_labels
+
+    def is_backchannel(self, speech: bytes, vad_result: VADResult) -> bool:
+        features = BackchannelFeatures.extract(speech, vad_result)
+        if (
+            features.duration_ms > self.max_duration_ms
+            or features.syllables > self.max_syllables
+        ):
+            return False
+
+        label, distance = self.keyword_model.match(speech)
+        is_backchannel = label in self.backchannel_labels
+        logger.info(
+            f"🎙️ Short speech {features} matched '{label}' ({distance:.2f}), backchannel: {is_backchannel}"
+        )
+        return is_backchannel
+
+
+class TemplateKeywordModel:
+    """
+    Nearest template keyword spotter: MFCC features compared with dynamic time warping.
+    It is as good as its templates, record the short words of the speakers and channel it will
+    hear, and measure it on recordings that are not templates before relying on it.
+    """
+
+    def __init__(
+        self,
+        templates: Dict[str, List[bytes]],
+        sample_rate: int,
+        max_distance: float = float("inf"),
+    ):
+        self.sample_rate = sample_rate
+        self.max_distance = max_distance
+        self.templates = [
+            (label, mfcc(template, sample_rate))
+            for label, label_templates in templates.items()
+            for template in label_templates
+        ]
+
+    def match(self, speech: bytes) -> Tuple[Optional[str], float]:
+        """Label of the nearest template, None if no template is closer than max_distance."""
+        features = mfcc(speech, self.sample_rate)
+        best_label, best_distance = None, float("inf")
+        for label, template in self.templates:
+            distance = dtw_distance(features, template)
+            if distance < best_distance:
+                best_label, best_distance = label, distance
+        if best_distance > self.max_distance:
+            return None, best_distance
+        return best_label, best_distance
+
+
+def count_syllables(samples: NDArray[np.float64], sample_rate: int) -> int:
+    """Syllable nuclei estimate: peaks of the smoothed energy envelope well above its floor."""
+    hop = sample_rate // 100  # 10ms
+    frames = len(samples) // hop
+    if frames < 3:
+        return 0
+    energy = np.sqrt(np.mean(samples[: frames * hop].reshape(frames, hop) ** 2, axis=1))
+    envelope = np.convolve(energy, np.ones(5) / 5, mode="same")
+    threshold = envelope.min() + 0.5 * (envelope.max() - envelope.min())
+
+    syllables, in_peak = 0, False
+    for value in envelope:
+        if not in_peak and value > threshold:
+            syllables, in_peak = syllables + 1, True
+        elif in_peak and value < threshold * 0.7:
+            in_peak = False
+    return syllables
+
+
+def mfcc(
+    speech: bytes,
+    sample_rate: int,
+    n_mels: int = 20,
+    n_coefficients: int = 12,
+    frame_ms: int = 25,
+    hop_ms: int = 10,
+) -> NDArray[np.float64]:
+    """Mean normalized MFCCs, one row per frame."""
+    samples = np.frombuffer(speech[: len(speech) - len(speech) % 2], dtype=np.int16)
+    samples = samples.astype(np.float64) / 32768
+    frame, hop = sample_rate * frame_ms // 1000, sample_rate * hop_ms // 1000
+    if len(samples) < frame:
+        samples = np.pad(samples, (0, frame - len(samples)))
+    count = 1 + (len(samples) - frame) // hop
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop][:count]
+
+    n_fft = 1 << (frame - 1).bit_length()
+    spectrum = np.abs(np.fft.rfft(frames * np.hamming(frame), n=n_fft)) ** 2
+    mel_energies = np.log(spectrum @ _mel_filterbank(n_mels, n_fft, sample_rate).T + 1e-10)
+
+    k = np.arange(n_mels)
+    dct = np.cos(np.pi / n_mels * (k[None, :] + 0.5) * np.arange(1, n_coefficients + 1)[:, None])
+    coefficients = mel_energies @ dct.T
+    return coefficients - coefficients.mean(axis=0)
+
+
+def dtw_distance(a: NDArray[np.float64], b: NDArray[np.float64]) -> float:
+    """Dynamic time warping distance normalized by the path length bound."""
+    cost = np.linalg.norm(a[:, None, :] - b[None, :, :], axis=2)
+    accumulated = np.full((len(a) + 1, len(b) + 1), np.inf)
+    accumulated[0, 0] = 0
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            accumulated[i, j] = cost[i - 1, j - 1] + min(
+                accumulated[i - 1, j], accumulated[i, j - 1], accumulated[i - 1, j - 1]
+            )
+    return float(accumulated[-1, -1] / (len(a) + len(b)))
+
+
+def _mel_filterbank(n_mels: int, n_fft: int, sample_rate: int) -> NDArray[np.float64]:
+    def to_mel(hz: NDArray[np.float64]) -> NDArray[np.float64]:
+        return 2595 * np.log10(1 + hz / 700)
+
+    def to_hz(mel: NDArray[np.float64]) -> NDArray[np.float64]:
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    edges = to_hz(np.linspace(0, to_mel(np.array(sample_rate / 2)), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    filterbank = np.zeros((n_mels, len(bins)))
+    for m in range(n_mels):
+        left, center, right = edges[m], edges[m + 1], edges[m + 2]
+        rising = (bins - left) / (center - left)
+        falling = (right - bins) / (right - center)
+        filterbank[m] = np.maximum(0, np.minimum(rising, falling))
+    return filterbank
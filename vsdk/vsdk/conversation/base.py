@@ -2,12 +2,17 @@
 TODO This class needs refactoring!!! Mostly hacked audio processing here.
 """
 
+import asyncio
 import logging
 from asyncio import Task
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from vsdk.config import Config
+from vsdk.stt.base import BaseSTTSession, SpeechSegment
+from vsdk.tasks import TaskTracker
+from vsdk.tts.output_format import AudioFormat
+from vsdk.vad.compaction import compact_speech
 from vsdk.vad.vad import VADResult
 
 logger = logging.getLogger(__name__)
@@ -24,35 +29,191 @@ class ConversationState(Enum):
 
 
 class AgentSpeechChunk:
-    def __init__(self, audio: bytes, mark_id: str):
-        self.audio = audio
+    def __init__(self, start_sample: int, end_sample: int, mark_id: str):
+        self.start_sample = start_sample
+        self.end_sample = end_sample
         self.mark_id = mark_id
 
 
+class AgentAudioBuffer:
+    """
+    Agent audio that was produced but not framed and sent to the client yet.
+    Restreamed speech shares the buffer of the interrupted one, so audio that is still being
+    produced for the interrupted response ends up in the restream.
+    """
+
+    def __init__(self):
+        self.audio: bytes = b""
+        self.output_format: Optional[str] = None
+        self.finished = False
+        self._audio_added = asyncio.Event()
+        # Head of `audio` that is filler played while the response is late, not sent yet
+        self.filler_bytes = 0
+        self._filler_crossfade_ms = 0
+        self._response_started = False
+
+    def append(self, audio: bytes, output_format: Optional[str] = None):
+        if self.filler_bytes and audio:
+            audio = self._crossfade_filler(audio, output_format)
+        if output_format:
+            self.output_format = output_format
+        self._response_started = True
+        self.audio += audio
+        self._audio_added.set()
+
+    def add_filler(
+        self, audio: bytes, output_format: str, crossfade_ms: int = 0
+    ) -> bool:
+        """Fill the buffer with filler until response audio arrives, only before it did."""
+        if self._response_started or self.audio or self.finished:
+            return False
+        self.output_format = output_format
+        self.audio = audio
+        self.filler_bytes = len(audio)
+        self._filler_crossfade_ms = crossfade_ms
+        self._audio_added.set()
+        return True
+
+    def drop_filler(self):
+        self.audio = self.audio[self.filler_bytes :]
+        self.filler_bytes = 0
+
+    def _crossfade_filler(self, audio: bytes, output_format: Optional[str]) -> bytes:
+        """Cut the unsent filler short, it fades out while the response fades in."""
+        filler_format = AudioFormat.parse(self.output_format)  # type: ignore[arg-type]
+        filler = self.audio[: self.filler_bytes]
+        self.drop_filler()
+        if output_format and output_format != filler_format.name:
+            return audio
+        return filler_format.crossfade(
+            filler[: filler_format.bytes_for_ms(self._filler_crossfade_ms)], audio
+        )
+
+    def prepend(self, audio: bytes):
+        self.audio = audio + self.audio
+        self._audio_added.set()
+
+    def finish(self):
+        self.finished = True
+        self._audio_added.set()
+
+    def take(self, max_bytes: int, sample_width: int) -> bytes:
+        size = min(max_bytes, len(self.audio))
+        size -= size % sample_width
+        taken, self.audio = self.audio[:size], self.audio[size:]
+        self.filler_bytes = max(0, self.filler_bytes - size)
+        if self.finished and len(self.audio) < sample_width:
+            self.audio = b""
+        return taken
+
+    async def wait_for_audio(self, min_bytes: int = 1):
+        while len(self.audio) < min_bytes and not self.finished:
+            self._audio_added.clear()
+            await self._audio_added.wait()
+
+
 class AgentResponseTask:
-    def __init__(self, human_speech: bytes, task: Task[None]):
+    def __init__(
+        self,
+        human_speech: bytes,
+        task: Task[None],
+        segments: Optional[List[SpeechSegment]] = None,
+    ):
         self.human_speech = human_speech
+        self.segments = segments if segments is not None else [SpeechSegment(human_speech)]
         self.task = task
 
 
 class AgentSpeech:
-    def __init__(self, speech_chunks: List[AgentSpeechChunk], pointer: int):
+    """
+    Audio sent to the client during one agent speech, kept as one contiguous sample timeline.
+    Chunks only hold sample positions of the marks, so restream can resume exactly where
+    playback acknowledged by the client ended.
+    """
+
+    def __init__(
+        self,
+        speech_chunks: List[AgentSpeechChunk],
+        pointer: int,
+        output_format: str,
+        audio_buffer: Optional[AgentAudioBuffer] = None,
+    ):
         self.speech_chunks = speech_chunks
         self.pointer = 0
         self.stop_sent_at = None
+        self.audio_buffer = audio_buffer or AgentAudioBuffer()
+
+        self.audio: bytes = b""
+        self.default_output_format = output_format
+        self.acknowledged_sample = 0
+        self.stop_sent_at_sample = 0
+        self.restream_bytes_saved = 0
+        # Filler sent at the start of the speech, never restreamed
+        self.filler_samples = 0
+
+    @property
+    def output_format(self) -> AudioFormat:
+        return AudioFormat.parse(
+            self.audio_buffer.output_format or self.default_output_format
+        )
+
+    @property
+    def samples_count(self) -> int:
+        return len(self.audio) // self.output_format.bytes_per_sample
+
+    def append(self, audio: bytes, mark_id: str, filler_bytes: int = 0):
+        start_sample = self.samples_count
+        self.audio += audio
+        self.filler_samples += filler_bytes // self.output_format.bytes_per_sample
+        self.speech_chunks.append(
+            AgentSpeechChunk(
+                start_sample=start_sample,
+                end_sample=self.samples_count,
+                mark_id=mark_id,
+            )
+        )
 
     def mark(self, chunk_idx: int):
         self.pointer = chunk_idx
+        if chunk_idx < len(self.speech_chunks):
+            self.acknowledged_sample = max(
+                self.acknowledged_sample, self.speech_chunks[chunk_idx].end_sample
+            )
 
     def stop_sent(self):
-        logger.debug(f"🤖🗣️Stop sent at {self.pointer}")
+        logger.debug(
+            f"🤖🗣️Stop sent at {self.pointer}, sample {self.acknowledged_sample}"
+        )
         if self.stop_sent_at is not None:
             logger.error("Stop sent multiple times, something is wrong")
 
         self.stop_sent_at = self.pointer
+        self.stop_sent_at_sample = self.acknowledged_sample
 
-    def get_unspoken(self):
-        return self.speech_chunks[self.stop_sent_at :]
+    def get_unspoken(self, crossfade_ms: int = 0) -> bytes:
+        """
+        Audio after the last sample acknowledged before stop was sent.
+        With crossfade, a few already heard samples are repeated and faded in.
+        """
+        crossfade_samples = self.output_format.sample_rate * crossfade_ms // 1000
+        resume_sample = max(
+            self.filler_samples, self.stop_sent_at_sample - crossfade_samples
+        )
+        unspoken = self.audio[resume_sample * self.output_format.bytes_per_sample :]
+
+        # Restream used to start from the beginning of the last acknowledged chunk
+        if self.stop_sent_at is not None and self.stop_sent_at < len(
+            self.speech_chunks
+        ):
+            chunk_start_sample = self.speech_chunks[self.stop_sent_at].start_sample
+            self.restream_bytes_saved = (
+                max(0, resume_sample - chunk_start_sample)
+                * self.output_format.bytes_per_sample
+            )
+
+        return self.output_format.fade_in(
+            unspoken, samples=self.stop_sent_at_sample - resume_sample
+        )
 
     def was_interrupted(self):
         logger.debug(
@@ -70,9 +231,10 @@ class AgentSpeech:
 
 
 class AgentVoice:
-    def __init__(self, id: str):
+    def __init__(self, id: str, audio_config: Config.Audio):
         self.speeches: List[AgentSpeech] = []
         self.id = id
+        self.audio_config = audio_config
 
     @property
     def last_speech(self):
@@ -82,7 +244,7 @@ class AgentVoice:
     def speech_exists(self):
         return len(self.speeches) > 0
 
-    def chunk_sent(self, chunk: bytes):
+    def chunk_sent(self, chunk: bytes, filler_bytes: int = 0):
         mark_id = (
             self.id
             + "_"
@@ -90,9 +252,7 @@ class AgentVoice:
             + "_"
             + str(self.last_speech_chunks_count)
         )
-        self.speeches[-1].speech_chunks.append(
-            AgentSpeechChunk(audio=chunk, mark_id=mark_id)
-        )
+        self.speeches[-1].append(audio=chunk, mark_id=mark_id, filler_bytes=filler_bytes)
         return mark_id
 
     @property
@@ -110,7 +270,25 @@ class AgentVoice:
         self.last_speech.mark(chunk_idx)
 
     def get_unspoken_chunks(self):
-        return self.last_speech.get_unspoken()
+        return self.last_speech.get_unspoken(
+            crossfade_ms=self.audio_config.restream_crossfade_ms
+        )
+
+    def restream(self) -> AgentSpeech:
+        """
+        Put unspoken audio of the interrupted speech back in front of its buffer
+        and start a new speech that continues from there.
+        """
+        interrupted_speech = self.last_speech
+        unspoken_audio = self.get_unspoken_chunks()
+        # Filler is only for the silence before the response, it is not resumed
+        interrupted_speech.audio_buffer.drop_filler()
+        interrupted_speech.audio_buffer.prepend(unspoken_audio)
+        logger.info(
+            f"🤖🗣️ Restreaming {len(unspoken_audio)} bytes of unspoken audio and {len(interrupted_speech.audio_buffer.audio) - len(unspoken_audio)} bytes not sent yet. "
+            f"Resumed from sample {interrupted_speech.stop_sent_at_sample}, saved {interrupted_speech.restream_bytes_saved} bytes of already heard audio."
+        )
+        return self.new_speech_started(audio_buffer=interrupted_speech.audio_buffer)
 
     def is_interrupted(self):
         logger.debug(
@@ -132,11 +310,24 @@ class AgentVoice:
 
         return is_agent_speaking
 
-    def new_speech_started(self):
-        self.speeches.append(AgentSpeech(speech_chunks=[], pointer=0))
+    def is_current(self, speech: AgentSpeech) -> bool:
+        return self.speech_exists and self.last_speech is speech
+
+    def new_speech_started(
+        self, audio_buffer: Optional[AgentAudioBuffer] = None
+    ) -> AgentSpeech:
+        self.speeches.append(
+            AgentSpeech(
+                speech_chunks=[],
+                pointer=0,
+                output_format=self.audio_config.output_formats[0],
+                audio_buffer=audio_buffer,
+            )
+        )
         logger.debug(
             f"🤖🗣️ New agent speech started. Currently {self.speeches_count} speeches."
         )
+        return self.last_speech
 
 
 class HumanVoice:
@@ -146,6 +337,14 @@ class HumanVoice:
         self._new_pcm_audio: bytes = b""
         self._last_human_speech: bytes = b""
         self._human_speech_without_response: bytes = b""
+        # Utterances of the above, each transcribed (and cached) separately
+        self._last_segment = SpeechSegment(b"")
+        self._segments: List[SpeechSegment] = []
+
+        # Streaming transcription of the speech in progress and of the last ended speech
+        self._stt_session: Optional[BaseSTTSession] = None
+        self._stt_session_pushed_bytes = 0
+        self._last_stt_session: Optional[BaseSTTSession] = None
 
     # Human Voice
     def audio_received(self, pcm_audio: bytes) -> None:
@@ -170,6 +369,39 @@ class HumanVoice:
         )
         return data_to_process
 
+    def start_transcription(self, stt_session: BaseSTTSession, from_sample: int):
+        logger.debug(f"👩🏼🗣️ Streaming transcription started from sample {from_sample}")
+        self._stt_session = stt_session
+        self._stt_session_pushed_bytes = from_sample * self.audio_config.bytes_per_sample
+
+    def is_transcribing(self) -> bool:
+        return self._stt_session is not None
+
+    def transcribe_processed_audio(self, to_sample: Optional[int] = None):
+        """Push audio already checked by VAD (up to to_sample) to the streaming transcription."""
+        if self._stt_session is None:
+            return
+        end_byte = len(self._pcm_audio_buffer) - len(self._new_pcm_audio)
+        if to_sample is not None:
+            end_byte = min(end_byte, to_sample * self.audio_config.bytes_per_sample)
+        if end_byte > self._stt_session_pushed_bytes:
+            self._stt_session.push(
+                self._pcm_audio_buffer[self._stt_session_pushed_bytes : end_byte]
+            )
+            self._stt_session_pushed_bytes = end_byte
+
+    def take_stt_session(self) -> Optional[BaseSTTSession]:
+        """Streaming transcription of the last segment of the speech prepared for interpretation."""
+        stt_session, self._last_stt_session = self._last_stt_session, None
+        return stt_session
+
+    def discard_stt_sessions(self):
+        for stt_session in (self._stt_session, self._last_stt_session):
+            if stt_session:
+                stt_session.cancel()
+        self._stt_session = None
+        self._last_stt_session = None
+
     def human_speech_ended(self, speech_result: VADResult):
         logger.debug("👩🏼🗣️ Human speech ended. ")  # todo add more logs
         if speech_result.end_sample is not None:
@@ -177,6 +409,13 @@ class HumanVoice:
                 from_sample=speech_result.start_sample,
                 to_sample=speech_result.end_sample,
             )
+            self._last_segment = SpeechSegment(
+                self._compact(self._last_human_speech, speech_result)
+            )
+            self.transcribe_processed_audio(to_sample=speech_result.end_sample)
+            if self._last_stt_session:
+                self._last_stt_session.cancel()
+            self._last_stt_session, self._stt_session = self._stt_session, None
             self.clear_human_speech()
         else:
             logger.error(
@@ -184,7 +423,9 @@ class HumanVoice:
             )
 
     def prepare_human_speech_for_interpretation(
-        self, human_speech_without_response_buffers: List[bytes]
+        self,
+        human_speech_without_response_buffers: List[bytes],
+        previous_segments: Optional[List[SpeechSegment]] = None,
     ) -> bytes:
         """
         Prepare human speech for interpretation by adding all previous human speeches and last human speech
@@ -193,6 +434,12 @@ class HumanVoice:
         """
         logger.debug("👩🏼🗣Preparing human speech for interpretation.")
 
+        if previous_segments is None:
+            previous_segments = [
+                SpeechSegment(speech) for speech in human_speech_without_response_buffers
+            ]
+        self._segments = previous_segments + [self._last_segment]
+
         if human_speech_without_response_buffers:
             human_speech_without_response = (
                 (b"\x00" * 2 * 80).join(human_speech_without_response_buffers)
@@ -211,6 +458,23 @@ class HumanVoice:
     def get_human_speech_without_response(self):
         return self._human_speech_without_response
 
+    def get_last_human_speech(self) -> bytes:
+        return self._last_human_speech
+
+    def get_speech_segments(self) -> List[SpeechSegment]:
+        """Utterances of the speech prepared for interpretation, compacted for batch STT."""
+        return self._segments
+
+    def _compact(self, speech: bytes, speech_result: VADResult) -> bytes:
+        if not self.audio_config.stt_compaction:
+            return speech
+        return compact_speech(
+            speech,
+            from_sample=speech_result.start_sample,
+            speech_probs=speech_result.speech_probs,
+            audio_config=self.audio_config,
+        )
+
     def _get_audio(self, from_sample: int, to_sample: int):
         logger.info(
             f"👩🏼🗣️ Get audio requested, Requested audio length: {(to_sample - from_sample) // self.audio_config.bytes_per_sample / self.audio_config.sample_rate}s. pcm_audio_buffer length: {(len(self._pcm_audio_buffer) // self.audio_config.bytes_per_sample) / self.audio_config.sample_rate}s"
@@ -236,9 +500,11 @@ class Conversation:
 
         self.agent_response_tasks: List[AgentResponseTask] = []
 
-        self.agent_voice = AgentVoice(id)
+        self.agent_voice = AgentVoice(id, audio_config=audio_config)
 
         self.audio_interpreter_loop: Task[None] | None = None
+        # Tasks of the conversation, reports teardown latency and leaked tasks
+        self.tasks = TaskTracker(id)
 
     def audio_received(self, pcm_audio: bytes) -> None:
         self.human_voice.audio_received(pcm_audio)
@@ -256,17 +522,50 @@ class Conversation:
         return self.human_voice.is_new_audio_ready_to_process()
 
     def get_human_speech_without_response(self):
-        human_speech_without_response_buffers = self._cancel_unfinished_tasks()
+        cancelled_tasks = self._cancel_unfinished_tasks()
         return self.human_voice.prepare_human_speech_for_interpretation(
-            human_speech_without_response_buffers=human_speech_without_response_buffers
+            human_speech_without_response_buffers=[
+                task.human_speech for task in cancelled_tasks
+            ],
+            previous_segments=[
+                segment for task in cancelled_tasks for segment in task.segments
+            ],
         )
 
+    def get_speech_segments(self) -> List[SpeechSegment]:
+        return self.human_voice.get_speech_segments()
+
+    def get_last_human_speech(self) -> bytes:
+        return self.human_voice.get_last_human_speech()
+
+    # Streaming transcription
+    def start_transcription(self, stt_session: BaseSTTSession, from_sample: int):
+        self.human_voice.start_transcription(stt_session, from_sample)
+
+    def is_transcribing(self) -> bool:
+        return self.human_voice.is_transcribing()
+
+    def transcribe_processed_audio(self, to_sample: Optional[int] = None):
+        self.human_voice.transcribe_processed_audio(to_sample)
+
+    def take_stt_session(self) -> Optional[BaseSTTSession]:
+        return self.human_voice.take_stt_session()
+
+    def discard_stt_sessions(self):
+        self.human_voice.discard_stt_sessions()
+
     # Audio OUT
-    def new_agent_speech_start(self):
-        self.agent_voice.new_speech_started()
+    def new_agent_speech_start(self) -> AgentSpeech:
+        return self.agent_voice.new_speech_started()
+
+    def restream_agent_speech(self) -> AgentSpeech:
+        return self.agent_voice.restream()
 
-    def agent_speech_sent(self, audio_chunk: bytes) -> str:
-        return self.agent_voice.chunk_sent(audio_chunk)
+    def is_agent_speech_current(self, speech: AgentSpeech) -> bool:
+        return self.agent_voice.is_current(speech)
+
+    def agent_speech_sent(self, audio_chunk: bytes, filler_bytes: int = 0) -> str:
+        return self.agent_voice.chunk_sent(audio_chunk, filler_bytes=filler_bytes)
 
     def agent_speech_marked(self, speech_idx: int, chunk_idx: int):
         self.agent_voice.mark_received(speech_idx, chunk_idx)
@@ -283,19 +582,26 @@ class Conversation:
     def is_agent_speaking(self) -> bool:
         return self.agent_voice.is_speaking()
 
-    def add_agent_response_task(self, task: Task[None], invoked_with_speech: bytes):
+    def add_agent_response_task(
+        self,
+        task: Task[None],
+        invoked_with_speech: bytes,
+        segments: Optional[List[SpeechSegment]] = None,
+    ):
         logger.debug("🧠 Adding agent response task.")
         self.agent_response_tasks.append(
-            AgentResponseTask(task=task, human_speech=invoked_with_speech)
+            AgentResponseTask(
+                task=task, human_speech=invoked_with_speech, segments=segments
+            )
         )
 
-    def _cancel_unfinished_tasks(self) -> List[bytes]:
+    def _cancel_unfinished_tasks(self) -> List[AgentResponseTask]:
         """
-        Cancel all unfinished tasks and return their human_speech
+        Cancel all unfinished tasks and return them
         :return:
         """
         logger.debug("🧠 Cancelling unfinished tasks.")
-        cancelled_speeches: list[bytes] = []
+        cancelled_tasks: list[AgentResponseTask] = []
         for agent_response_task in self.agent_response_tasks:
             if (
                 not agent_response_task.task.done()
@@ -304,14 +610,20 @@ class Conversation:
                 logger.info(
                     "Agent task not done. Cancelling task and adding to the buffer."
                 )
-                agent_response_task.task.cancel()
-                cancelled_speeches.append(agent_response_task.human_speech)
-        return cancelled_speeches
+                self.tasks.cancel(agent_response_task.task)
+                cancelled_tasks.append(agent_response_task)
+        # Cancelled speeches are merged into the new task, finished ones were responded to.
+        # Keeping them would merge the same speech again on the next cancellation.
+        self.agent_response_tasks = []
+        return cancelled_tasks
 
     # Conversation management
 
     def end_conversation(self):
         logger.debug("💬 Ending conversation.")
+        self.discard_stt_sessions()
+        for agent_response_task in self.agent_response_tasks:
+            self.tasks.cancel(agent_response_task.task)
         if self.audio_interpreter_loop:
             self.audio_interpreter_loop.cancel()
         else:
@@ -1,5 +1,5 @@
 import base64
-from typing import Literal, Union
+from typing import Any, Dict, Literal, Union
 
 from pydantic import BaseModel, field_serializer
 
@@ -31,9 +31,14 @@ class ResultEvent(BaseModel):
     type: Literal["result"] = "result"
     result: RespondToHumanResult
 
+    @field_serializer("result", when_used="json")
+    def serialize_metrics(self, result: RespondToHumanResult) -> Dict[str, Any]:
+        return result.metrics()
+
 
 class RestreamAudioEvent(BaseModel):
     type: Literal["start_restream"] = "start_restream"
+    bytes_saved: int = 0
 
 
 class StartRespondingEvent(BaseModel):
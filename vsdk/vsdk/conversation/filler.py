@@ -0,0 +1,77 @@
+"""
+Filler audio ("mm, let me see") for late responses.
+
+When the first response audio has not arrived `delay_ms` after the turn started, a short phrase
+synthesized ahead of time is played so the caller does not sit in silence. The response is
+crossfaded in behind the filler as soon as it arrives, restream never replays the filler.
+"""
+
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from vsdk.tts.base import BaseTTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PHRASES = ("Mm, let me see.", "Hmm, one moment.", "Okay, let me check.")
+
+
+class FillerClip(BaseModel):
+    phrase: str
+    audio: bytes
+    output_format: str
+
+
+class FillerAudio:
+    def __init__(
+        self,
+        phrases: Sequence[str] = DEFAULT_PHRASES,
+        delay_ms: int = 600,
+        crossfade_ms: int = 60,
+    ):
+        self.phrases = list(phrases)
+        self.delay_ms = delay_ms
+        self.crossfade_ms = crossfade_ms
+        self._clips: Dict[str, List[FillerClip]] = {}
+        self._next = 0
+
+    @property
+    def output_formats(self) -> List[str]:
+        return list(self._clips)
+
+    async def prepare(self, tts: BaseTTS) -> None:
+        """
+        Synthesize the phrases once, in the format the TTS produces for its transport.
+        With CachedTTS in front of the provider, later startups read them from its disk cache.
+        """
+        for phrase in self.phrases:
+            audio = b""
+            output_format: Optional[str] = None
+            async for chunk in tts(_single(phrase)):
+                audio += chunk.audio
+                output_format = chunk.output_format or output_format
+            if not audio or output_format is None:
+                logger.warning(f"🤔 No filler audio for '{phrase}'")
+                continue
+            self._clips.setdefault(output_format, []).append(
+                FillerClip(phrase=phrase, audio=audio, output_format=output_format)
+            )
+        logger.info(f"🤔 Filler audio ready for {self.output_formats}")
+
+    def add(self, clip: FillerClip) -> None:
+        self._clips.setdefault(clip.output_format, []).append(clip)
+
+    def pick(self, output_formats: Sequence[str]) -> Optional[FillerClip]:
+        """Next clip playable by the transport, phrases take turns so repeats are less obvious."""
+        for output_format in output_formats:
+            clips = self._clips.get(output_format)
+            if clips:
+                self._next += 1
+                return clips[self._next % len(clips)]
+        return None
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
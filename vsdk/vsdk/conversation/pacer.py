@@ -0,0 +1,47 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class AudioPacer:
+    """
+    Releases fixed duration agent audio frames at real-time rate plus a small lead.
+
+    The client never holds more than `lead_ms` of audio that was not played yet, so
+    a barge-in `clear` throws away little audio and marks follow playback closely.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int,
+        lead_ms: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        """:param clock: seconds, monotonic. clock and sleep are replaced by tests"""
+        self.frame_ms = frame_ms
+        self.lead_ms = lead_ms
+        self.clock = clock
+        self.sleep = sleep
+        self._started_at: float | None = None
+        self._scheduled_ms = 0.0
+
+    async def wait_for_slot(self) -> None:
+        now = self.clock()
+        if self._started_at is None:
+            self._started_at = now
+        elapsed_ms = (now - self._started_at) * 1000
+
+        if self._scheduled_ms < elapsed_ms:
+            # Audio came slower than real-time and the client ran dry. Start counting from now.
+            self._scheduled_ms = elapsed_ms
+
+        ahead_ms = self._scheduled_ms - elapsed_ms - self.lead_ms
+        if ahead_ms > 0:
+            await self.sleep(ahead_ms / 1000)
+
+    def frame_sent(self, frame_duration_ms: float) -> None:
+        self._scheduled_ms += frame_duration_ms
@@ -1,10 +1,12 @@
 import asyncio
 import base64
 import logging
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, List
 
+from vsdk.artifacts import BaseArtifactSink
 from vsdk.config import Config
-from vsdk.conversation.base import Conversation, ConversationState
+from vsdk.conversation.backchannel import BaseBackchannelClassifier
+from vsdk.conversation.base import AgentSpeech, Conversation, ConversationState
 from vsdk.conversation.domain import (
     ConversationEvent,
     MarkEvent,
@@ -14,7 +16,13 @@ from vsdk.conversation.domain import (
     StartRespondingEvent,
     StopSpeakingEvent,
 )
+from vsdk.conversation.filler import FillerAudio
+from vsdk.conversation.pacer import AudioPacer
 from vsdk.domain import RespondToHumanResult
+from vsdk.stt.base import BaseStreamingSTT, BaseSTTSession, SpeechSegment
+from vsdk.tasks import TeardownStats, aclose_iterator, cancel_and_wait
+from vsdk.tts.output_format import AudioFormat
+from vsdk.ttt.gate import GenerationGate
 from vsdk.vad.vad import VAD, VADResult
 from vsdk.voice_agent import VoiceAgent
 
@@ -28,16 +36,32 @@ class ConversationOrchestrator:
         callback: Callable[[ConversationEvent], Awaitable[None]],
         voice_agent: VoiceAgent,
         audio_config: Config.Audio,
+        backchannel_classifier: BaseBackchannelClassifier | None = None,
+        filler: FillerAudio | None = None,
+        artifact_sink: BaseArtifactSink | None = None,
+        vad: VAD | None = None,
     ):
+        """
+        :param vad: VAD of the conversation, built here if not given. Building it may load the
+            silero model or wait for the warmup holding it, callers on the event loop build it in
+            a worker thread
+        """
         self.voice_agent = voice_agent
         self.audio_config = audio_config
+        self.backchannel_classifier = backchannel_classifier
+        self.filler = filler
+        self.artifact_sink = artifact_sink
         self.conversation = Conversation(id=conversation_id, audio_config=audio_config)
 
-        self.conversation.audio_interpreter_loop = asyncio.create_task(
-            self._conversation_turn_manager()
+        self.conversation.audio_interpreter_loop = self.conversation.tasks.create_task(
+            self._conversation_turn_manager(), name="turn_manager"
         )
         self.callback = callback
-        self.vad = VAD(id=conversation_id, audio_config=audio_config)
+        self.vad = vad or VAD(id=conversation_id, audio_config=audio_config)
+        self.restream_task: asyncio.Task[None] | None = None
+        # Gate of the latest response, paused while the human talks over the agent
+        self.generation_gate: GenerationGate | None = None
+        self.teardown_task: asyncio.Task[TeardownStats] | None = None
 
     def audio_received(self, pcm_audio: bytes):
         self.conversation.audio_received(pcm_audio)
@@ -47,7 +71,14 @@ class ConversationOrchestrator:
 
     # todo this should be done on orchestrator
     def end_conversation(self):
+        if self.restream_task:
+            self.restream_task.cancel()
+        if self.generation_gate:
+            self.generation_gate.tear_down()
         self.conversation.end_conversation()
+        self.voice_agent.end_conversation(self.conversation.id)
+        # Waits for the cancelled tasks and logs teardown latency and leaked tasks
+        self.teardown_task = asyncio.create_task(self.conversation.tasks.close())
 
     async def _conversation_turn_manager(self):
         try:
@@ -56,6 +87,8 @@ class ConversationOrchestrator:
                     self.conversation.is_new_audio_ready_to_process()
                 ):  # todo add queue and wait here for new audio ready to process
                     vad_result = self._check_for_speech()
+                    if vad_result is not None:
+                        self._transcribe_human_speech(vad_result)
                     if vad_result is not None and vad_result.ended:
                         self.conversation.human_speech_ended(vad_result)
                     conversation_state = self.conversation.get_conversation_state(
@@ -72,30 +105,53 @@ class ConversationOrchestrator:
 
                         case ConversationState.BOTH_SPEAKING:
                             self.conversation.stop_speaking_agent()
+                            if self.generation_gate:
+                                self.generation_gate.pause()
                             await self.callback(StopSpeakingEvent())
 
                         case ConversationState.SHORT_INTERRUPTION_DURING_AGENT_SPEAKING:
-                            await self._restream_audio(
-                                self.conversation, self.callback
-                            )  # todo should be done on another task?
+                            if self.generation_gate:
+                                self.generation_gate.resume()
+                            # Restream is paced in real-time, so it can't block the turn manager
+                            self.restream_task = self.conversation.tasks.create_task(
+                                self._restream_audio(self.conversation, self.callback),
+                                name="restream",
+                            )
                             self.conversation.clear_human_speech()  # todo this forgets what was the short interruption "yes" / "no". For now it is ok
+                            self.conversation.discard_stt_sessions()
+
+                        case ConversationState.SHORT_SPEECH if self._is_backchannel(
+                            vad_result
+                        ):
+                            # Acknowledgement like "mhmm", the agent keeps preparing its response
+                            if stt_session := self.conversation.take_stt_session():
+                                stt_session.cancel()
 
                         case (
                             ConversationState.LONG_INTERRUPTION_DURING_AGENT_SPEAKING
                             | ConversationState.SHORT_SPEECH
                             | ConversationState.LONG_SPEECH
                         ):
+                            if self.generation_gate:
+                                self.generation_gate.tear_down()
                             human_speech = (
                                 self.conversation.get_human_speech_without_response()
                             )
+                            segments = self.conversation.get_speech_segments()
+                            self.generation_gate = GenerationGate()
                             self.conversation.add_agent_response_task(
-                                task=asyncio.create_task(
+                                task=self.conversation.tasks.create_task(
                                     self._handle_respond_to_human(
                                         human_speech,
                                         self.callback,
-                                    )
+                                        stt_session=self.conversation.take_stt_session(),
+                                        speech_segments=segments,
+                                        generation_gate=self.generation_gate,
+                                    ),
+                                    name="agent_response",
                                 ),
                                 invoked_with_speech=human_speech,
+                                segments=segments,
                             )
 
                         case _:
@@ -109,30 +165,43 @@ class ConversationOrchestrator:
         self,
         human_speech: bytes,
         callback: Callable[[ConversationEvent], Awaitable[None]],
+        stt_session: BaseSTTSession | None = None,
+        speech_segments: List[SpeechSegment] | None = None,
+        generation_gate: GenerationGate | None = None,
     ):
         try:
             result: RespondToHumanResult = RespondToHumanResult.empty()
 
             await callback(StartRespondingEvent())
-            self.conversation.new_agent_speech_start()
-
-            async for chunk in self.voice_agent.respond_to_human(
-                human_speech=human_speech,
-                id=self.conversation.id,
-                callback=lambda x: result.update(x),
-                audio_config=self.audio_config,
-            ):
-                await callback(
-                    MediaEvent(
-                        audio=chunk.audio,
-                        base64_audio=chunk.base64_audio,
-                        sid=self.conversation.id,
-                    )
-                )
-                mark_id = self.conversation.agent_speech_sent(chunk.audio)
+            speech = self.conversation.new_agent_speech_start()
 
-                await callback(MarkEvent(mark_id=mark_id, sid=self.conversation.id))
+            producer = self.conversation.tasks.create_task(
+                self._produce_agent_speech(
+                    human_speech,
+                    speech,
+                    result,
+                    stt_session,
+                    speech_segments,
+                    generation_gate,
+                ),
+                name="agent_speech_producer",
+            )
+            filler = (
+                self.conversation.tasks.create_task(
+                    self._play_filler(speech, result), name="filler"
+                )
+                if self.filler
+                else None
+            )
+            try:
+                await self._stream_agent_speech(speech, callback)
+                await producer
+            finally:
+                await cancel_and_wait([producer, filler])
 
+            if self.artifact_sink:
+                # Turn audio is written in the background, the event carries only metrics
+                self.artifact_sink.submit(self.conversation.id, result)
             await callback(ResultEvent(result=result))
         except Exception as e:
             logger.error(
@@ -140,34 +209,160 @@ class ConversationOrchestrator:
                 exc_info=True,
             )
 
+    async def _produce_agent_speech(
+        self,
+        human_speech: bytes,
+        speech: AgentSpeech,
+        result: RespondToHumanResult,
+        stt_session: BaseSTTSession | None = None,
+        speech_segments: List[SpeechSegment] | None = None,
+        generation_gate: GenerationGate | None = None,
+    ):
+        audio_buffer = speech.audio_buffer
+        response = self.voice_agent.respond_to_human(
+            human_speech=human_speech,
+            id=self.conversation.id,
+            callback=lambda x: result.update(x),
+            audio_config=self.audio_config,
+            stt_session=stt_session,
+            speech_segments=speech_segments,
+            generation_gate=generation_gate,
+        )
+        try:
+            async for chunk in response:
+                audio_buffer.append(chunk.audio, output_format=chunk.output_format)
+        finally:
+            audio_buffer.finish()
+            await aclose_iterator(response)
+
+    async def _play_filler(self, speech: AgentSpeech, result: RespondToHumanResult):
+        """Fill the silence with a filler phrase if no response audio came in time."""
+        assert self.filler is not None
+        audio_buffer = speech.audio_buffer
+        try:
+            await asyncio.wait_for(
+                audio_buffer.wait_for_audio(min_bytes=1),
+                timeout=self.filler.delay_ms / 1000,
+            )
+            return
+        except asyncio.TimeoutError:
+            pass
+        if speech.was_interrupted() or not self.conversation.is_agent_speech_current(
+            speech
+        ):
+            return
+        clip = self.filler.pick(self.audio_config.output_formats)
+        if clip is None:
+            return
+        if audio_buffer.add_filler(
+            clip.audio, clip.output_format, crossfade_ms=self.filler.crossfade_ms
+        ):
+            output_format = AudioFormat.parse(clip.output_format)
+            result.filler_ms = (
+                len(clip.audio) / output_format.bytes_per_sample / output_format.sample_rate
+            ) * 1000
+            logger.info(f"🤔 Response is late, playing filler '{clip.phrase}'")
+
+    async def _stream_agent_speech(
+        self,
+        speech: AgentSpeech,
+        callback: Callable[[ConversationEvent], Awaitable[None]],
+    ):
+        """
+        Send speech audio in fixed duration frames, paced at real-time rate, each followed by a mark.
+        Stops as soon as the speech gets interrupted or replaced by another speech.
+        Audio that was not sent stays in the speech buffer.
+        """
+        pacer = AudioPacer(
+            frame_ms=self.audio_config.outbound_frame_ms,
+            lead_ms=self.audio_config.outbound_lead_ms,
+        )
+        audio_buffer = speech.audio_buffer
+
+        def should_stop() -> bool:
+            return speech.was_interrupted() or not (
+                self.conversation.is_agent_speech_current(speech)
+            )
+
+        def audio_format() -> AudioFormat:
+            return AudioFormat.parse(
+                audio_buffer.output_format or self.audio_config.output_formats[0]
+            )
+
+        while True:
+            await audio_buffer.wait_for_audio(min_bytes=audio_format().bytes_per_sample)
+            if should_stop():
+                return
+            await pacer.wait_for_slot()
+            if should_stop():
+                return
+
+            frame_format = audio_format()
+            filler_bytes = audio_buffer.filler_bytes
+            frame = audio_buffer.take(
+                max_bytes=frame_format.bytes_for_ms(pacer.frame_ms),
+                sample_width=frame_format.bytes_per_sample,
+            )
+            if not frame:
+                if audio_buffer.finished:
+                    return
+                continue
+
+            mark_id = self.conversation.agent_speech_sent(
+                frame, filler_bytes=min(filler_bytes, len(frame))
+            )
+            await callback(
+                MediaEvent(
+                    audio=frame,
+                    base64_audio=base64.b64encode(frame).decode("utf-8"),
+                    sid=self.conversation.id,
+                )
+            )
+            await callback(MarkEvent(mark_id=mark_id, sid=self.conversation.id))
+
+            pacer.frame_sent(
+                len(frame)
+                / frame_format.bytes_per_sample
+                / frame_format.sample_rate
+                * 1000
+            )
+
     async def _restream_audio(
         self,
         conversation: Conversation,
         callback: Callable[[ConversationEvent], Awaitable[None]],
     ):
         try:
-            await callback(RestreamAudioEvent())
+            interrupted_speech = conversation.agent_voice.last_speech
+            speech = conversation.restream_agent_speech()
+            await callback(
+                RestreamAudioEvent(bytes_saved=interrupted_speech.restream_bytes_saved)
+            )
             logger.info(
-                "Resending audio. All chunks: "  # todo add more logs
+                f"Resending audio. Unspoken and not sent audio: {len(speech.audio_buffer.audio)} bytes"
             )
-            unspoken_chunks = conversation.get_unspoken_agent_speech()
-            conversation.new_agent_speech_start()
-            for agent_speech_chunk in unspoken_chunks:
-                await callback(
-                    MediaEvent(
-                        audio=agent_speech_chunk.audio,
-                        base64_audio=base64.b64encode(agent_speech_chunk.audio).decode(
-                            "utf-8"
-                        ),
-                        sid=conversation.id,
-                    )
-                )
-                mark_id = conversation.agent_speech_sent(agent_speech_chunk.audio)
-
-                await callback(MarkEvent(mark_id=mark_id, sid=conversation.id))
+            await self._stream_agent_speech(speech, callback)
         except Exception as e:
             logger.error(f"Exception in restream_audio: {e}")
 
+    def _is_backchannel(self, vad_result: VADResult | None) -> bool:
+        if self.backchannel_classifier is None or vad_result is None:
+            return False
+        return self.backchannel_classifier.is_backchannel(
+            self.conversation.get_last_human_speech(), vad_result
+        )
+
+    def _transcribe_human_speech(self, vad_result: VADResult):
+        """Feed human speech to the streaming STT while the human is still speaking."""
+        stt = self.voice_agent.stt
+        if not isinstance(stt, BaseStreamingSTT):
+            return
+        if not self.conversation.is_transcribing():
+            self.conversation.start_transcription(
+                stt.open_session(), from_sample=vad_result.start_sample
+            )
+        self.conversation.transcribe_processed_audio(to_sample=vad_result.end_sample)
+
     def _check_for_speech(self) -> VADResult | None:
         data_to_process = self.conversation.get_data_to_process_and_clear()
         if (
@@ -1,5 +1,8 @@
+from typing import Any, Dict, List
+
 from pydantic import BaseModel
 
+from vsdk.pipeline import StageStats
 from vsdk.stt.base import STTResult
 from vsdk.tts.base import TTSResult
 from vsdk.ttt.base import LLMResult
@@ -9,6 +12,10 @@ class RespondToHumanResult(BaseModel):
     stt_result: STTResult
     llm_result: LLMResult
     tts_result: TTSResult
+    # Queue depth and wait times of the response pipeline stages
+    stages: List[StageStats] = []
+    # Filler played because the response audio was late, set by the orchestrator
+    filler_ms: float = 0
 
     @classmethod
     def empty(cls) -> "RespondToHumanResult":
@@ -18,7 +25,12 @@ class RespondToHumanResult(BaseModel):
             tts_result=TTSResult.empty(),
         )
 
+    def metrics(self) -> Dict[str, Any]:
+        """JSON ready result without the turn audio, which goes to an artifact sink."""
+        return self.model_dump(mode="json", exclude={"stt_result": {"speech_file"}})
+
     def update(self, other: "RespondToHumanResult") -> None:
         self.stt_result = other.stt_result
         self.llm_result = other.llm_result
         self.tts_result = other.tts_result
+        self.stages = other.stages
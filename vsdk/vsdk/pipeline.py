@@ -0,0 +1,173 @@
+"""
+Stage pipeline.
+
+Stages run as separate tasks connected by bounded queues: a stage keeps working while the next one
+is busy, until its output queue is full (backpressure). Every run reports per stage how deep its
+output queue got and how long it waited for input (starved) and for room in its queue (blocked).
+Closing the output tears all stages down.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from pydantic import BaseModel
+
+from vsdk.tasks import aclose_iterator, cancel_and_wait
+
+logger = logging.getLogger(__name__)
+
+In = TypeVar("In")
+Out = TypeVar("Out")
+
+
+class StageStats(BaseModel):
+    name: str
+    items: int = 0
+    max_queue_depth: int = 0
+    # Waiting for the previous stage and for room in the output queue
+    input_wait_time: float = 0
+    output_wait_time: float = 0
+    # From the start of the run to the first output item
+    first_item_latency: Optional[float] = None
+
+
+class Stage(Generic[In, Out]):
+    """Turns a stream of items into another stream, e.g. LLM tokens into audio chunks."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[AsyncIterator[In]], AsyncIterator[Out]],
+        max_queue: int = 8,
+    ):
+        self.name = name
+        self.fn = fn
+        self.max_queue = max_queue
+
+    def __call__(self, items: AsyncIterator[In]) -> AsyncIterator[Out]:
+        return self.fn(items)
+
+
+class MapStage(Stage[In, Out]):
+    """Maps every item on its own, up to `concurrency` at once, results keep the input order."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[In], Awaitable[Out]],
+        concurrency: int = 1,
+        max_queue: int = 8,
+    ):
+        super().__init__(name, self._map, max_queue=max_queue)
+        self.map_fn = fn
+        self.concurrency = concurrency
+
+    async def _map(self, items: AsyncIterator[In]) -> AsyncIterator[Out]:
+        pending: Deque[asyncio.Future[Out]] = deque()
+        try:
+            async for item in items:
+                pending.append(asyncio.ensure_future(self.map_fn(item)))
+                if len(pending) >= self.concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            await cancel_and_wait(pending)  # type: ignore[arg-type]
+
+
+class _End:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class Pipeline:
+    """One run of the stages, the output stream ends when the last stage does."""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage[Any, Any]],
+        callback: Optional[Callable[[StageStats], None]] = None,
+    ):
+        self.stages = list(stages)
+        self.callback = callback
+        self.stats = [StageStats(name=stage.name) for stage in self.stages]
+        self._started_at = 0.0
+
+    async def __call__(self, source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        self._started_at = time.monotonic()
+        tasks: List[asyncio.Task[None]] = []
+        items = source
+        try:
+            for idx, (stage, stats) in enumerate(zip(self.stages, self.stats)):
+                queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=stage.max_queue)
+                tasks.append(
+                    asyncio.create_task(
+                        self._run_stage(stage, stats, items, queue),
+                        name=f"stage_{stage.name}",
+                    )
+                )
+                next_stats = self.stats[idx + 1] if idx + 1 < len(self.stats) else None
+                items = self._read(queue, next_stats)
+            async for item in items:
+                yield item
+        finally:
+            await cancel_and_wait(tasks)
+            await aclose_iterator(source)
+
+    async def _run_stage(
+        self,
+        stage: Stage[Any, Any],
+        stats: StageStats,
+        items: AsyncIterator[Any],
+        queue: "asyncio.Queue[Any]",
+    ) -> None:
+        output = stage(items)
+        try:
+            async for item in output:
+                if stats.first_item_latency is None:
+                    stats.first_item_latency = time.monotonic() - self._started_at
+                stats.items += 1
+                wait_start = time.monotonic()
+                await queue.put(item)
+                stats.output_wait_time += time.monotonic() - wait_start
+                stats.max_queue_depth = max(stats.max_queue_depth, queue.qsize())
+            await queue.put(_End())
+        except Exception as e:
+            await queue.put(_Failed(e))
+        finally:
+            await aclose_iterator(output)
+            if self.callback:
+                self.callback(stats)
+
+    async def _read(
+        self, queue: "asyncio.Queue[Any]", reader: Optional[StageStats]
+    ) -> AsyncIterator[Any]:
+        """Items of a queue, the wait is accounted to the stage reading it."""
+        while True:
+            wait_start = time.monotonic()
+            item = await queue.get()
+            if reader:
+                reader.input_wait_time += time.monotonic() - wait_start
+            if isinstance(item, _End):
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
@@ -0,0 +1,63 @@
+"""
+Voice agents shared between calls.
+
+STT/TTS processors, LLM clients and the compiled agent graph hold no per-call state: conversation
+memory is keyed by conversation id. Building them for every call costs setup time and memory
+(a LangGraph compile, HTTP clients, output format negotiation), so the factory builds them once
+per configuration and every call of that configuration gets the same VoiceAgent.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from vsdk.config import Config
+from vsdk.stt.base import BaseSTT
+from vsdk.tts.base import BaseTTS
+from vsdk.ttt.base import BaseAgent
+from vsdk.voice_agent import VoiceAgent
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceAgentFactory:
+    def __init__(
+        self,
+        stt_factory: Callable[[], BaseSTT],
+        tts_factory: Callable[[Config.Audio], BaseTTS],
+        agent_factory: Callable[[str], BaseAgent],
+    ):
+        """
+        :param tts_factory: builds TTS for the transport audio config (output format negotiation)
+        :param agent_factory: builds the agent for a system prompt, tools are fixed per factory
+        """
+        self.stt_factory = stt_factory
+        self.tts_factory = tts_factory
+        self.agent_factory = agent_factory
+
+        self._stt: Optional[BaseSTT] = None
+        self._tts: Dict[str, BaseTTS] = {}
+        self._agents: Dict[str, BaseAgent] = {}
+        self._voice_agents: Dict[Tuple[str, str], VoiceAgent] = {}
+
+    def voice_agent(self, audio_config: Config.Audio, system_prompt: str) -> VoiceAgent:
+        audio_key = audio_config.model_dump_json()
+        key = (audio_key, system_prompt)
+        if voice_agent := self._voice_agents.get(key):
+            return voice_agent
+
+        start = time.time()
+        if self._stt is None:
+            self._stt = self.stt_factory()
+        if audio_key not in self._tts:
+            self._tts[audio_key] = self.tts_factory(audio_config)
+        if system_prompt not in self._agents:
+            self._agents[system_prompt] = self.agent_factory(system_prompt)
+
+        voice_agent = self._voice_agents[key] = VoiceAgent(
+            stt=self._stt,
+            tts=self._tts[audio_key],
+            agent=self._agents[system_prompt],
+        )
+        logger.info(f"Built shared voice agent in {time.time() - start:.3f}s")
+        return voice_agent
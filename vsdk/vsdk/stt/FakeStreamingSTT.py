@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from vsdk.stt.base import (
+    BaseStreamingSTT,
+    BaseSTTSession,
+    STTResult,
+    STTTranscript,
+)
+from vsdk.stt.encoders import WavEncoder
+
+
+class FakeStreamingSTTSession(BaseSTTSession):
+    def __init__(
+        self,
+        transcript: str,
+        sample_rate: int,
+        channels: int,
+        bytes_per_sample: int,
+        real_time_factor: float,
+        finalize_latency_s: float,
+        callback: Optional[Callable[[STTTranscript], None]] = None,
+    ):
+        self.words = transcript.split()
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bytes_per_sample = bytes_per_sample
+        self.bytes_per_second = sample_rate * channels * bytes_per_sample
+        self.real_time_factor = real_time_factor
+        self.finalize_latency_s = finalize_latency_s
+        self.callback = callback
+
+        self.audio = b""
+        self._frames: asyncio.Queue[bytes] = asyncio.Queue()
+        self._processed_bytes = 0
+        self._worker: asyncio.Task[None] | None = None
+
+    def push(self, pcm_audio: bytes) -> None:
+        self.audio += pcm_audio
+        self._frames.put_nowait(pcm_audio)
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._transcribe())
+
+    async def finish(self) -> STTResult:
+        stt_start_time = time.time()
+        await self._frames.join()
+        await asyncio.sleep(self.finalize_latency_s)
+        self.cancel()
+
+        transcript = STTTranscript(transcript=" ".join(self.words), is_final=True)
+        if self.callback:
+            self.callback(transcript)
+        return STTResult(
+            stt_start_time=stt_start_time,
+            stt_end_time=time.time(),
+            transcript=transcript.transcript,
+            speech_file=WavEncoder().encode(
+                self.audio,
+                sample_rate=self.sample_rate,
+                channels=self.channels,
+                bytes_per_sample=self.bytes_per_sample,
+            ),
+            speech_file_format="wav",
+        )
+
+    def cancel(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+
+    async def _transcribe(self):
+        while True:
+            frame = await self._frames.get()
+            await asyncio.sleep(
+                len(frame) / self.bytes_per_second * self.real_time_factor
+            )
+            self._processed_bytes += len(frame)
+            if self.callback:
+                # Pretend one word is recognized per second of processed audio
+                words = self._processed_bytes // self.bytes_per_second
+                self.callback(
+                    STTTranscript(
+                        transcript=" ".join(self.words[:words]), is_final=False
+                    )
+                )
+            self._frames.task_done()
+
+
+class FakeStreamingSTT(BaseStreamingSTT):
+    """
+    Local streaming provider for tests and development.
+    Spends `real_time_factor` seconds per second of pushed audio, as audio arrives,
+    and `finalize_latency_s` after the session is finished.
+    """
+
+    def __init__(
+        self,
+        transcript: str,
+        sample_rate: int,
+        bytes_per_sample: int,
+        real_time_factor: float = 0.1,
+        finalize_latency_s: float = 0.05,
+        channels: int = 1,
+    ):
+        self.transcript = transcript
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bytes_per_sample = bytes_per_sample
+        self.real_time_factor = real_time_factor
+        self.finalize_latency_s = finalize_latency_s
+
+    def open_session(
+        self, callback: Optional[Callable[[STTTranscript], None]] = None
+    ) -> BaseSTTSession:
+        return FakeStreamingSTTSession(
+            transcript=self.transcript,
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            bytes_per_sample=self.bytes_per_sample,
+            real_time_factor=self.real_time_factor,
+            finalize_latency_s=self.finalize_latency_s,
+            callback=callback,
+        )
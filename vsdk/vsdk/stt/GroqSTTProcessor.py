@@ -1,9 +1,13 @@
+import asyncio
+import logging
 import time
-import wave
-from io import BytesIO
 
 from vsdk.config import Config
 from vsdk.stt.base import BaseSTT, STTResult
+from vsdk.stt.encoders import get_payload_encoder
+from vsdk.stt.transport import STTTransport
+
+logger = logging.getLogger(__name__)
 
 
 class GroqSTTProcessor(BaseSTT):
@@ -12,24 +16,50 @@ class GroqSTTProcessor(BaseSTT):
         groq: Config.Groq,
     ):
         self.groq = groq
+        self.encoder = get_payload_encoder(groq.payload_encoding)
+        self.transport = STTTransport(
+            request_timeout_s=groq.request_timeout_s,
+            hedging=groq.hedging,
+            hedge_percentile=groq.hedge_percentile,
+            hedge_initial_delay_s=groq.hedge_initial_delay_s,
+        )
+
+    async def warmup(self) -> None:
+        """Open keep-alive connections, so the first transcription of a call skips TLS setup."""
+        start = time.time()
+        await asyncio.gather(
+            *(
+                self.groq.client().models.list()
+                for _ in range(self.groq.warmup_connections)
+            )
+        )
+        logger.info(
+            f"Warmed up {self.groq.warmup_connections} STT connections in {time.time() - start:.2f}s"
+        )
 
     async def __call__(self, pcm_audio: bytes) -> STTResult:
         return await self.speech_to_text(pcm_audio)
 
     async def speech_to_text(self, pcm_audio: bytes) -> STTResult:
         stt_start_time = time.time()
-        wav_io = BytesIO()
-        with wave.open(wav_io, "wb") as wav_file:
-            wav_file.setnchannels(self.groq.audio_channels)
-            wav_file.setsampwidth(self.groq.bytes_per_sample)
-            wav_file.setframerate(self.groq.sample_rate)
-            wav_file.writeframes(pcm_audio)
-        wav_io.seek(0)
-
-        transcription = await self.groq.async_client.audio.transcriptions.create(
-            file=("audio.wav", wav_io),
-            model=self.groq.transcription_model,
-            language=self.groq.transcription_language,
+        payload = self.encoder.encode(
+            pcm_audio,
+            sample_rate=self.groq.sample_rate,
+            channels=self.groq.audio_channels,
+            bytes_per_sample=self.groq.bytes_per_sample,
+        )
+        logger.debug(
+            f"Encoded {len(pcm_audio)} bytes of speech as {self.groq.payload_encoding}: "
+            f"{len(payload)} bytes in {time.time() - stt_start_time:.3f}s"
+        )
+
+        transcription = await self.transport.request(
+            lambda: self.groq.client().audio.transcriptions.create(
+                file=(self.encoder.file_name(), payload),
+                model=self.groq.transcription_model,
+                language=self.groq.transcription_language,
+                timeout=self.groq.request_timeout_s,
+            )
         )
         stt_end_time = time.time()
 
@@ -37,5 +67,6 @@ class GroqSTTProcessor(BaseSTT):
             stt_start_time=stt_start_time,
             stt_end_time=stt_end_time,
             transcript=transcription.text,
-            speech_file=wav_io.getvalue(),
+            speech_file=payload,
+            speech_file_format=self.groq.payload_encoding,
         )
@@ -1,5 +1,7 @@
-from abc import ABC, abstractmethod
 import base64
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Optional
 
 from pydantic import BaseModel, field_serializer
 
@@ -10,6 +12,7 @@ class STTResult(BaseModel):
 
     transcript: str
     speech_file: bytes
+    speech_file_format: str = "wav"
 
     @field_serializer("speech_file", when_used="json")
     def serialize_audio_in_base64(self, audio: bytes) -> str:
@@ -25,7 +28,64 @@ class STTResult(BaseModel):
         )
 
 
+class SpeechSegment:
+    """
+    Single human utterance. Keeps its transcript once transcribed, so a turn merged from
+    several utterances transcribes only the segments that were not transcribed yet.
+    """
+
+    def __init__(self, stt_speech: bytes):
+        self.stt_speech = stt_speech
+        self.stt_result: Optional[STTResult] = None
+
+    def is_transcribed(self) -> bool:
+        return self.stt_result is not None
+
+
+class STTTranscript(BaseModel):
+    transcript: str
+    is_final: bool
+
+
 class BaseSTT(ABC):
     @abstractmethod
     async def __call__(self, pcm_audio: bytes) -> STTResult:
         pass
+
+    async def warmup(self) -> None:
+        """Prepare models and connections before the first call, at startup."""
+
+
+class BaseSTTSession(ABC):
+    """
+    Single utterance transcription session. Audio is pushed while the human is still speaking,
+    so when speech ends only the last bit of audio is left to transcribe.
+    """
+
+    @abstractmethod
+    def push(self, pcm_audio: bytes) -> None:
+        """Queue audio for transcription. Must not block."""
+        pass
+
+    @abstractmethod
+    async def finish(self) -> STTResult:
+        """No more audio will be pushed. Returns the final transcript."""
+        pass
+
+    @abstractmethod
+    def cancel(self) -> None:
+        pass
+
+
+class BaseStreamingSTT(BaseSTT):
+    @abstractmethod
+    def open_session(
+        self, callback: Optional[Callable[[STTTranscript], None]] = None
+    ) -> BaseSTTSession:
+        """Open a session. Callback receives interim and final transcripts."""
+        pass
+
+    async def __call__(self, pcm_audio: bytes) -> STTResult:
+        session = self.open_session()
+        session.push(pcm_audio)
+        return await session.finish()
@@ -0,0 +1,279 @@
+"""
+STT upload payload encoders.
+
+Uploading the utterance dominates STT time on slow uplinks, so the PCM can be compressed before
+sending. `flac` is lossless (~2x smaller for speech), `ulaw_wav` is lossy 8 bit (exactly 2x
+smaller) and `wav` is the uncompressed fallback. Encoders are pure numpy, so no native codec
+library is required.
+"""
+
+import hashlib
+import struct
+import wave
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import Dict, Literal
+
+import numpy as np
+from numpy.typing import NDArray
+
+from vsdk.tts.output_format import pcm_to_ulaw
+
+PayloadEncoding = Literal["wav", "ulaw_wav", "flac"]
+
+# FLAC frame header block size codes that need no explicit block size field
+FLAC_BLOCK_SIZE_CODES = {
+    192: 1, 576: 2, 1152: 3, 2304: 4, 4608: 5,
+    256: 8, 512: 9, 1024: 10, 2048: 11, 4096: 12, 8192: 13, 16384: 14, 32768: 15,
+}  # fmt: skip
+
+
+class STTPayloadEncoder(ABC):
+    file_extension: str
+
+    @abstractmethod
+    def encode(
+        self, pcm_audio: bytes, sample_rate: int, channels: int, bytes_per_sample: int
+    ) -> bytes:
+        pass
+
+    def file_name(self) -> str:
+        return f"audio.{self.file_extension}"
+
+
+class WavEncoder(STTPayloadEncoder):
+    file_extension = "wav"
+
+    def encode(
+        self, pcm_audio: bytes, sample_rate: int, channels: int, bytes_per_sample: int
+    ) -> bytes:
+        wav_io = BytesIO()
+        with wave.open(wav_io, "wb") as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(bytes_per_sample)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm_audio)
+        return wav_io.getvalue()
+
+
+class UlawWavEncoder(STTPayloadEncoder):
+    """8 bit G.711 mu-law in a WAV container (WAVE_FORMAT_MULAW)."""
+
+    file_extension = "wav"
+
+    def encode(
+        self, pcm_audio: bytes, sample_rate: int, channels: int, bytes_per_sample: int
+    ) -> bytes:
+        _check_16_bit(bytes_per_sample)
+        ulaw = pcm_to_ulaw(_samples(pcm_audio)).tobytes()
+        fmt = struct.pack(
+            "<HHIIHHH", 7, channels, sample_rate, sample_rate * channels, channels, 8, 0
+        )
+        fact = struct.pack("<I", len(ulaw) // channels)
+        chunks = (
+            b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"fact" + struct.pack("<I", len(fact)) + fact
+            + b"data" + struct.pack("<I", len(ulaw)) + ulaw
+            + b"\x00" * (len(ulaw) % 2)
+        )  # fmt: skip
+        return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+class FlacEncoder(STTPayloadEncoder):
+    """
+    Lossless FLAC with fixed linear predictors (order 0-4) and Rice coded residuals.
+    Picks the cheapest of constant, verbatim and fixed subframe per block and channel.
+    """
+
+    file_extension = "flac"
+
+    def __init__(self, block_size: int = 4096):
+        self.block_size = block_size
+
+    def encode(
+        self, pcm_audio: bytes, sample_rate: int, channels: int, bytes_per_sample: int
+    ) -> bytes:
+        _check_16_bit(bytes_per_sample)
+        samples = _samples(pcm_audio)
+        samples = samples[: len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).astype(np.int64)
+
+        frames = [
+            self._encode_frame(
+                samples[start : start + self.block_size], frame_number, channels
+            )
+            for frame_number, start in enumerate(
+                range(0, len(samples), self.block_size)
+            )
+        ]
+        return b"fLaC" + self._stream_info(samples, sample_rate, channels) + b"".join(frames)
+
+    def _stream_info(
+        self, samples: NDArray[np.int64], sample_rate: int, channels: int
+    ) -> bytes:
+        packed = (
+            (((sample_rate << 3) | (channels - 1)) << 5 | (16 - 1)) << 36
+        ) | len(samples)
+        info = (
+            struct.pack(">HH", self.block_size, self.block_size)
+            + b"\x00" * 6  # min/max frame size unknown
+            + packed.to_bytes(8, "big")
+            + hashlib.md5(samples.astype("<i2").tobytes()).digest()
+        )
+        # last-metadata-block flag, STREAMINFO type, length
+        return bytes([0x80]) + len(info).to_bytes(3, "big") + info
+
+    def _encode_frame(
+        self, block: NDArray[np.int64], frame_number: int, channels: int
+    ) -> bytes:
+        if len(block) in FLAC_BLOCK_SIZE_CODES:
+            block_size_code, block_size_bits = FLAC_BLOCK_SIZE_CODES[len(block)], b""
+        else:
+            block_size_code, block_size_bits = 7, struct.pack(">H", len(block) - 1)
+
+        header = (
+            bytes(
+                [
+                    0xFF,
+                    0xF8,  # sync code, fixed block size stream
+                    block_size_code << 4,  # sample rate from STREAMINFO
+                    ((channels - 1) << 4) | (4 << 1),  # independent channels, 16 bit
+                ]
+            )
+            + _utf8_number(frame_number)
+            + block_size_bits
+        )
+        header += bytes([_crc8(header)])
+
+        bits = np.concatenate([_subframe_bits(block[:, ch]) for ch in range(channels)])
+        bits = np.concatenate([bits, np.zeros(-len(bits) % 8, dtype=np.uint8)])
+        frame = header + np.packbits(bits).tobytes()
+        return frame + struct.pack(">H", _crc16(frame))
+
+
+PAYLOAD_ENCODERS: Dict[str, STTPayloadEncoder] = {
+    "wav": WavEncoder(),
+    "ulaw_wav": UlawWavEncoder(),
+    "flac": FlacEncoder(),
+}
+
+
+def get_payload_encoder(encoding: str) -> STTPayloadEncoder:
+    if encoding not in PAYLOAD_ENCODERS:
+        raise ValueError(f"Unsupported STT payload encoding: {encoding}")
+    return PAYLOAD_ENCODERS[encoding]
+
+
+def _check_16_bit(bytes_per_sample: int) -> None:
+    if bytes_per_sample != 2:
+        raise ValueError(f"Only 16 bit PCM is supported, got {bytes_per_sample * 8} bit")
+
+
+def _samples(pcm_audio: bytes) -> NDArray[np.int16]:
+    return np.frombuffer(pcm_audio[: len(pcm_audio) - len(pcm_audio) % 2], dtype="<i2")
+
+
+def _bits(values: int | NDArray[np.int64], width: int) -> NDArray[np.uint8]:
+    """`width` bits of each (two's complement) value, MSB first."""
+    values = np.atleast_1d(np.asarray(values, dtype=np.int64)) & ((1 << width) - 1)
+    shifts = np.arange(width - 1, -1, -1)
+    return ((values[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+
+
+def _subframe_bits(channel: NDArray[np.int64]) -> NDArray[np.uint8]:
+    # subframe header: zero pad bit, 6 bit type, no wasted bits
+    if np.all(channel == channel[0]):
+        return np.concatenate([_bits(0b00000000, 8), _bits(int(channel[0]), 16)])
+
+    verbatim_cost = 16 * len(channel)
+    best_order, best_param, best_cost = -1, 0, verbatim_cost
+    for order in range(min(4, len(channel) - 1) + 1):
+        folded = _fold(np.diff(channel, n=order) if order else channel)
+        param, cost = _rice_param(folded)
+        if cost + 16 * order < best_cost:
+            best_order, best_param, best_cost = order, param, cost + 16 * order
+
+    if best_order < 0:
+        return np.concatenate([_bits(0b00000010, 8), _bits(channel, 16)])
+    residual = np.diff(channel, n=best_order) if best_order else channel
+    return np.concatenate(
+        [
+            _bits(0b00010000 | (best_order << 1), 8),
+            _bits(channel[:best_order], 16),
+            # coding method 00 (4 bit Rice params), partition order 0, Rice parameter
+            _bits(0, 2),
+            _bits(0, 4),
+            _bits(best_param, 4),
+            _rice_bits(_fold(residual), best_param),
+        ]
+    )
+
+
+def _fold(residual: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Zigzag signed residuals to unsigned: 0, -1, 1, -2... -> 0, 1, 2, 3..."""
+    return np.where(residual >= 0, residual << 1, ((-residual) << 1) - 1)
+
+
+def _rice_param(folded: NDArray[np.int64]) -> tuple[int, int]:
+    """Cheapest Rice parameter and its cost in bits."""
+    mean = float(folded.mean()) if len(folded) else 0
+    # 4 bit parameters, 15 is the escape code
+    estimate = min(int(np.log2(mean)), 14) if mean >= 1 else 0
+    candidates = range(max(0, estimate - 1), min(14, estimate + 1) + 1)
+    costs = [(int(np.sum(folded >> k)) + len(folded) * (k + 1), k) for k in candidates]
+    cost, param = min(costs)
+    return param, cost
+
+
+def _rice_bits(folded: NDArray[np.int64], param: int) -> NDArray[np.uint8]:
+    """Unary quotient, stop bit, then `param` low bits of each value."""
+    quotients = folded >> param
+    lengths = quotients + 1 + param
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+    bits = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    bits[starts + quotients] = 1
+    for j in range(param):
+        bits[starts + quotients + 1 + j] = (folded >> (param - 1 - j)) & 1
+    return bits
+
+
+def _utf8_number(number: int) -> bytes:
+    if number < 0x80:
+        return bytes([number])
+    length = 2
+    while number >= 1 << (5 * length + 1):
+        length += 1
+    tail = []
+    for _ in range(length - 1):
+        tail.insert(0, 0x80 | (number & 0x3F))
+        number >>= 6
+    return bytes([((0xFF << (8 - length)) & 0xFF) | number] + tail)
+
+
+def _crc_table(polynomial: int, width: int) -> list[int]:
+    top, mask = 1 << (width - 1), (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ polynomial) if crc & top else crc << 1
+        table.append(crc & mask)
+    return table
+
+
+_CRC8_TABLE = _crc_table(0x07, 8)
+_CRC16_TABLE = _crc_table(0x8005, 16)
+
+
+def _crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def _crc16(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
@@ -0,0 +1,127 @@
+"""
+STT request transport: keep-alive connection pool, per-request deadline and optional hedging.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+import httpx
+
+from vsdk.tasks import cancel_and_wait
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def create_pooled_http_client(
+    max_connections: int = 10,
+    max_keepalive_connections: int = 4,
+    keepalive_expiry_s: float = 120,
+    timeout_s: float = 10,
+) -> httpx.AsyncClient:
+    """HTTP client for provider SDKs (e.g. `AsyncGroq(http_client=...)`) that keeps connections warm."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_s,
+        ),
+        timeout=httpx.Timeout(timeout_s, connect=min(timeout_s, 5)),
+    )
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 100):
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_s: float) -> None:
+        self.latencies.append(latency_s)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        idx = min(len(ordered) - 1, int(percentile * len(ordered)))
+        return ordered[idx]
+
+
+class STTTransport:
+    """
+    Runs STT requests with a deadline. With hedging enabled, a second identical request is fired
+    if the first one did not answer within the p95 latency of recent requests, and the first
+    answer wins.
+    """
+
+    def __init__(
+        self,
+        request_timeout_s: float,
+        hedging: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_initial_delay_s: float = 1.0,
+        hedge_min_delay_s: float = 0.1,
+        hedge_min_samples: int = 20,
+    ):
+        self.request_timeout_s = request_timeout_s
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_initial_delay_s = hedge_initial_delay_s
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float:
+        if len(self.latency.latencies) < self.hedge_min_samples:
+            return self.hedge_initial_delay_s
+        return max(
+            self.hedge_min_delay_s,
+            self.latency.percentile(self.hedge_percentile) or 0,
+        )
+
+    async def request(self, send: Callable[[], Awaitable[T]]) -> T:
+        start = time.time()
+        async with asyncio.timeout(self.request_timeout_s):
+            if self.hedging:
+                result = await self._hedged(send)
+            else:
+                result = await send()
+        self.latency.record(time.time() - start)
+        return result
+
+    async def _hedged(self, send: Callable[[], Awaitable[T]]) -> T:
+        async def run() -> T:
+            return await send()
+
+        primary = asyncio.create_task(run())
+        pending: set[asyncio.Task[T]] = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if not done:
+                logger.info(
+                    f"STT request slower than {self.hedge_delay():.2f}s, sending hedged request"
+                )
+                self.hedged_requests += 1
+                pending.add(asyncio.create_task(run()))
+
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    logger.warning(f"STT request failed: {error}")
+                    errors.append(error)
+            raise errors[-1]
+        finally:
+            # The losing request is torn down with its connection, not left to finish unobserved
+            await cancel_and_wait(pending)
@@ -0,0 +1,118 @@
+"""
+Task teardown tracking.
+
+A cancelled response must release its STT request, LLM stream, TTS websocket and their child tasks
+promptly, orphans keep consuming sockets, tokens and CPU. TaskTracker owns the tasks of one
+conversation, waits for cancelled tasks up to a deadline and reports how long teardown took and
+which tasks were still running after it (leaked).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Coroutine, Iterable, Optional, Set, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TeardownStats(BaseModel):
+    teardowns: int = 0
+    teardown_time: float = 0
+    max_teardown_time: float = 0
+    # Tasks still running teardown_timeout_s after they were cancelled
+    leaked_tasks: int = 0
+
+
+class TaskTracker:
+    def __init__(self, name: str, teardown_timeout_s: float = 1.0):
+        self.name = name
+        self.teardown_timeout_s = teardown_timeout_s
+        self.stats = TeardownStats()
+        self._tasks: Set[asyncio.Task[Any]] = set()
+        self._watchers: Set[asyncio.Task[None]] = set()
+
+    @property
+    def running(self) -> int:
+        return len(self._tasks)
+
+    def create_task(
+        self, coro: Coroutine[Any, Any, T], name: Optional[str] = None
+    ) -> asyncio.Task[T]:
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def cancel(self, task: asyncio.Task[Any]) -> None:
+        """Cancel without waiting, the teardown is measured in the background."""
+        if task.done():
+            return
+        task.cancel()
+        watcher = asyncio.create_task(self._watch_teardown([task]))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+
+    async def cancel_and_wait(self, tasks: Iterable[asyncio.Task[Any]]) -> None:
+        """Cancel and wait for the tasks to finish, at most teardown_timeout_s."""
+        pending = [task for task in tasks if not task.done()]
+        if not pending:
+            return
+        for task in pending:
+            task.cancel()
+        await self._watch_teardown(pending)
+
+    async def close(self) -> TeardownStats:
+        """Cancel all tasks of the conversation and report the teardown."""
+        await self.cancel_and_wait(list(self._tasks))
+        if self._watchers:
+            await asyncio.wait(list(self._watchers))
+        logger.info(
+            f"🧹 Conversation {self.name}: {self.stats.teardowns} teardowns, "
+            f"max {self.stats.max_teardown_time:.3f}s, {self.stats.leaked_tasks} leaked tasks"
+        )
+        return self.stats
+
+    async def _watch_teardown(self, tasks: list[asyncio.Task[Any]]) -> None:
+        start = time.monotonic()
+        _, pending = await asyncio.wait(tasks, timeout=self.teardown_timeout_s)
+        elapsed = time.monotonic() - start
+        self.stats.teardowns += 1
+        self.stats.teardown_time += elapsed
+        self.stats.max_teardown_time = max(self.stats.max_teardown_time, elapsed)
+        if pending:
+            self.stats.leaked_tasks += len(pending)
+            logger.warning(
+                f"🧹 {len(pending)} tasks of conversation {self.name} still running "
+                f"{self.teardown_timeout_s}s after cancel: {[task.get_name() for task in pending]}"
+            )
+
+
+async def cancel_and_wait(
+    tasks: Iterable[Optional[asyncio.Task[Any]]], timeout_s: float = 1.0
+) -> None:
+    """Cancel child tasks and give them up to timeout_s to finish their cleanup."""
+    pending = [task for task in tasks if task is not None and not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        _, still_running = await asyncio.wait(pending, timeout=timeout_s)
+        if still_running:
+            logger.warning(
+                f"🧹 {len(still_running)} child tasks still running {timeout_s}s after cancel"
+            )
+
+
+async def aclose_iterator(iterator: AsyncIterator[Any]) -> None:
+    """Close an async generator right away, instead of whenever it is garbage collected."""
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is None:
+        return
+    try:
+        await aclose()
+    except RuntimeError as e:
+        # Still running in a task that is being cancelled, it closes itself
+        logger.debug(f"Iterator not closed: {e}")
@@ -1,13 +1,24 @@
 import asyncio
 import base64
+import hashlib
 import json
 import logging
-from typing import AsyncIterator
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Optional
 
 import websockets
 
 from vsdk.config import Config
-from vsdk.tts.base import AudioChunk, BaseTTS, NormalizedAlignment
+from vsdk.tasks import cancel_and_wait
+from vsdk.tts.base import AudioChunk, BaseTTS, NormalizedAlignment, TTSResult
+from vsdk.tts.chunking import TextChunker
+from vsdk.tts.connection_pool import (
+    PooledConnection,
+    WebsocketConnectionPool,
+    get_connection_pool,
+)
+from vsdk.tts.output_format import AudioTranscoder, negotiate_output_format
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -17,40 +28,70 @@ class ElevenTTSProcessor(BaseTTS):
     def __init__(
         self,
         eleven: Config.Eleven,
+        audio_config: Optional[Config.Audio] = None,
     ):
         self.eleven = eleven
+        self.output_format_negotiation = negotiate_output_format(
+            accepted_formats=(
+                audio_config.output_formats
+                if audio_config
+                else [eleven.output_format]
+            ),
+            native_formats=eleven.native_output_formats,
+            default_format=eleven.output_format,
+        )
         logger.info(f"Initialized ElevenTTSProcessor with voice ID: {eleven.voice}")
+        if self.output_format_negotiation.transcoded:
+            logger.info(
+                f"Output format: provider {self.output_format_negotiation.provider_format} transcoded locally to {self.output_format_negotiation.transport_format}"
+            )
+        else:
+            logger.info(
+                f"Output format: {self.output_format_negotiation.provider_format} requested natively from provider"
+            )
+
+    async def warmup(self) -> None:
+        """Fill the connection pool, so the first turn does not wait for a connection."""
+        if self.eleven.connection_pool_size:
+            await self._connection_pool().fill()
 
     def __call__(
-        self, input_generator: AsyncIterator[str]
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
     ) -> AsyncIterator[AudioChunk]:
         logger.debug("Starting text-to-speech streaming via websocket")
-        return self.text_to_speech_streaming_ws(input_generator)
+        return self.text_to_speech_streaming_ws(input_generator, callback)
 
     async def text_to_speech_streaming_ws(
-        self, input_generator: AsyncIterator[str]
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
     ) -> AsyncIterator[AudioChunk]:
         logger.debug("Starting websocket streaming session")
         audio_queue: asyncio.Queue[AudioChunk | None] = asyncio.Queue()
+        negotiation = self.output_format_negotiation
+        transcoder = (
+            AudioTranscoder(negotiation.provider_format, negotiation.transport_format)
+            if negotiation.transcoded
+            else None
+        )
+        sent_text: list[str] = []
+        connection: Optional[PooledConnection] = None
+        text_chunker = TextChunker(
+            first_chunk_words=self.eleven.first_chunk_words,
+            first_chunk_deadline_ms=self.eleven.first_chunk_deadline_ms,
+            idle_flush_ms=self.eleven.idle_flush_ms,
+            max_chunk_chars=self.eleven.max_chunk_chars,
+        )
 
         async def send_and_listen():
-            uri = f"wss://api.elevenlabs.io/v1/text-to-speech/{self.eleven.voice}/stream-input?model_id={self.eleven.model}&output_format={self.eleven.output_format}&language_code={self.eleven.language}&enable_logging=true"
-            logger.info(f"Connecting to websocket at: {uri}")
-
+            nonlocal connection
             try:
-                async with websockets.connect(uri) as websocket:
-                    logger.debug("Websocket connection established")
-                    await websocket.send(
-                        json.dumps(
-                            {
-                                "text": " ",
-                                "voice_settings": {
-                                    "stability": 0.5,
-                                    "similarity_boost": 0.8,
-                                },
-                                "xi_api_key": self.eleven.api_key,
-                            }
-                        )
+                connection = await self._acquire_connection()
+                async with connection.websocket as websocket:
+                    logger.debug(
+                        f"Websocket connection ready in {connection.acquire_time:.3f}s, warm: {connection.warm}"
                     )
 
                     async def listen():
@@ -61,6 +102,12 @@ class ElevenTTSProcessor(BaseTTS):
                                 if data.get("audio"):
                                     logger.debug("Received audio chunk")
                                     audio_data = base64.b64decode(data["audio"])
+                                    base64_audio = data["audio"]
+                                    if transcoder:
+                                        audio_data = transcoder(audio_data)
+                                        base64_audio = base64.b64encode(
+                                            audio_data
+                                        ).decode("utf-8")
                                     alignment = None
                                     if data.get("normalizedAlignment"):
                                         normalized_alignment = data[
@@ -79,8 +126,9 @@ class ElevenTTSProcessor(BaseTTS):
                                     await audio_queue.put(
                                         AudioChunk(
                                             audio=audio_data,
-                                            base64_audio=data["audio"],
+                                            base64_audio=base64_audio,
                                             normalized_alignment=alignment,
+                                            output_format=negotiation.transport_format,
                                         )
                                     )
                                 elif data.get("isFinal"):
@@ -99,13 +147,22 @@ class ElevenTTSProcessor(BaseTTS):
                         await audio_queue.put(None)
 
                     listen_task = asyncio.create_task(listen())
+                    try:
+                        # Closing the chunker closes the LLM stream when the turn is torn down
+                        async with aclosing(text_chunker(input_generator)) as chunks:
+                            async for text in chunks:
+                                logger.debug(f"Sending text chunk: {text[:100]}...")
+                                sent_text.append(text)
+                                # Chunks are already cut where generation should start, do not
+                                # wait for the provider's own buffering
+                                await websocket.send(
+                                    json.dumps({"text": text, "flush": True})
+                                )
 
-                    async for text in self._text_chunker(input_generator):
-                        logger.debug(f"Sending text chunk: {text[:100]}...")
-                        await websocket.send(json.dumps({"text": text}))
-
-                    await websocket.send(json.dumps({"text": ""}))
-                    await listen_task
+                        await websocket.send(json.dumps({"text": ""}))
+                        await listen_task
+                    finally:
+                        await cancel_and_wait([listen_task])
 
             except websockets.exceptions.WebSocketException as e:
                 logger.error(f"Websocket connection error: {str(e)}")
@@ -116,54 +173,123 @@ class ElevenTTSProcessor(BaseTTS):
 
         send_task = asyncio.create_task(send_and_listen())
 
+        tts_result = TTSResult.empty()
+        tts_result.start_time = time.time()
+        tts_result.output_format = negotiation.transport_format
+        tts_result.transcoded = negotiation.transcoded
         try:
             whole_audio: bytes = b""
             while True:
-                audio_chunk = await audio_queue.get()
+                audio_chunk = await self._next_audio(audio_queue, send_task)
                 if audio_chunk is None:
                     logger.debug("Received None chunk, ending stream")
                     break
 
+                if not whole_audio:
+                    tts_result.first_chunk_time = time.time()
                 whole_audio += audio_chunk.audio
                 yield audio_chunk
 
             await send_task
             logger.debug("Streaming session completed successfully")
 
+            tts_result.end_time = time.time()
+            if connection:
+                tts_result.connection_time = connection.acquire_time
+                tts_result.connection_time_saved = connection.time_saved
+            tts_result.response = "".join(sent_text)
+            tts_result.text_chunks = text_chunker.chunks
+            tts_result.first_text_chunk_latency = text_chunker.first_chunk_latency or 0
+            if tts_result.first_chunk_time:
+                logger.info(
+                    f"🔊 TTS first audio after {tts_result.first_chunk_time - tts_result.start_time:.3f}s, {text_chunker.chunks} text chunks {text_chunker.flush_reasons}"
+                )
+            if callback:
+                callback(tts_result)
+
         except Exception as e:
             logger.error(f"Error in streaming loop: {str(e)}")
             raise
+        finally:
+            # Consumer stopped early or failed, the websocket and its tasks go with it
+            await cancel_and_wait([send_task])
+
+    @staticmethod
+    async def _next_audio(
+        audio_queue: "asyncio.Queue[AudioChunk | None]",
+        send_task: "asyncio.Task[None]",
+    ) -> Optional[AudioChunk]:
+        """
+        Next audio chunk, None at the end of the audio. Raises the error of a send task that
+        failed before the end, e.g. on connect, instead of waiting for audio forever.
+        """
+        if audio_queue.empty() and not send_task.done():
+            get = asyncio.ensure_future(audio_queue.get())
+            try:
+                await asyncio.wait(
+                    [get, send_task], return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                get.cancel()
+            if get.done() and not get.cancelled():
+                return get.result()
+        if not audio_queue.empty():
+            return audio_queue.get_nowait()
+        send_task.result()
+        return None
+
+    def cache_key(self) -> Optional[str]:
+        return f"eleven:{self.eleven.voice}:{self.eleven.model}:{self.eleven.language}:{self.output_format_negotiation.transport_format}"
+
+    def _uri(self) -> str:
+        uri = f"{self.eleven.base_url}/v1/text-to-speech/{self.eleven.voice}/stream-input?model_id={self.eleven.model}&output_format={self.output_format_negotiation.provider_format}&language_code={self.eleven.language}&enable_logging=true"
+        if self.eleven.connection_pool_size:
+            uri += f"&inactivity_timeout={self.eleven.inactivity_timeout_s}"
+        return uri
+
+    async def _connect(self) -> websockets.ClientConnection:
+        """Open the streaming connection and send the initial message with auth and voice settings."""
+        uri = self._uri()
+        logger.info(f"Connecting to websocket at: {uri}")
+        websocket = await websockets.connect(uri)
+        try:
+            await websocket.send(
+                json.dumps(
+                    {
+                        "text": " ",
+                        "voice_settings": {
+                            "stability": 0.5,
+                            "similarity_boost": 0.8,
+                        },
+                        "xi_api_key": self.eleven.api_key,
+                    }
+                )
+            )
+        except Exception:
+            await websocket.close()
+            raise
+        return websocket
+
+    def _connection_pool(self) -> WebsocketConnectionPool:
+        # Keyed by a hash of the API key, the pools registry must not hold the key itself
+        api_key_hash = hashlib.sha256(self.eleven.api_key.encode()).hexdigest()[:16]
+        return get_connection_pool(
+            f"eleven:{api_key_hash}:{self._uri()}",
+            lambda: WebsocketConnectionPool(
+                self._connect,
+                size=self.eleven.connection_pool_size,
+                max_idle_s=self.eleven.inactivity_timeout_s * 0.8,
+            ),
+        )
 
-    async def _text_chunker(self, chunks: AsyncIterator[str]):
-        """Split text into chunks, ensuring to not break sentences."""
-        logger.debug("Starting text chunking")
-        splitters = (
-            ".",
-            ",",
-            "?",
-            "!",
-            ";",
-            ":",
-            "—",
-            "-",
-            "(",
-            ")",
-            "[",
-            "]",
-            "}",
-            " ",
+    async def _acquire_connection(self) -> PooledConnection:
+        if self.eleven.connection_pool_size:
+            return await self._connection_pool().acquire()
+        start = time.monotonic()
+        websocket = await self._connect()
+        return PooledConnection(
+            websocket=websocket,
+            warm=False,
+            acquire_time=time.monotonic() - start,
+            time_saved=0,
         )
-        buffer = ""
-
-        async for text in chunks:
-            if buffer.endswith(splitters):
-                yield buffer + " "
-                buffer = text
-            elif text.startswith(splitters):
-                yield buffer + text[0] + " "
-                buffer = text[1:]
-            else:
-                buffer += text
-
-        if buffer:
-            yield buffer + " "
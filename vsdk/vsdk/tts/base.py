@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable
 from typing import List, Optional
 
 from pydantic import BaseModel
@@ -15,14 +15,7 @@ class AudioChunk(BaseModel):
     audio: bytes
     base64_audio: str
     normalized_alignment: Optional[NormalizedAlignment]
-
-
-class BaseTTS(ABC):
-    @abstractmethod
-    def __call__(
-        self, input_generator: AsyncIterator[str]
-    ) -> AsyncIterator[AudioChunk]:
-        pass
+    output_format: Optional[str] = None
 
 
 class TTSResult(BaseModel):
@@ -30,7 +23,67 @@ class TTSResult(BaseModel):
     end_time: float
     first_chunk_time: float
     response: str
+    output_format: str
+    transcoded: bool
+    # Time waited for the provider connection and time saved on it by a warm connection
+    connection_time: float = 0
+    connection_time_saved: float = 0
+    # Phrases replayed from the phrase cache and phrases synthesized by the provider
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Text chunks sent to the provider and time from the first LLM token to the first chunk
+    text_chunks: int = 0
+    first_text_chunk_latency: float = 0
 
     @classmethod
     def empty(cls) -> "TTSResult":
-        return cls(start_time=0, end_time=0, first_chunk_time=0, response="")
+        return cls(
+            start_time=0,
+            end_time=0,
+            first_chunk_time=0,
+            response="",
+            output_format="",
+            transcoded=False,
+        )
+
+    def update(self, other: "TTSResult", timings: bool = True) -> None:
+        """:param timings: also take start, first chunk and end time, off when they are measured elsewhere"""
+        if timings:
+            self.start_time = other.start_time
+            self.end_time = other.end_time
+            self.first_chunk_time = other.first_chunk_time
+        self.response = other.response
+        self.output_format = other.output_format
+        self.transcoded = other.transcoded
+        self.connection_time = other.connection_time
+        self.connection_time_saved = other.connection_time_saved
+        self.cache_hits = other.cache_hits
+        self.cache_misses = other.cache_misses
+        self.text_chunks = other.text_chunks
+        self.first_text_chunk_latency = other.first_text_chunk_latency
+
+    def accumulate(self, other: "TTSResult") -> None:
+        """Add counters of a part (e.g. one sentence) synthesized separately."""
+        self.transcoded = self.transcoded or other.transcoded
+        self.connection_time += other.connection_time
+        self.connection_time_saved += other.connection_time_saved
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.text_chunks += other.text_chunks
+
+
+class BaseTTS(ABC):
+    @abstractmethod
+    def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        pass
+
+    def cache_key(self) -> Optional[str]:
+        """Identifies everything besides text that changes the audio (voice, model, format...), None disables caching."""
+        return None
+
+    async def warmup(self) -> None:
+        """Prepare models and connections before the first call, at startup."""
@@ -0,0 +1,577 @@
+"""
+Synthesized phrase cache.
+
+Voice agents repeat themselves (greetings, "one moment please", confirmations). CachedTTS replays
+runs of sentences synthesized before straight from memory or disk. Text the cache can't serve is
+streamed to a provider session token by token as it arrives, so a miss costs no latency: only text
+that is still the beginning of a cached phrase is held back until it completes or diverges.
+Once the text of a session is complete it is in flight under its phrase: concurrent responses
+with the same phrase share its audio instead of synthesizing it again.
+"""
+
+import asyncio
+import base64
+import bisect
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from vsdk.tasks import aclose_iterator, cancel_and_wait
+from vsdk.tts.base import AudioChunk, BaseTTS, NormalizedAlignment, TTSResult
+from vsdk.tts.text import SentenceSplitter, normalize_phrase
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+class DiskPhraseCache:
+    """
+    One file per phrase: header length, JSON header (key, chunk sizes, alignment), raw audio.
+    Files are memory-mapped, read and written in a worker thread, the index is only touched on the
+    event loop.
+    """
+
+    def __init__(self, directory: str, budget_bytes: int):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self._index: "OrderedDict[CacheKey, Tuple[str, int]]" = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(size for _, size in self._index.values())
+
+    def keys(self) -> List[CacheKey]:
+        return list(self._index)
+
+    def contains(self, key: CacheKey) -> bool:
+        return key in self._index
+
+    async def get(self, key: CacheKey) -> Optional[List[AudioChunk]]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        self._index.move_to_end(key)
+        try:
+            return (await asyncio.to_thread(self._read, entry[0]))[1]
+        except (OSError, ValueError) as e:
+            logger.warning(f"🗄️ Dropping unreadable phrase cache file {entry[0]}: {e}")
+            await self._remove(key)
+            return None
+
+    async def put(self, key: CacheKey, chunks: List[AudioChunk]) -> List[CacheKey]:
+        """Store the phrase, returns the phrases evicted to stay within the budget."""
+        path = os.path.join(
+            self.directory, hashlib.sha256(json.dumps(key).encode()).hexdigest() + ".phrase"
+        )
+        size = await asyncio.to_thread(self._write, path, key, chunks)
+
+        self._index[key] = (path, size)
+        self._index.move_to_end(key)
+        evicted: List[Tuple[CacheKey, str]] = []
+        while self.size_bytes > self.budget_bytes and len(self._index) > 1:
+            evicted_key, (evicted_path, _) = self._index.popitem(last=False)
+            evicted.append((evicted_key, evicted_path))
+        if evicted:
+            await asyncio.to_thread(_remove_files, [path for _, path in evicted])
+        return [key for key, _ in evicted]
+
+    async def _remove(self, key: CacheKey):
+        entry = self._index.pop(key, None)
+        if entry:
+            await asyncio.to_thread(_remove_files, [entry[0]])
+
+    def _load_index(self):
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".phrase")
+        ]
+        for path in sorted(files, key=os.path.getmtime):
+            try:
+                key, _ = self._read(path, audio=False)
+            except (OSError, ValueError):
+                continue
+            self._index[key] = (path, os.path.getsize(path))
+
+    @staticmethod
+    def _write(path: str, key: CacheKey, chunks: List[AudioChunk]) -> int:
+        header = json.dumps(
+            {
+                "key": list(key),
+                "chunks": [
+                    {
+                        "size": len(chunk.audio),
+                        "output_format": chunk.output_format,
+                        "alignment": (
+                            chunk.normalized_alignment.model_dump()
+                            if chunk.normalized_alignment
+                            else None
+                        ),
+                    }
+                    for chunk in chunks
+                ],
+            }
+        ).encode()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(struct.pack("<I", len(header)) + header)
+            for chunk in chunks:
+                file.write(chunk.audio)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    @staticmethod
+    def _read(path: str, audio: bool = True) -> Tuple[CacheKey, List[AudioChunk]]:
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                (header_size,) = struct.unpack("<I", mapped[:4])
+                header = json.loads(mapped[4 : 4 + header_size])
+                key = (header["key"][0], header["key"][1])
+                if not audio:
+                    return key, []
+                chunks, offset = [], 4 + header_size
+                for meta in header["chunks"]:
+                    data = mapped[offset : offset + meta["size"]]
+                    if len(data) != meta["size"]:
+                        raise ValueError("truncated audio")
+                    offset += meta["size"]
+                    chunks.append(_audio_chunk(data, meta["output_format"], meta["alignment"]))
+                return key, chunks
+
+
+class PhraseCache:
+    """
+    In-memory LRU of synthesized phrases bounded by audio bytes, with an optional disk tier.
+    Shared between conversations, so one instance per process is enough.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = 32 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_budget_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._memory: "OrderedDict[CacheKey, Tuple[List[AudioChunk], int]]" = OrderedDict()
+        self.memory_size_bytes = 0
+        self.disk = DiskPhraseCache(disk_dir, disk_budget_bytes) if disk_dir else None
+        # Phrases being synthesized whose text is complete, shared by concurrent responses
+        self._inflight: Dict[CacheKey, "_LivePart"] = {}
+        # Sorted keys of both tiers and in flight, phrases starting with some text are together
+        self._keys: List[CacheKey] = sorted(self.disk.keys()) if self.disk else []
+
+    def contains(self, key: CacheKey) -> bool:
+        return key in self._memory or (self.disk is not None and self.disk.contains(key))
+
+    def inflight(self, key: CacheKey) -> Optional["_LivePart"]:
+        return self._inflight.get(key)
+
+    def start_inflight(self, key: CacheKey, part: "_LivePart"):
+        if key in self._inflight or self.contains(key):
+            return
+        self._inflight[key] = part
+        self._remember(key)
+
+    def end_inflight(self, key: CacheKey, part: "_LivePart"):
+        if self._inflight.get(key) is part:
+            del self._inflight[key]
+            self._forget([key])
+
+    def has_prefix(self, tts_key: str, text: str) -> bool:
+        """Whether a cached or in flight phrase starts with the (normalized) text."""
+        idx = bisect.bisect_left(self._keys, (tts_key, text))
+        return (
+            idx < len(self._keys)
+            and self._keys[idx][0] == tts_key
+            and self._keys[idx][1].startswith(text)
+        )
+
+    async def get(self, key: CacheKey) -> Optional[List[AudioChunk]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry[0]
+        if self.disk:
+            chunks = await self.disk.get(key)
+            if chunks is not None:
+                self._put_memory(key, chunks)
+                return chunks
+            self._forget([key])
+        return None
+
+    async def put(self, key: CacheKey, chunks: List[AudioChunk]):
+        self._put_memory(key, chunks)
+        if self.disk:
+            try:
+                evicted = await self.disk.put(key, chunks)
+            except OSError as e:
+                logger.warning(f"🗄️ Failed to write phrase to disk cache: {e}")
+            else:
+                self._remember(key)
+                self._forget(evicted)
+
+    def _put_memory(self, key: CacheKey, chunks: List[AudioChunk]):
+        size = sum(len(chunk.audio) + len(chunk.base64_audio) for chunk in chunks)
+        if size > self.memory_budget_bytes:
+            return
+        if key in self._memory:
+            self.memory_size_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (chunks, size)
+        self.memory_size_bytes += size
+        self._remember(key)
+        evicted = []
+        while self.memory_size_bytes > self.memory_budget_bytes:
+            evicted_key, (_, evicted_size) = self._memory.popitem(last=False)
+            self.memory_size_bytes -= evicted_size
+            evicted.append(evicted_key)
+        self._forget(evicted)
+
+    def _remember(self, key: CacheKey):
+        idx = bisect.bisect_left(self._keys, key)
+        if idx == len(self._keys) or self._keys[idx] != key:
+            self._keys.insert(idx, key)
+
+    def _forget(self, keys: List[CacheKey]):
+        """Drop keys that are in neither tier nor in flight anymore from the prefix index."""
+        for key in keys:
+            if self.contains(key) or key in self._inflight:
+                continue
+            idx = bisect.bisect_left(self._keys, key)
+            if idx < len(self._keys) and self._keys[idx] == key:
+                del self._keys[idx]
+
+
+class _LivePart:
+    """
+    Text the cache can't serve, streamed to one provider session as it arrives. The audio is kept
+    for every subscriber, the response that started the session and the ones that joined it once
+    its text was complete. The session is cancelled when the last subscriber lets go before the
+    audio is done.
+    """
+
+    def __init__(self):
+        self.sent: List[str] = []
+        self.key: Optional[CacheKey] = None
+        self.chunks: List[AudioChunk] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.result = TTSResult.empty()
+        self.task: Optional[asyncio.Task[None]] = None
+        self.subscribers = 1
+        # Nobody listened anymore, the session is cut short
+        self.cancelled = False
+        self._text: asyncio.Queue[str | None] = asyncio.Queue()
+        self._changed = asyncio.Event()
+
+    def send(self, text: str):
+        self.sent.append(text)
+        self._text.put_nowait(text)
+
+    def close(self, key: CacheKey):
+        """All text of the part was sent, it ends on a sentence boundary."""
+        self.key = key
+        self._text.put_nowait(None)
+
+    async def text(self) -> AsyncIterator[str]:
+        while (text := await self._text.get()) is not None:
+            yield text
+
+    def add(self, chunk: AudioChunk):
+        self.chunks.append(chunk)
+        self._changed.set()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._changed.set()
+
+    async def replay(self) -> AsyncIterator[AudioChunk]:
+        """All audio of the part, from the start, as it arrives."""
+        idx = 0
+        while True:
+            while idx < len(self.chunks):
+                yield self.chunks[idx]
+                idx += 1
+            if self.done:
+                break
+            self._changed.clear()
+            await self._changed.wait()
+        if self.error:
+            raise self.error
+
+    def subscribe(self):
+        self.subscribers += 1
+
+    def release(self) -> Optional[asyncio.Task[None]]:
+        """Let go of the audio, returns the session to cancel if nobody needs it anymore."""
+        self.subscribers -= 1
+        if self.subscribers == 0 and not self.done:
+            self.cancelled = True
+            return self.task
+        return None
+
+
+class _PhraseRouter:
+    """
+    Splits the response text into cached runs of sentences and live parts. Text is held back only
+    while it is the beginning of a cached or in flight phrase. When it diverges, the longest cached
+    or in flight run of whole held sentences is replayed and the rest goes live.
+    """
+
+    def __init__(
+        self,
+        cache: PhraseCache,
+        tts_key: str,
+        start_live: Callable[[], _LivePart],
+        replay: Callable[[List[AudioChunk]], None],
+        join: Callable[[_LivePart], None],
+    ):
+        self.cache = cache
+        self.tts_key = tts_key
+        self.start_live = start_live
+        self.replay = replay
+        self.join = join
+        self.live: Optional[_LivePart] = None
+        self.splitter = SentenceSplitter()
+        self.held: List[str] = []
+        # Characters of the pending sentence already sent live, the sentence diverged
+        self.forwarded = 0
+
+    async def feed(self, text: str):
+        for sentence in self.splitter.feed(text):
+            if self.forwarded:
+                self._send(sentence[self.forwarded :])
+                self.forwarded = 0
+            else:
+                self.held.append(sentence)
+                await self._resolve("", end=False)
+        pending = self.splitter.pending
+        if self.forwarded:
+            self._send(pending[self.forwarded :])
+            self.forwarded = len(pending)
+        else:
+            await self._resolve(pending, end=False)
+
+    async def end(self):
+        pending = self.splitter.pending
+        if self.forwarded:
+            self._send(pending[self.forwarded :])
+        elif pending.strip():
+            self.held.append(pending)
+        self.forwarded = 0
+        await self._resolve("", end=True)
+        self._close_live()
+
+    async def _resolve(self, partial: str, end: bool):
+        while self.held or partial.strip():
+            text = "".join(self.held) + partial
+            if not text.strip():
+                return
+            if not end and self.cache.has_prefix(self.tts_key, _prefix_form(text)):
+                return
+
+            for count in range(len(self.held), 0, -1):
+                key = (self.tts_key, normalize_phrase("".join(self.held[:count])))
+                if self.cache.contains(key):
+                    chunks = await self.cache.get(key)
+                    if chunks:
+                        self._close_live()
+                        self.replay(chunks)
+                        del self.held[:count]
+                        break
+                elif (inflight := self.cache.inflight(key)) and not inflight.cancelled:
+                    self._close_live()
+                    self.join(inflight)
+                    del self.held[:count]
+                    break
+            else:
+                if self.held:
+                    self._send(self.held.pop(0))
+                else:
+                    self._send(partial)
+                    self.forwarded = len(partial)
+                    return
+
+    def _send(self, text: str):
+        if not text:
+            return
+        if self.live is None:
+            self.live = self.start_live()
+        self.live.send(text)
+
+    def _close_live(self):
+        """The live part is complete, concurrent responses with the same phrase can join it."""
+        if self.live is None:
+            return
+        key = (self.tts_key, normalize_phrase("".join(self.live.sent)))
+        self.live.close(key)
+        if not self.live.done:
+            self.cache.start_inflight(key, self.live)
+        self.live = None
+
+
+class CachedTTS(BaseTTS):
+    """
+    Wraps any BaseTTS with a cache key. Runs of sentences found in the cache are replayed at full
+    speed without the provider, the rest is streamed to the wrapped TTS. A live part that ends on a
+    sentence boundary is stored as one phrase, responses reaching the same phrase while it is
+    synthesized share its audio.
+    """
+
+    def __init__(self, tts: BaseTTS, cache: PhraseCache):
+        self.tts = tts
+        self.cache = cache
+
+    def cache_key(self) -> Optional[str]:
+        return self.tts.cache_key()
+
+    async def warmup(self) -> None:
+        await self.tts.warmup()
+
+    def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        tts_key = self.tts.cache_key()
+        if tts_key is None:
+            logger.warning("🗄️ TTS has no cache key, phrase cache disabled")
+            return self.tts(input_generator, callback)
+        return self._cached_stream(tts_key, input_generator, callback)
+
+    async def _cached_stream(
+        self,
+        tts_key: str,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        tts_result = TTSResult.empty()
+        tts_result.start_time = time.time()
+        parts: asyncio.Queue[_LivePart | List[AudioChunk] | None] = asyncio.Queue()
+        # Parts started by this response and all parts it subscribed to, started ones included
+        live_parts: List[_LivePart] = []
+        subscribed: List[_LivePart] = []
+        text: List[str] = []
+
+        async def synthesize(part: _LivePart):
+            audio = self.tts(part.text(), callback=part.result.update)
+            error: Optional[BaseException] = None
+            try:
+                try:
+                    async for chunk in audio:
+                        part.add(chunk)
+                except Exception as e:
+                    error = e
+                finally:
+                    await aclose_iterator(audio)
+                    part.finish(error)
+                # Cut short by a teardown or failed, the audio is not the whole phrase
+                if part.key and error is None and part.chunks:
+                    await self.cache.put(part.key, part.chunks)
+            finally:
+                if part.key:
+                    self.cache.end_inflight(part.key, part)
+
+        def start_live() -> _LivePart:
+            part = _LivePart()
+            part.task = asyncio.create_task(synthesize(part))
+            live_parts.append(part)
+            subscribed.append(part)
+            parts.put_nowait(part)
+            return part
+
+        def join(part: _LivePart):
+            part.subscribe()
+            subscribed.append(part)
+            parts.put_nowait(part)
+
+        async def route():
+            router = _PhraseRouter(self.cache, tts_key, start_live, parts.put_nowait, join)
+            try:
+                async for chunk in input_generator:
+                    text.append(chunk)
+                    await router.feed(chunk)
+                await router.end()
+            finally:
+                parts.put_nowait(None)
+                # Stopped early, the LLM stream is closed now rather than when garbage collected
+                await aclose_iterator(input_generator)
+
+        route_task = asyncio.create_task(route())
+        try:
+            while (part := await parts.get()) is not None:
+                if isinstance(part, _LivePart):
+                    own = any(part is live_part for live_part in live_parts)
+                    if own:
+                        tts_result.cache_misses += 1
+                    else:
+                        # Synthesized for a concurrent response
+                        tts_result.cache_hits += 1
+                    async for chunk in part.replay():
+                        yield self._first_chunk(tts_result, chunk)
+                    if own:
+                        tts_result.accumulate(part.result)
+                        if not tts_result.first_text_chunk_latency:
+                            tts_result.first_text_chunk_latency = (
+                                part.result.first_text_chunk_latency
+                            )
+                else:
+                    tts_result.cache_hits += 1
+                    for chunk in part:
+                        yield self._first_chunk(tts_result, chunk)
+            await route_task
+            # Live parts are stored in the cache once their audio is out
+            await asyncio.gather(*(part.task for part in live_parts if part.task))
+        finally:
+            # Sessions other responses still listen to keep running
+            unused = [part.release() for part in subscribed]
+            await cancel_and_wait([route_task] + unused)
+
+        tts_result.end_time = time.time()
+        tts_result.response = "".join(text).strip()
+        logger.info(
+            f"🗄️ Phrase cache: {tts_result.cache_hits} hits, {tts_result.cache_misses} misses, {self.cache.memory_size_bytes} bytes in memory"
+        )
+        if callback:
+            callback(tts_result)
+
+    @staticmethod
+    def _first_chunk(tts_result: TTSResult, chunk: AudioChunk) -> AudioChunk:
+        if not tts_result.first_chunk_time:
+            tts_result.first_chunk_time = time.time()
+        if chunk.output_format:
+            tts_result.output_format = chunk.output_format
+        return chunk
+
+
+def _prefix_form(text: str) -> str:
+    """Normalized text, a trailing space kept so a finished word doesn't match a longer one."""
+    return normalize_phrase(text) + (" " if text[-1:].isspace() else "")
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _audio_chunk(
+    audio: bytes, output_format: Optional[str], alignment: Optional[dict]
+) -> AudioChunk:
+    return AudioChunk(
+        audio=audio,
+        base64_audio=base64.b64encode(audio).decode("utf-8"),
+        normalized_alignment=NormalizedAlignment(**alignment) if alignment else None,
+        output_format=output_format,
+    )
@@ -0,0 +1,151 @@
+"""
+Latency-adaptive text chunking for streaming TTS.
+
+The first chunk decides time to first audio, so it is flushed aggressively: at the first clause
+boundary, after a few words, or when a deadline since the first token passes. Later chunks are
+whole sentences, which the provider voices with better prosody. When the LLM stalls, whatever is
+buffered is flushed so the provider is not left idle.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from vsdk.tasks import aclose_iterator
+from vsdk.tts.text import SENTENCE_END, ends_with_abbreviation
+
+logger = logging.getLogger(__name__)
+
+CLAUSE_END = re.compile(r"[,;:—]\s+")
+
+
+class TextChunker:
+    """Re-chunks an LLM token stream for TTS. Create one per turn, it keeps the turn's stats."""
+
+    def __init__(
+        self,
+        first_chunk_words: int = 4,
+        first_chunk_deadline_ms: int = 300,
+        idle_flush_ms: int = 400,
+        max_chunk_chars: int = 250,
+    ):
+        self.first_chunk_words = first_chunk_words
+        self.first_chunk_deadline_ms = first_chunk_deadline_ms
+        self.idle_flush_ms = idle_flush_ms
+        self.max_chunk_chars = max_chunk_chars
+
+        self.chunks = 0
+        self.first_token_time: Optional[float] = None
+        self.first_chunk_time: Optional[float] = None
+        self.flush_reasons: Dict[str, int] = {}
+
+    async def __call__(self, tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Chunks end with a space, as the provider expects."""
+        buffer = ""
+        iterator = aiter(tokens)
+        next_token: Optional[asyncio.Future[str]] = None
+        # Nothing flushable until the next token, e.g. the LLM stalled mid word
+        waiting_for_token = False
+        try:
+            while True:
+                if next_token is None:
+                    next_token = asyncio.ensure_future(anext(iterator))
+                timeout = None if waiting_for_token else self._timeout(buffer)
+                done, _ = await asyncio.wait([next_token], timeout=timeout)
+                if not done:
+                    reason = "deadline" if self.first_chunk_time is None else "idle"
+                    chunk, buffer = self._split_at_word(buffer)
+                    if chunk.strip():
+                        yield self._flush(chunk, reason)
+                    waiting_for_token = True
+                    continue
+
+                waiting_for_token = False
+
+                try:
+                    buffer += next_token.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_token = None
+                if self.first_token_time is None:
+                    self.first_token_time = time.monotonic()
+
+                while True:
+                    chunk, buffer, reason = self._next_chunk(buffer)
+                    if chunk is None:
+                        break
+                    if chunk.strip():
+                        yield self._flush(chunk, reason)
+        finally:
+            if next_token is not None:
+                next_token.cancel()
+                await asyncio.wait([next_token])
+            # Stopped early, the LLM stream is closed now rather than when garbage collected
+            await aclose_iterator(iterator)
+
+        if buffer.strip():
+            yield self._flush(buffer, "end")
+
+    @property
+    def first_chunk_latency(self) -> Optional[float]:
+        """Time from the first LLM token to the first chunk sent to the provider."""
+        if self.first_token_time is None or self.first_chunk_time is None:
+            return None
+        return self.first_chunk_time - self.first_token_time
+
+    def _timeout(self, buffer: str) -> Optional[float]:
+        if not buffer.strip():
+            return None
+        if self.first_chunk_time is None and self.first_token_time is not None:
+            elapsed = time.monotonic() - self.first_token_time
+            return max(0.0, self.first_chunk_deadline_ms / 1000 - elapsed)
+        return self.idle_flush_ms / 1000
+
+    def _next_chunk(self, buffer: str) -> tuple[Optional[str], str, str]:
+        end = _last_boundary(SENTENCE_END, buffer)
+        if end:
+            return buffer[:end], buffer[end:], "sentence"
+
+        if self.first_chunk_time is None:
+            end = _last_boundary(CLAUSE_END, buffer)
+            if end:
+                return buffer[:end], buffer[end:], "clause"
+            words = buffer.split()
+            # The last word may still be growing, wait for the space after it
+            if len(words) > self.first_chunk_words or (
+                len(words) == self.first_chunk_words and buffer[-1].isspace()
+            ):
+                chunk, rest = self._split_at_word(buffer)
+                return chunk, rest, "words"
+        elif len(buffer) > self.max_chunk_chars:
+            end = _last_boundary(CLAUSE_END, buffer)
+            chunk, rest = (buffer[:end], buffer[end:]) if end else self._split_at_word(buffer)
+            if chunk:
+                return chunk, rest, "max_chars"
+        return None, buffer, ""
+
+    @staticmethod
+    def _split_at_word(buffer: str) -> tuple[str, str]:
+        """Split after the last complete word, a word still being streamed stays buffered."""
+        end = max(buffer.rfind(" "), buffer.rfind("\n")) + 1
+        return buffer[:end], buffer[end:]
+
+    def _flush(self, chunk: str, reason: str) -> str:
+        self.chunks += 1
+        self.flush_reasons[reason] = self.flush_reasons.get(reason, 0) + 1
+        if self.first_chunk_time is None:
+            self.first_chunk_time = time.monotonic()
+        return chunk.strip() + " "
+
+
+def _last_boundary(pattern: re.Pattern[str], buffer: str) -> int:
+    """End of the last boundary match, skipping abbreviations such as "Mr." """
+    end = 0
+    for match in pattern.finditer(buffer):
+        if ends_with_abbreviation(buffer[: match.end()]):
+            continue
+        end = match.end()
+    return end
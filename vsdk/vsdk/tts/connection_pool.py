@@ -0,0 +1,194 @@
+"""
+Pool of warm, already initialized TTS websocket connections.
+
+Provider streaming websockets serve a single generation, so every agent response needs a fresh
+connection: TCP + TLS + websocket handshake + initial (auth, voice settings) message. The pool
+opens connections ahead of time, so a turn only takes one that is ready, and refills in the
+background. Idle connections are pinged and recycled before the provider closes them.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from pydantic import BaseModel
+from websockets.asyncio.client import ClientConnection
+from websockets.protocol import State
+
+logger = logging.getLogger(__name__)
+
+
+class PooledConnection(BaseModel):
+    websocket: ClientConnection
+    warm: bool
+    # Time the turn waited for the connection
+    acquire_time: float
+    # Estimated connect time saved by taking a warm connection
+    time_saved: float
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class _IdleConnection:
+    def __init__(self, websocket: ClientConnection):
+        self.websocket = websocket
+        self.opened_at = time.monotonic()
+
+
+class WebsocketConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[ClientConnection]],
+        size: int = 1,
+        max_idle_s: float = 150,
+        health_check_interval_s: float = 10,
+        ping_timeout_s: float = 2,
+    ):
+        """
+        :param connect: opens and initializes a connection
+        :param max_idle_s: connections idle for longer are recycled, keep below provider timeout
+        """
+        self.connect = connect
+        self.size = size
+        self.max_idle_s = max_idle_s
+        self.health_check_interval_s = health_check_interval_s
+        self.ping_timeout_s = ping_timeout_s
+
+        self.loop = asyncio.get_running_loop()
+        self._idle: List[_IdleConnection] = []
+        self._connecting = 0
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._health_check_task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+        self.cold_connect_time: Optional[float] = None
+
+    async def fill(self) -> None:
+        """Open connections until the pool is full."""
+        missing = self.size - len(self._idle) - self._connecting
+        await asyncio.gather(*(self._open() for _ in range(max(0, missing))))
+        self._ensure_health_check()
+
+    async def acquire(self) -> PooledConnection:
+        """Take a warm connection, or connect now if none is ready. The caller closes it."""
+        start = time.monotonic()
+        self._ensure_health_check()
+        while self._idle:
+            idle = self._idle.pop(0)
+            if self._is_usable(idle):
+                self._refill()
+                return PooledConnection(
+                    websocket=idle.websocket,
+                    warm=True,
+                    acquire_time=time.monotonic() - start,
+                    time_saved=max(
+                        0.0,
+                        (self.cold_connect_time or 0) - (time.monotonic() - start),
+                    ),
+                )
+            await idle.websocket.close()
+
+        websocket = await self._timed_connect()
+        self._refill()
+        return PooledConnection(
+            websocket=websocket,
+            warm=False,
+            acquire_time=time.monotonic() - start,
+            time_saved=0,
+        )
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._tasks) + [self._health_check_task]:
+            if task:
+                task.cancel()
+        idle, self._idle = self._idle, []
+        await asyncio.gather(
+            *(connection.websocket.close() for connection in idle),
+            return_exceptions=True,
+        )
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def _timed_connect(self) -> ClientConnection:
+        start = time.monotonic()
+        websocket = await self.connect()
+        connect_time = time.monotonic() - start
+        self.cold_connect_time = (
+            connect_time
+            if self.cold_connect_time is None
+            else 0.8 * self.cold_connect_time + 0.2 * connect_time
+        )
+        return websocket
+
+    async def _open(self) -> None:
+        self._connecting += 1
+        try:
+            websocket = await self._timed_connect()
+        except Exception as e:
+            logger.warning(f"🔌 Failed to open pooled connection: {e}")
+            return
+        finally:
+            self._connecting -= 1
+
+        if self._closed:
+            await websocket.close()
+        else:
+            self._idle.append(_IdleConnection(websocket))
+
+    def _refill(self) -> None:
+        if self._closed:
+            return
+        for _ in range(self.size - len(self._idle) - self._connecting):
+            task = asyncio.create_task(self._open())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _is_usable(self, idle: _IdleConnection) -> bool:
+        return (
+            idle.websocket.state is State.OPEN
+            and time.monotonic() - idle.opened_at < self.max_idle_s
+        )
+
+    def _ensure_health_check(self) -> None:
+        if self._health_check_task is None or self._health_check_task.done():
+            self._health_check_task = asyncio.create_task(self._health_check())
+
+    async def _health_check(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval_s)
+            for idle in list(self._idle):
+                if self._is_usable(idle) and await self._ping(idle.websocket):
+                    continue
+                logger.info("🔌 Recycling stale pooled connection")
+                if idle in self._idle:
+                    self._idle.remove(idle)
+                await idle.websocket.close()
+            self._refill()
+
+    async def _ping(self, websocket: ClientConnection) -> bool:
+        try:
+            pong = await websocket.ping()
+            await asyncio.wait_for(pong, self.ping_timeout_s)
+            return True
+        except Exception:
+            return False
+
+
+_pools: Dict[str, WebsocketConnectionPool] = {}
+
+
+def get_connection_pool(
+    key: str, factory: Callable[[], WebsocketConnectionPool]
+) -> WebsocketConnectionPool:
+    """
+    Pool shared by all processors with the same key (provider, voice, model, format...).
+    Keys are kept for the process lifetime, they must not contain secrets such as API keys.
+    """
+    pool = _pools.get(key)
+    if pool is None or pool.loop is not asyncio.get_running_loop():
+        pool = _pools[key] = factory()
+    return pool
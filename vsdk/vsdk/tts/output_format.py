@@ -0,0 +1,173 @@
+"""
+Output format negotiation between the transport and the TTS provider.
+
+The transport declares which formats it can play (Twilio: ulaw_8000, browser: pcm_16000...).
+If the provider can produce one of them natively we ask for it directly, otherwise we ask for
+the provider default and transcode locally with AudioTranscoder.
+"""
+
+import logging
+from typing import List, Literal
+
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ULAW_BIAS = 0x84
+ULAW_CLIP = 32635
+
+
+class AudioFormat(BaseModel):
+    encoding: Literal["pcm", "ulaw"]
+    sample_rate: int
+
+    @classmethod
+    def parse(cls, output_format: str) -> "AudioFormat":
+        """Parse provider style format names like `pcm_16000` or `ulaw_8000`."""
+        parts = output_format.split("_")
+        if len(parts) != 2 or parts[0] not in ("pcm", "ulaw") or not parts[1].isdigit():
+            raise ValueError(f"Unsupported audio format: {output_format}")
+        return cls(encoding=parts[0], sample_rate=int(parts[1]))  # type: ignore
+
+    @property
+    def name(self) -> str:
+        return f"{self.encoding}_{self.sample_rate}"
+
+    @property
+    def bytes_per_sample(self) -> int:
+        return 2 if self.encoding == "pcm" else 1
+
+    def bytes_for_ms(self, ms: int) -> int:
+        return self.sample_rate * ms // 1000 * self.bytes_per_sample
+
+    def fade_in(self, audio: bytes, samples: int) -> bytes:
+        """Linearly fade in the first `samples` samples of the audio."""
+        if samples <= 0 or not audio:
+            return audio
+        head_bytes = samples * self.bytes_per_sample
+        head = self.to_pcm(audio[:head_bytes]).astype(np.float64)
+        head *= np.linspace(0, 1, len(head), endpoint=False)
+        return self.from_pcm(np.round(head).astype(np.int16)) + audio[head_bytes:]
+
+    def crossfade(self, fading_out: bytes, fading_in: bytes) -> bytes:
+        """Mix the head of `fading_in` with `fading_out` fading out over its length."""
+        samples = min(len(fading_out), len(fading_in)) // self.bytes_per_sample
+        if samples <= 0:
+            return fading_in
+        head_bytes = samples * self.bytes_per_sample
+        ramp = np.linspace(0, 1, samples, endpoint=False)
+        mixed = (
+            self.to_pcm(fading_out[:head_bytes]).astype(np.float64) * (1 - ramp)
+            + self.to_pcm(fading_in[:head_bytes]).astype(np.float64) * ramp
+        )
+        return (
+            self.from_pcm(np.clip(np.round(mixed), -32768, 32767).astype(np.int16))
+            + fading_in[head_bytes:]
+        )
+
+    def to_pcm(self, audio: bytes) -> NDArray[np.int16]:
+        if self.encoding == "ulaw":
+            return ulaw_to_pcm(np.frombuffer(audio, dtype=np.uint8))
+        return np.frombuffer(audio, dtype=np.int16)
+
+    def from_pcm(self, samples: NDArray[np.int16]) -> bytes:
+        if self.encoding == "ulaw":
+            return pcm_to_ulaw(samples).tobytes()
+        return samples.astype(np.int16).tobytes()
+
+
+class OutputFormatNegotiation(BaseModel):
+    provider_format: str
+    transport_format: str
+
+    @property
+    def transcoded(self) -> bool:
+        return self.provider_format != self.transport_format
+
+
+def negotiate_output_format(
+    accepted_formats: List[str], native_formats: List[str], default_format: str
+) -> OutputFormatNegotiation:
+    """
+    Pick the first transport format (in preference order) the provider supports natively.
+    Falls back to the provider default format transcoded to the preferred transport format.
+    """
+    for output_format in accepted_formats:
+        if output_format in native_formats:
+            return OutputFormatNegotiation(
+                provider_format=output_format, transport_format=output_format
+            )
+
+    if not accepted_formats:
+        return OutputFormatNegotiation(
+            provider_format=default_format, transport_format=default_format
+        )
+
+    # Both sides must be understood by the local transcoder, fail fast at session setup
+    AudioFormat.parse(default_format)
+    AudioFormat.parse(accepted_formats[0])
+    return OutputFormatNegotiation(
+        provider_format=default_format, transport_format=accepted_formats[0]
+    )
+
+
+class AudioTranscoder:
+    """
+    Streaming transcoder between pcm/ulaw formats with linear interpolation resampling.
+    Keeps state between calls, so one instance should be used per audio stream.
+    """
+
+    def __init__(self, source_format: str, target_format: str):
+        self.source = AudioFormat.parse(source_format)
+        self.target = AudioFormat.parse(target_format)
+        self._step = self.source.sample_rate / self.target.sample_rate
+        self._carry: NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+        self._phase = 0.0
+        self._odd_byte = b""
+
+    def __call__(self, audio: bytes) -> bytes:
+        audio = self._odd_byte + audio
+        usable = len(audio) - len(audio) % self.source.bytes_per_sample
+        audio, self._odd_byte = audio[:usable], audio[usable:]
+
+        samples = self.source.to_pcm(audio)
+        if self.source.sample_rate != self.target.sample_rate:
+            samples = self._resample(samples)
+        return self.target.from_pcm(samples)
+
+    def _resample(self, samples: NDArray[np.int16]) -> NDArray[np.int16]:
+        carry = np.concatenate([self._carry, samples.astype(np.float64)])
+        if len(carry) < 2:
+            self._carry = carry
+            return np.zeros(0, dtype=np.int16)
+
+        positions = np.arange(self._phase, len(carry) - 1, self._step)
+        resampled = np.interp(positions, np.arange(len(carry)), carry)
+
+        next_position = (
+            positions[-1] + self._step if len(positions) else self._phase
+        )
+        consumed = int(next_position)
+        self._carry = carry[consumed:]
+        self._phase = next_position - consumed
+        return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+
+
+def ulaw_to_pcm(ulaw: NDArray[np.uint8]) -> NDArray[np.int16]:
+    inverted = ~ulaw.astype(np.int32) & 0xFF
+    sign = inverted & 0x80
+    exponent = (inverted >> 4) & 0x07
+    mantissa = inverted & 0x0F
+    magnitude = (((mantissa << 3) + ULAW_BIAS) << exponent) - ULAW_BIAS
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+def pcm_to_ulaw(pcm: NDArray[np.int16]) -> NDArray[np.uint8]:
+    samples = pcm.astype(np.int32)
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), ULAW_CLIP) + ULAW_BIAS
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
@@ -0,0 +1,155 @@
+"""
+Parallel multi-sentence synthesis.
+
+A single streaming connection synthesizes a long answer at roughly real-time speed, while the LLM
+usually finishes much earlier. ParallelSentenceTTS synthesizes upcoming sentences concurrently,
+each over its own provider stream, and yields the audio in sentence order. The first sentence is
+sent to the provider token by token as it arrives, so first chunk latency is unchanged, only the
+sentences after it are synthesized in parallel.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, List, Optional
+
+from vsdk.tasks import aclose_iterator, cancel_and_wait
+from vsdk.tts.base import AudioChunk, BaseTTS, TTSResult
+from vsdk.tts.text import SentenceSplitter
+
+logger = logging.getLogger(__name__)
+
+
+class _SentenceJob:
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.result = TTSResult.empty()
+        self.audio: asyncio.Queue[AudioChunk | None] = asyncio.Queue()
+        self.task: Optional[asyncio.Task[None]] = None
+        # Text of the sentence while it is still streamed, None ends it
+        self.stream: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def streamed_text(self) -> AsyncIterator[str]:
+        while (text := await self.stream.get()) is not None:
+            yield text
+
+
+class ParallelSentenceTTS(BaseTTS):
+    """
+    Wraps any BaseTTS, every sentence is a separate call of the wrapped TTS, so voice settings
+    are the same for all of them. At most `max_concurrency` sentences are synthesized at once.
+    """
+
+    def __init__(self, tts: BaseTTS, max_concurrency: int = 3):
+        self.tts = tts
+        self.max_concurrency = max_concurrency
+
+    def cache_key(self) -> Optional[str]:
+        return self.tts.cache_key()
+
+    async def warmup(self) -> None:
+        await self.tts.warmup()
+
+    async def __call__(
+        self,
+        input_generator: AsyncIterator[str],
+        callback: Optional[Callable[[TTSResult], None]] = None,
+    ) -> AsyncIterator[AudioChunk]:
+        tts_result = TTSResult.empty()
+        tts_result.start_time = time.time()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        jobs: asyncio.Queue[_SentenceJob | None] = asyncio.Queue()
+        started: List[_SentenceJob] = []
+
+        async def synthesize(job: _SentenceJob, text: AsyncIterator[str]):
+            try:
+                async with semaphore:
+                    audio = self.tts(text, callback=job.result.update)
+                    try:
+                        async for chunk in audio:
+                            job.audio.put_nowait(chunk)
+                    finally:
+                        await aclose_iterator(audio)
+            finally:
+                job.audio.put_nowait(None)
+
+        def start(job: _SentenceJob, text: AsyncIterator[str]):
+            job.task = asyncio.create_task(synthesize(job, text))
+            started.append(job)
+            jobs.put_nowait(job)
+
+        def start_sentence(text: str):
+            if text.strip():
+                start(_SentenceJob(text.strip()), _single(text.strip()))
+
+        async def split():
+            splitter = SentenceSplitter()
+            # The first sentence is sent to the provider as it streams, for first chunk latency
+            first: Optional[_SentenceJob] = None
+            first_done = False
+            forwarded = 0
+
+            def stream_first(text: str):
+                nonlocal first, forwarded
+                if first is None:
+                    if not text.strip():
+                        return
+                    first = _SentenceJob()
+                    start(first, first.streamed_text())
+                if text[forwarded:]:
+                    first.stream.put_nowait(text[forwarded:])
+                forwarded = len(text)
+
+            try:
+                async for text in input_generator:
+                    for sentence in splitter.feed(text):
+                        if first_done:
+                            start_sentence(sentence)
+                            continue
+                        stream_first(sentence)
+                        forwarded = 0
+                        if first is not None:
+                            first.text = sentence.strip()
+                            first.stream.put_nowait(None)
+                            first_done = True
+                    if not first_done:
+                        stream_first(splitter.pending)
+
+                if not first_done:
+                    if first is not None:
+                        first.text = splitter.pending.strip()
+                        first.stream.put_nowait(None)
+                else:
+                    start_sentence(splitter.pending)
+            finally:
+                jobs.put_nowait(None)
+                # Stopped early, the LLM stream is closed now rather than when garbage collected
+                await aclose_iterator(input_generator)
+
+        split_task = asyncio.create_task(split())
+        try:
+            while (job := await jobs.get()) is not None:
+                while (chunk := await job.audio.get()) is not None:
+                    if not tts_result.first_chunk_time:
+                        tts_result.first_chunk_time = time.time()
+                    if chunk.output_format:
+                        tts_result.output_format = chunk.output_format
+                    yield chunk
+                # Raises if the synthesis of the sentence failed
+                await job.task  # type: ignore
+                tts_result.accumulate(job.result)
+            await split_task
+        finally:
+            await cancel_and_wait([split_task] + [job.task for job in started])
+
+        tts_result.end_time = time.time()
+        tts_result.response = " ".join(job.text for job in started)
+        logger.info(
+            f"🔊 Synthesized {len(started)} sentences, up to {self.max_concurrency} in parallel, in {tts_result.end_time - tts_result.start_time:.3f}s"
+        )
+        if callback:
+            callback(tts_result)
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
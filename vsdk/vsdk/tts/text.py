@@ -0,0 +1,52 @@
+"""
+Text helpers for TTS: sentence splitting of streamed LLM output and phrase normalization.
+"""
+
+import re
+from typing import AsyncIterator, List
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+# Common abbreviations that end with a dot but do not end a sentence
+ABBREVIATIONS = ("mr.", "mrs.", "ms.", "dr.", "prof.", "e.g.", "i.e.", "etc.", "vs.", "st.")
+
+
+class SentenceSplitter:
+    """Incremental sentence splitting, for text that is acted on before its sentence ends."""
+
+    def __init__(self):
+        # Text of the sentence that has not ended yet
+        self.pending = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Sentences ended by the text, as they were streamed (trailing whitespace included)."""
+        self.pending += text
+        sentences, start = [], 0
+        for match in SENTENCE_END.finditer(self.pending):
+            if ends_with_abbreviation(self.pending[start : match.end()]):
+                continue
+            sentences.append(self.pending[start : match.end()])
+            start = match.end()
+        self.pending = self.pending[start:]
+        return sentences
+
+
+async def split_sentences(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Re-chunk streamed text into whole sentences (with trailing whitespace stripped)."""
+    splitter = SentenceSplitter()
+    async for text in chunks:
+        for sentence in splitter.feed(text):
+            if sentence.strip():
+                yield sentence.strip()
+
+    if splitter.pending.strip():
+        yield splitter.pending.strip()
+
+
+def ends_with_abbreviation(text: str) -> bool:
+    words = text.split()
+    return bool(words) and words[-1].lower().lstrip("(\"'") in ABBREVIATIONS
+
+
+def normalize_phrase(text: str) -> str:
+    """Phrases differing only in whitespace sound the same."""
+    return " ".join(text.split())
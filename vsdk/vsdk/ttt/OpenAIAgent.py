@@ -2,23 +2,38 @@
 Langchain agent
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 import time
-from typing import AsyncIterator, Callable, List, Optional
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
 
 from langchain.chat_models.base import BaseChatModel
 from langchain_core.messages import (
+    AIMessage,
     AIMessageChunk,
     BaseMessage,
     HumanMessage,
     SystemMessage,
+    ToolMessage,
 )
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, tool
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
 
 from vsdk.stt.base import STTResult
-from vsdk.ttt.base import BaseAgent, LLMResult
+from vsdk.tasks import cancel_and_wait
+from vsdk.ttt.base import BaseAgent, LLMResult, ToolTiming
+from vsdk.ttt.memory import (
+    BoundedMemorySaver,
+    ConversationSummaries,
+    MemoryPolicy,
+    window_start,
+)
+from vsdk.ttt.tools import tool_timing
 
 logger = logging.getLogger(__name__)
 
@@ -29,19 +44,167 @@ def what_day_and_time_is_it():
     return time.strftime("%A %H:%M:%S", time.localtime())
 
 
+async def _pump(
+    graph_stream: AsyncIterator[Any],
+    messages: "asyncio.Queue[Optional[BaseMessage]]",
+) -> None:
+    try:
+        async for msg, _ in graph_stream:
+            messages.put_nowait(msg)
+    finally:
+        messages.put_nowait(None)
+
+
+async def _cancel_graph_stream(
+    pump: "asyncio.Task[None]", graph_stream: AsyncIterator[Any]
+) -> None:
+    """
+    Cancel the task running the graph stream and the tasks waiting on queues of this stream:
+    LangGraph leaves its "messages" stream waiter pending when the stream is cancelled. The
+    queues are found while the stream is still suspended, tasks of other streams are not touched.
+    """
+    frame = getattr(graph_stream, "ag_frame", None)
+    queues = (
+        [value for value in frame.f_locals.values() if isinstance(value, asyncio.Queue)]
+        if frame
+        else []
+    )
+    waiters = [
+        task
+        for task in asyncio.all_tasks()
+        if any(_awaited_by(task) is queue for queue in queues)
+    ]
+    await cancel_and_wait([pump])
+    await cancel_and_wait(waiters)
+
+
+def _awaited_by(task: "asyncio.Task[Any]") -> Any:
+    """Object whose method the task runs, if any."""
+    frame = getattr(task.get_coro(), "cr_frame", None)
+    return frame.f_locals.get("self") if frame else None
+
+
 class OpenAIAgent(BaseAgent):
-    def __init__(self, llm: BaseChatModel, system_prompt: str) -> None:
+    def __init__(
+        self,
+        llm: BaseChatModel,
+        system_prompt: str,
+        memory_policy: Optional[MemoryPolicy] = None,
+        summary_llm: Optional[BaseChatModel] = None,
+        tools: Optional[Sequence[BaseTool]] = None,
+    ) -> None:
+        """
+        The compiled graph is shared by all conversations, they are isolated by thread id only.
+
+        :param memory_policy: bounds the prompt window and memory, without it the whole history
+            is sent on every turn and kept forever
+        :param summary_llm: model summarizing turns out of the window, defaults to `llm`
+        :param tools: tools of the agent, defaults to telling the day and time. Wrap them in
+            vsdk.ttt.tools.ManagedTool for timeouts, result caching and timings
+        """
         self.llm = llm
         self.system_prompt = system_prompt
+        self.memory_policy = memory_policy
+        self.model_name: str = (
+            getattr(llm, "model_name", None) or llm.name or llm._llm_type
+        )
         logger.info("Initializing LLMAgent")
-        self.saver = MemorySaver()
+        self.summaries: Optional[ConversationSummaries] = None
+        if memory_policy:
+            if memory_policy.summarize:
+                self.summaries = ConversationSummaries(summary_llm or llm)
+            self.saver: MemorySaver = BoundedMemorySaver(
+                ttl_s=memory_policy.conversation_ttl_s,
+                max_threads=memory_policy.max_conversations,
+                max_checkpoints=memory_policy.max_checkpoints,
+                on_evict=self.summaries.forget if self.summaries else None,
+            )
+        else:
+            self.saver = MemorySaver()
+        self.tools = list(tools) if tools is not None else [what_day_and_time_is_it]
         self.agent = create_react_agent(
             model=self.llm,
             checkpointer=self.saver,
-            prompt=SystemMessage(content=self.system_prompt),
-            tools=[what_day_and_time_is_it],
+            prompt=(
+                self._windowed_prompt
+                if memory_policy
+                else SystemMessage(content=self.system_prompt)
+            ),
+            tools=self.tools,
         )
 
+    def end_conversation(self, conversation_id: str) -> None:
+        self.saver.delete_thread(conversation_id)
+        if self.summaries:
+            self.summaries.forget(conversation_id)
+
+    async def warmup(self) -> None:
+        """
+        Read the state of an empty conversation through the graph and open a connection to the LLM
+        provider, if the client can list models (OpenAI compatible), without spending tokens.
+        """
+        start = time.time()
+        await self.context_key("warmup")
+        client = getattr(self.llm, "root_async_client", None)
+        if client is not None:
+            await client.models.list()
+        logger.info(f"🔥 Agent {self.model_name} warmed up in {time.time() - start:.2f}s")
+
+    async def context_key(self, conversation_id: str) -> Optional[str]:
+        """Hash of the system prompt, tools and the messages the LLM would see before the new turn."""
+        config: RunnableConfig = {"configurable": {"thread_id": conversation_id}}
+        state = await self.agent.aget_state(config)
+        messages: List[BaseMessage] = state.values.get("messages", [])
+        if self.memory_policy:
+            prompt = self._windowed_prompt({"messages": messages}, config)  # type: ignore[typeddict-item]
+        else:
+            prompt = [SystemMessage(content=self.system_prompt)] + messages
+        context = {
+            "tools": [agent_tool.name for agent_tool in self.tools],
+            "messages": [
+                [message.type, message.content, getattr(message, "tool_calls", None)]
+                for message in prompt
+            ],
+        }
+        return hashlib.sha256(
+            json.dumps(context, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    async def record_turn(
+        self, conversation_id: str, transcript: str, response: str
+    ) -> bool:
+        config: RunnableConfig = {"configurable": {"thread_id": conversation_id}}
+        state = await self.agent.aget_state(config)
+        messages: List[BaseMessage] = state.values.get("messages", [])
+        turn: List[BaseMessage] = [AIMessage(content=response)]
+        # A run cancelled before its first token already holds the human message
+        if not (
+            messages
+            and isinstance(messages[-1], HumanMessage)
+            and messages[-1].content == transcript
+        ):
+            turn.insert(0, HumanMessage(content=transcript))
+        await self.agent.aupdate_state(config, {"messages": turn}, as_node="agent")
+        await self._update_summary(conversation_id, config)
+        return True
+
+    def _windowed_prompt(
+        self, state: AgentState, config: RunnableConfig
+    ) -> List[BaseMessage]:
+        assert self.memory_policy
+        messages = state["messages"]
+        system_prompt = self.system_prompt
+        summary = (
+            self.summaries.get(config["configurable"]["thread_id"])
+            if self.summaries
+            else None
+        )
+        if summary:
+            system_prompt += f"\n\nSummary of the earlier conversation: {summary}"
+        return [SystemMessage(content=system_prompt)] + messages[
+            window_start(messages, self.memory_policy) :
+        ]
+
     def __call__(
         self,
         stt_result: STTResult,
@@ -62,22 +225,44 @@ class OpenAIAgent(BaseAgent):
         first_chunk_time = None
         full_response = ""
 
-        async for msg, _ in self.agent.astream(
+        input_tokens = 0
+        tool_calls = 0
+        tool_timings: List[ToolTiming] = []
+        config: RunnableConfig = {"configurable": {"thread_id": conversation_id}}
+
+        graph_stream = self.agent.astream(
             stream_mode="messages",
             input={"messages": [HumanMessage(content=stt_result.transcript)]},
-            config={"configurable": {"thread_id": conversation_id}},
-        ):
-            if isinstance(msg, AIMessageChunk):
-                # Record the time to first chunk
-                if first_chunk_time is None:
-                    first_chunk_time = time.time()
+            config=config,
+        )
+        # The graph runs in its own task, so a teardown can cancel it and what it left behind
+        messages: asyncio.Queue[Optional[BaseMessage]] = asyncio.Queue()
+        pump = asyncio.create_task(_pump(graph_stream, messages), name="agent_graph")
+        try:
+            while (msg := await messages.get()) is not None:
+                if isinstance(msg, ToolMessage):
+                    tool_calls += 1
+                    if timing := tool_timing(msg):
+                        tool_timings.append(timing)
+                if isinstance(msg, AIMessageChunk):
+                    if msg.usage_metadata:
+                        input_tokens += msg.usage_metadata["input_tokens"]
+
+                    # Record the time to first chunk
+                    if first_chunk_time is None:
+                        first_chunk_time = time.time()
 
-                # Accumulate the full response
-                content: str = msg.content  # type: ignore
-                full_response += content
+                    # Accumulate the full response
+                    content: str = msg.content  # type: ignore
+                    full_response += content
 
-                # Yield the content chunk
-                yield content
+                    # Yield the content chunk
+                    yield content
+            # Failures of the graph are raised here
+            await pump
+        finally:
+            if not pump.done():
+                await _cancel_graph_stream(pump, graph_stream)
 
         # Invoke the callback once at the end with all the data
         if callback:
@@ -87,9 +272,22 @@ class OpenAIAgent(BaseAgent):
                     end_time=time.time(),
                     first_chunk_time=first_chunk_time if first_chunk_time else 0,
                     response=full_response,
+                    input_tokens=input_tokens,
+                    tool_calls=tool_calls,
+                    tool_timings=tool_timings,
+                    model=self.model_name,
                 )
             )
 
+        await self._update_summary(conversation_id, config)
+
+    async def _update_summary(self, conversation_id: str, config: RunnableConfig) -> None:
+        if self.summaries and self.memory_policy:
+            state = await self.agent.aget_state(config)
+            self.summaries.update_in_background(
+                conversation_id, state.values["messages"], self.memory_policy
+            )
+
     async def ask(
         self, user_query: str, conversation_id: str, call_sid: Optional[str] = None
     ) -> str:
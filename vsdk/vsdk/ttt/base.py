@@ -1,17 +1,52 @@
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from typing import AsyncIterator, Optional
+from typing import AsyncIterator, List, Optional
 
 from pydantic import BaseModel
 
 from vsdk.stt.base import STTResult
 
 
+# Lives here and not in vsdk.ttt.memory, so configuring it does not import langchain
+class MemoryPolicy(BaseModel):
+    # Prompt window: last turns (a turn starts with a human message) that fit the token budget
+    max_turns: int = 10
+    max_tokens: int = 2000
+    # Summarize turns that fell out of the window into the system prompt
+    summarize: bool = False
+    # Conversations idle for longer are evicted, the least recently used above max_conversations
+    conversation_ttl_s: float = 3600
+    max_conversations: int = 1000
+    # Checkpoints kept per conversation, only the latest is needed to continue it
+    max_checkpoints: int = 2
+
+
+class ToolTiming(BaseModel):
+    name: str
+    latency: float
+    cached: bool = False
+    timed_out: bool = False
+
+
 class LLMResult(BaseModel):
     start_time: float
     end_time: float
     first_chunk_time: float
     response: str
+    # Prompt tokens reported by the provider, summed over the LLM calls of the turn
+    input_tokens: int = 0
+    # Barge-in pauses of the generation, see vsdk.ttt.gate
+    generation_pauses: int = 0
+    generation_paused_time: float = 0
+    # Tools called during the turn, such responses depend on more than the conversation
+    tool_calls: int = 0
+    # Tool calls run through vsdk.ttt.tools.ManagedTool
+    tool_timings: List[ToolTiming] = []
+    # Response replayed from the response cache, see vsdk.ttt.cache
+    cache_hit: bool = False
+    # Model that streamed the response, and whether a fallback model was raced, see vsdk.ttt.hedge
+    model: str = ""
+    hedged: bool = False
 
     @classmethod
     def empty(cls) -> "LLMResult":
@@ -22,6 +57,14 @@ class LLMResult(BaseModel):
         self.end_time = other.end_time
         self.first_chunk_time = other.first_chunk_time
         self.response = other.response
+        self.input_tokens = other.input_tokens
+        self.generation_pauses = other.generation_pauses
+        self.generation_paused_time = other.generation_paused_time
+        self.tool_calls = other.tool_calls
+        self.tool_timings = other.tool_timings
+        self.cache_hit = other.cache_hit
+        self.model = other.model
+        self.hedged = other.hedged
 
 
 class BaseAgent(ABC):
@@ -33,3 +76,25 @@ class BaseAgent(ABC):
         callback: Optional[Callable[[LLMResult], None]] = None,
     ) -> AsyncIterator[str]:
         pass
+
+    def end_conversation(self, conversation_id: str) -> None:
+        """Drop the memory of a finished conversation, agents are shared between conversations."""
+
+    async def warmup(self) -> None:
+        """Prepare models and connections before the first call, at startup."""
+
+    async def context_key(self, conversation_id: str) -> Optional[str]:
+        """
+        Identifies the agent configuration and the conversation context the next response depends
+        on. None disables response caching.
+        """
+        return None
+
+    async def record_turn(
+        self, conversation_id: str, transcript: str, response: str
+    ) -> bool:
+        """
+        Add a turn answered without the LLM to the conversation memory. Returns whether it was
+        recorded, agents without conversation memory don't record anything.
+        """
+        return False
@@ -0,0 +1,152 @@
+"""
+Exact-match response cache for agents.
+
+Calls often start with the same questions ("what are your opening hours?"). CachedAgent replays the
+response given before to the same transcript in the same conversation context, without an LLM round
+trip. The key combines the normalized transcript with the agent context key (system prompt, tools
+and the messages the LLM would see), so a response is reused only where the LLM would get the very
+same prompt. The replayed turn is recorded in the agent memory like an LLM turn.
+"""
+
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from vsdk.stt.base import STTResult
+from vsdk.ttt.base import BaseAgent, LLMResult
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_transcript(transcript: str) -> str:
+    """Transcripts differing only in case, punctuation and whitespace ask the same."""
+    return " ".join(re.sub(r"[^\w\s']", " ", transcript.lower()).split())
+
+
+class ResponseCache:
+    """LRU of agent responses bounded by entries and age. Shared between conversations."""
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # key -> (response chunks, time stored)
+        self._entries: "OrderedDict[CacheKey, Tuple[List[str], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] > self.ttl_s:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: CacheKey, chunks: List[str]) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (chunks, time.monotonic())
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CachedAgent(BaseAgent):
+    """
+    Wraps any BaseAgent with a context key. Cached responses are streamed back in the chunks the
+    LLM produced them, so TTS chunking is the same as for a live response. Responses of turns that
+    called tools (time, lookups) are never cached.
+    """
+
+    def __init__(self, agent: BaseAgent, cache: ResponseCache):
+        self.agent = agent
+        self.cache = cache
+
+    def __call__(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        return self.astream(stt_result, conversation_id, callback)
+
+    def end_conversation(self, conversation_id: str) -> None:
+        self.agent.end_conversation(conversation_id)
+
+    async def warmup(self) -> None:
+        await self.agent.warmup()
+
+    async def context_key(self, conversation_id: str) -> Optional[str]:
+        return await self.agent.context_key(conversation_id)
+
+    async def record_turn(
+        self, conversation_id: str, transcript: str, response: str
+    ) -> bool:
+        return await self.agent.record_turn(conversation_id, transcript, response)
+
+    async def astream(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        start_time = time.time()
+        context_key = await self.agent.context_key(conversation_id)
+        transcript = normalize_transcript(stt_result.transcript)
+        if context_key is None or not transcript:
+            async for chunk in self.agent(stt_result, conversation_id, callback):
+                yield chunk
+            return
+
+        key = (context_key, transcript)
+        chunks = self.cache.get(key)
+        if chunks is not None:
+            response = "".join(chunks)
+            # Memory holds the turn as if the LLM had answered it
+            await self.agent.record_turn(
+                conversation_id, stt_result.transcript, response
+            )
+            logger.info(
+                f"🤖🗄️ Response cache hit, hit rate {self.cache.hit_rate:.0%} of {self.cache.hits + self.cache.misses}"
+            )
+            first_chunk_time = time.time()
+            for chunk in chunks:
+                yield chunk
+            if callback:
+                callback(
+                    LLMResult(
+                        start_time=start_time,
+                        end_time=time.time(),
+                        first_chunk_time=first_chunk_time,
+                        response=response,
+                        cache_hit=True,
+                    )
+                )
+            return
+
+        result = LLMResult.empty()
+        streamed: List[str] = []
+        async for chunk in self.agent(
+            stt_result, conversation_id, callback=result.update
+        ):
+            streamed.append(chunk)
+            yield chunk
+        # Only complete responses get here, a torn down stream never reaches the cache
+        if result.tool_calls == 0 and result.response:
+            self.cache.put(key, streamed)
+        if callback:
+            callback(result)
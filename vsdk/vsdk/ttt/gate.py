@@ -0,0 +1,106 @@
+"""
+Pause/resume of response generation on barge-in.
+
+The gate sits between the LLM stream and TTS. While the human talks over the agent it stops
+pulling from the LLM, so neither LLM tokens nor TTS characters are produced for a response that
+may be dropped. Audio produced before the pause stays buffered for restream. A short interruption
+resumes generation where it stopped, a long one tears the response down and closes the LLM stream.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, List, Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationGateStats(BaseModel):
+    pauses: int = 0
+    paused_time: float = 0
+    # Long interruption dropped the rest of the response before the LLM finished it
+    torn_down: bool = False
+    llm_finished: bool = False
+    # LLM stream chunks (about one token each) and characters pulled but never sent to TTS
+    withheld_tokens: int = 0
+    withheld_chars: int = 0
+
+
+class GenerationGate:
+    """One per response. Paused and resumed by the orchestrator, the stream goes through it."""
+
+    def __init__(self):
+        self.stats = GenerationGateStats()
+        self._open = asyncio.Event()
+        self._open.set()
+        self._paused_at: Optional[float] = None
+        self._held: List[str] = []
+
+    @property
+    def paused(self) -> bool:
+        return not self._open.is_set()
+
+    def pause(self) -> None:
+        if self.paused or self.stats.llm_finished or self.stats.torn_down:
+            return
+        self.stats.pauses += 1
+        self._paused_at = time.monotonic()
+        self._open.clear()
+        logger.info("🤖⏸️ Generation paused")
+
+    def resume(self) -> None:
+        if not self.paused:
+            return
+        self._add_paused_time()
+        self._open.set()
+        logger.info(f"🤖▶️ Generation resumed, {len(self._held)} held tokens released")
+
+    def tear_down(self) -> None:
+        """Drop the rest of the response, the stream ends and the LLM stream is closed."""
+        if self.stats.torn_down or self.stats.llm_finished:
+            return
+        self._add_paused_time()
+        self.stats.torn_down = True
+        self.stats.withheld_tokens = len(self._held)
+        self.stats.withheld_chars = sum(len(text) for text in self._held)
+        self._held = []
+        self._open.set()
+        logger.info(
+            f"🤖⏹️ Generation torn down after {self.stats.paused_time:.2f}s paused, "
+            f"{self.stats.withheld_tokens} tokens ({self.stats.withheld_chars} characters) never sent to TTS"
+        )
+
+    async def __call__(self, stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        iterator = aiter(stream)
+        try:
+            while await self._wait_open():
+                if self._held:
+                    yield self._held.pop(0)
+                    continue
+                try:
+                    text = await anext(iterator)
+                except StopAsyncIteration:
+                    self.stats.llm_finished = True
+                    return
+                if self.paused:
+                    # Paused while the token was on its way, keep it for resume
+                    self._held.append(text)
+                    continue
+                yield text
+        finally:
+            if self.paused:
+                self.tear_down()
+            aclose = getattr(iterator, "aclose", None)
+            if not self.stats.llm_finished and aclose:
+                await aclose()
+
+    async def _wait_open(self) -> bool:
+        await self._open.wait()
+        return not self.stats.torn_down
+
+    def _add_paused_time(self) -> None:
+        if self._paused_at is not None:
+            self.stats.paused_time += time.monotonic() - self._paused_at
+            self._paused_at = None
@@ -0,0 +1,203 @@
+"""
+First-token deadline with a fallback model.
+
+A provider with a slow first token leaves the caller listening to silence. HedgedAgent starts the
+primary agent and, if no token arrives within the deadline (or the primary fails first), races a
+secondary, usually faster and cheaper, agent. It commits to whichever streams first and cancels the
+other. The agent that did not answer gets the turn recorded, so both memories stay the same.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, List, Optional
+
+from vsdk.stt.base import STTResult
+from vsdk.tasks import aclose_iterator, cancel_and_wait
+from vsdk.ttt.base import BaseAgent, LLMResult
+
+logger = logging.getLogger(__name__)
+
+
+class _Attempt:
+    """
+    Response stream of one agent, iterated by its own task from the start.
+
+    The task owns the agent stream: it pumps the chunks into a queue and closes the stream when it
+    ends, so cancelling and awaiting the task releases the stream and everything it started.
+    """
+
+    def __init__(self, agent: BaseAgent, stt_result: STTResult, conversation_id: str):
+        self.agent = agent
+        self.result = LLMResult.empty()
+        # None when the agent finished without a chunk
+        self.first_chunk: asyncio.Future[Optional[str]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._chunks: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._error: Optional[Exception] = None
+        self.task = asyncio.create_task(
+            self._pump(stt_result, conversation_id),
+            name=f"hedge-{type(agent).__name__}",
+        )
+
+    async def _pump(self, stt_result: STTResult, conversation_id: str) -> None:
+        stream = aiter(
+            self.agent(stt_result, conversation_id=conversation_id, callback=self.result.update)
+        )
+        try:
+            async for chunk in stream:
+                if not self.first_chunk.done():
+                    self.first_chunk.set_result(chunk)
+                else:
+                    self._chunks.put_nowait(chunk)
+            if not self.first_chunk.done():
+                self.first_chunk.set_result(None)
+        except Exception as e:
+            if not self.first_chunk.done():
+                self.first_chunk.set_exception(e)
+            else:
+                self._error = e
+        finally:
+            if not self.first_chunk.done():
+                self.first_chunk.cancel()
+            self._chunks.put_nowait(None)
+            await aclose_iterator(stream)
+
+    async def rest(self) -> AsyncIterator[str]:
+        """Chunks after the first one."""
+        while (chunk := await self._chunks.get()) is not None:
+            yield chunk
+        if self._error:
+            raise self._error
+
+    def failed(self) -> bool:
+        return (
+            self.first_chunk.done()
+            and not self.first_chunk.cancelled()
+            and self.first_chunk.exception() is not None
+        )
+
+    async def close(self) -> None:
+        await cancel_and_wait([self.task])
+        if self.first_chunk.done() and not self.first_chunk.cancelled():
+            # Retrieved so it's not reported as unhandled, failures are logged by the race
+            self.first_chunk.exception()
+
+
+class HedgedAgent(BaseAgent):
+    def __init__(
+        self,
+        primary: BaseAgent,
+        secondary: BaseAgent,
+        first_token_deadline_s: float = 1.0,
+    ):
+        """:param first_token_deadline_s: time the primary gets for its first token alone"""
+        self.primary = primary
+        self.secondary = secondary
+        self.first_token_deadline_s = first_token_deadline_s
+
+    def __call__(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        return self.astream(stt_result, conversation_id, callback)
+
+    def end_conversation(self, conversation_id: str) -> None:
+        self.primary.end_conversation(conversation_id)
+        self.secondary.end_conversation(conversation_id)
+
+    async def warmup(self) -> None:
+        await asyncio.gather(self.primary.warmup(), self.secondary.warmup())
+
+    async def context_key(self, conversation_id: str) -> Optional[str]:
+        return await self.primary.context_key(conversation_id)
+
+    async def record_turn(
+        self, conversation_id: str, transcript: str, response: str
+    ) -> bool:
+        primary = await self.primary.record_turn(conversation_id, transcript, response)
+        secondary = await self.secondary.record_turn(conversation_id, transcript, response)
+        return primary and secondary
+
+    async def astream(
+        self,
+        stt_result: STTResult,
+        conversation_id: str,
+        callback: Optional[Callable[[LLMResult], None]] = None,
+    ) -> AsyncIterator[str]:
+        start_time = time.time()
+        attempts = [_Attempt(self.primary, stt_result, conversation_id)]
+        try:
+            await asyncio.wait(
+                [attempts[0].first_chunk], timeout=self.first_token_deadline_s
+            )
+            if not attempts[0].first_chunk.done() or attempts[0].failed():
+                logger.warning(
+                    f"🤖⏱️ No first token from primary model in {time.time() - start_time:.2f}s, "
+                    "racing secondary model"
+                )
+                attempts.append(_Attempt(self.secondary, stt_result, conversation_id))
+            winner = await self._first_to_stream(attempts)
+            for attempt in attempts:
+                if attempt is not winner:
+                    await attempt.close()
+
+            first_chunk_time = time.time()
+            first_chunk = winner.first_chunk.result()
+            if first_chunk is not None:
+                yield first_chunk
+                async for chunk in winner.rest():
+                    yield chunk
+
+            other = self.secondary if winner.agent is self.primary else self.primary
+            await self._record_turn(
+                other, conversation_id, stt_result.transcript, winner.result.response
+            )
+            if callback:
+                result = winner.result.model_copy(
+                    update={"hedged": len(attempts) > 1, "start_time": start_time}
+                )
+                if not result.first_chunk_time:
+                    result.first_chunk_time = first_chunk_time
+                logger.info(
+                    f"🤖⏱️ Response streamed by {result.model or type(winner.agent).__name__}, "
+                    f"first token after {result.first_chunk_time - start_time:.2f}s"
+                )
+                callback(result)
+        finally:
+            for attempt in attempts:
+                await attempt.close()
+
+    @staticmethod
+    async def _first_to_stream(attempts: List[_Attempt]) -> _Attempt:
+        """First attempt with a chunk (or finished empty). Failed attempts are dropped."""
+        pending = list(attempts)
+        while True:
+            await asyncio.wait(
+                [attempt.first_chunk for attempt in pending],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for attempt in list(pending):
+                if not attempt.first_chunk.done():
+                    continue
+                if not attempt.failed():
+                    return attempt
+                pending.remove(attempt)
+                logger.warning(
+                    f"🤖⏱️ {type(attempt.agent).__name__} failed before its first token: "
+                    f"{attempt.first_chunk.exception()}"
+                )
+                if not pending:
+                    raise attempt.first_chunk.exception()  # type: ignore[misc]
+
+    @staticmethod
+    async def _record_turn(
+        agent: BaseAgent, conversation_id: str, transcript: str, response: str
+    ) -> None:
+        if not await agent.record_turn(conversation_id, transcript, response):
+            logger.warning(
+                f"🤖⏱️ {type(agent).__name__} can't record turns, its memory misses this turn"
+            )
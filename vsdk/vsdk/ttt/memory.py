@@ -0,0 +1,195 @@
+"""
+Bounded conversation memory for LLM agents.
+
+Without a policy every turn sends the whole history to the LLM, so prompt tokens and time to
+first token grow over a long call, and the checkpointer keeps every conversation (and every
+checkpoint of it) in process memory forever.
+
+- the prompt is a sliding window of the last turns, bounded by turn count and tokens
+- turns that fall out of the window can be summarized in the background into the system prompt
+- BoundedMemorySaver keeps only the latest checkpoints of a conversation and evicts idle or
+  least recently used conversations
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from langchain.chat_models.base import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, get_buffer_string
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import MemorySaver
+
+from vsdk.ttt.base import MemoryPolicy
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a phone conversation between a user and an assistant. "
+    "Update the summary with the new messages. Keep facts, names, numbers, requests and "
+    "decisions, drop small talk. Answer only with the summary."
+)
+
+
+def window_start(messages: Sequence[BaseMessage], policy: MemoryPolicy) -> int:
+    """
+    Index of the first message in the prompt window. The window always starts at a human message,
+    so tool calls are never separated from their results, and keeps at least the last turn.
+    """
+    turn_starts = [
+        idx for idx, message in enumerate(messages) if isinstance(message, HumanMessage)
+    ]
+    if not turn_starts:
+        return 0
+    turn_starts = turn_starts[-policy.max_turns :]
+    for start in turn_starts[:-1]:
+        if count_tokens_approximately(messages[start:]) <= policy.max_tokens:
+            return start
+    return turn_starts[-1]
+
+
+class ConversationSummaries:
+    """Running summaries of messages that fell out of the prompt window, one per conversation."""
+
+    def __init__(self, llm: BaseChatModel):
+        self.llm = llm
+        # conversation id -> (summary, count of summarized messages)
+        self.summaries: Dict[str, Tuple[str, int]] = {}
+        self._tasks: Dict[str, asyncio.Task[None]] = {}
+
+    def get(self, conversation_id: str) -> Optional[str]:
+        summary = self.summaries.get(conversation_id)
+        return summary[0] if summary else None
+
+    def update_in_background(
+        self, conversation_id: str, messages: Sequence[BaseMessage], policy: MemoryPolicy
+    ) -> None:
+        """Summarize messages before the window that are not summarized yet, without blocking the turn."""
+        running = self._tasks.get(conversation_id)
+        if running and not running.done():
+            return
+        _, summarized = self.summaries.get(conversation_id, ("", 0))
+        end = window_start(messages, policy)
+        if end <= summarized:
+            return
+        task = asyncio.create_task(
+            self._summarize(conversation_id, list(messages[summarized:end]), end)
+        )
+        self._tasks[conversation_id] = task
+
+    async def wait(self, conversation_id: str) -> None:
+        if task := self._tasks.get(conversation_id):
+            await task
+
+    def forget(self, conversation_id: str) -> None:
+        self.summaries.pop(conversation_id, None)
+        if task := self._tasks.pop(conversation_id, None):
+            task.cancel()
+
+    async def _summarize(
+        self, conversation_id: str, messages: List[BaseMessage], summarized_to: int
+    ) -> None:
+        start = time.time()
+        previous = self.get(conversation_id)
+        try:
+            response = await self.llm.ainvoke(
+                [
+                    SystemMessage(content=SUMMARY_PROMPT),
+                    HumanMessage(
+                        content=f"Summary so far: {previous or 'none'}\n\nNew messages:\n{get_buffer_string(messages)}"
+                    ),
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"🧠 Conversation summary failed: {e}")
+            return
+        self.summaries[conversation_id] = (str(response.content), summarized_to)
+        logger.info(
+            f"🧠 Summarized {len(messages)} messages of {conversation_id} in {time.time() - start:.2f}s"
+        )
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver that keeps the latest `max_checkpoints` checkpoints per conversation and evicts
+    conversations idle longer than `ttl_s`, or the least recently used above `max_threads`.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 3600,
+        max_threads: int = 1000,
+        max_checkpoints: int = 2,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        """:param on_evict: called with the id of every evicted conversation"""
+        super().__init__()
+        self.ttl_s = ttl_s
+        self.max_threads = max_threads
+        self.max_checkpoints = max_checkpoints
+        self.on_evict = on_evict
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        self._touch(thread_id)
+        self._prune_checkpoints(thread_id, config["configurable"]["checkpoint_ns"])
+        self._evict(keep=thread_id)
+        return saved
+
+    def get_tuple(self, config: RunnableConfig):  # type: ignore[override]
+        thread_id = config["configurable"]["thread_id"]
+        if thread_id in self._last_used:
+            self._touch(thread_id)
+        return super().get_tuple(config)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._last_used.pop(thread_id, None)
+        if self.on_evict:
+            self.on_evict(thread_id)
+
+    @property
+    def threads_count(self) -> int:
+        return len(self._last_used)
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict(self, keep: str) -> None:
+        now = time.monotonic()
+        for thread_id, last_used in list(self._last_used.items()):
+            if thread_id == keep:
+                continue
+            if now - last_used > self.ttl_s or len(self._last_used) > self.max_threads:
+                logger.info(f"🧠 Evicting conversation {thread_id} from memory")
+                self.delete_thread(thread_id)
+
+    def _prune_checkpoints(self, thread_id: str, checkpoint_ns: str) -> None:
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints:
+            return
+        # Checkpoint ids are time ordered
+        for checkpoint_id in sorted(checkpoints)[: -self.max_checkpoints]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+        used: Set[Tuple[str, Any]] = set()
+        for checkpoint, _, _ in checkpoints.values():
+            versions = self.serde.loads_typed(checkpoint)["channel_versions"]
+            used.update(versions.items())
+        for key in list(self.blobs):
+            if key[0] == thread_id and key[1] == checkpoint_ns and key[2:] not in used:
+                del self.blobs[key]
@@ -0,0 +1,155 @@
+"""
+Tool execution for agents.
+
+The agent ToolNode already runs the tool calls of one LLM message concurrently. ManagedTool wraps
+a tool with what voice calls need on top:
+
+- a timeout, a slow lookup answers with an error the LLM can talk around instead of silence
+- a TTL result cache for idempotent tools, shared between conversations
+- the latency of every call, reported in LLMResult.tool_timings
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+from vsdk.ttt.base import ToolTiming
+
+logger = logging.getLogger(__name__)
+
+# Key of the timing in ToolMessage.response_metadata
+TOOL_TIMING_KEY = "vsdk_tool_timing"
+
+ToolCacheKey = Tuple[str, str]
+
+
+class ToolPolicy(BaseModel):
+    timeout_s: Optional[float] = None
+    # Only for idempotent tools, same arguments give the same result for this long
+    cache_ttl_s: Optional[float] = None
+
+
+class ToolResultCache:
+    """LRU of tool results, each entry expires after the TTL of its tool."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        # key -> (content, artifact, expires at)
+        self._entries: "OrderedDict[ToolCacheKey, Tuple[Any, Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: ToolCacheKey) -> Optional[Tuple[Any, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() > entry[2]:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, key: ToolCacheKey, content: Any, artifact: Any, ttl_s: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (content, artifact, time.monotonic() + ttl_s)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class ManagedTool(BaseTool):
+    """
+    Tool with a timeout and an optional result cache. Sync tools run in a thread, on timeout the
+    thread is abandoned and finishes in the background.
+    """
+
+    tool: BaseTool
+    policy: ToolPolicy = ToolPolicy()
+    cache: Optional[ToolResultCache] = None
+
+    def __init__(self, tool: BaseTool, **kwargs: Any):
+        super().__init__(
+            tool=tool,
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            **kwargs,
+        )
+
+    def _run(self, *args: Any, **kwargs: Any) -> Any:
+        return self.tool.invoke(kwargs)
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> Any:
+        if not (isinstance(input, dict) and input.get("type") == "tool_call"):
+            return await self.tool.ainvoke(input, config, **kwargs)
+
+        start = time.monotonic()
+        timing = ToolTiming(name=self.name, latency=0)
+        key = (self.name, json.dumps(input["args"], sort_keys=True, default=str))
+        cached = (
+            self.cache.get(key)
+            if self.cache is not None and self.policy.cache_ttl_s
+            else None
+        )
+        if cached is not None:
+            timing.cached = True
+            message = ToolMessage(
+                content=cached[0],
+                artifact=cached[1],
+                name=self.name,
+                tool_call_id=input["id"],
+            )
+        else:
+            try:
+                message = await asyncio.wait_for(
+                    self.tool.ainvoke(input, config, **kwargs),
+                    timeout=self.policy.timeout_s,
+                )
+            except asyncio.TimeoutError:
+                timing.timed_out = True
+                logger.warning(
+                    f"🛠️ Tool {self.name} timed out after {self.policy.timeout_s}s"
+                )
+                message = ToolMessage(
+                    content=f"Error: {self.name} did not answer in time, try again later.",
+                    name=self.name,
+                    tool_call_id=input["id"],
+                    status="error",
+                )
+            if (
+                self.cache is not None
+                and self.policy.cache_ttl_s
+                and isinstance(message, ToolMessage)
+                and message.status == "success"
+            ):
+                self.cache.put(
+                    key, message.content, message.artifact, self.policy.cache_ttl_s
+                )
+
+        timing.latency = time.monotonic() - start
+        if isinstance(message, ToolMessage):
+            message.response_metadata[TOOL_TIMING_KEY] = timing.model_dump()
+        logger.info(
+            f"🛠️ Tool {self.name} answered in {timing.latency:.3f}s"
+            + (" from cache" if timing.cached else "")
+        )
+        return message
+
+
+def tool_timing(message: ToolMessage) -> Optional[ToolTiming]:
+    timing: Optional[Dict[str, Any]] = message.response_metadata.get(TOOL_TIMING_KEY)
+    return ToolTiming(**timing) if timing else None
@@ -0,0 +1,87 @@
+"""
+Speech compaction before batch transcription.
+
+VAD pads detected speech and humans pause mid utterance. Both are silence STT has to upload and
+process, so leading/trailing silence is trimmed down to a small padding and long internal
+pauses are shortened, based on the speech probabilities VAD already computed.
+"""
+
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+
+from vsdk.config import Config
+from vsdk.vad.vad import SpeechProbabilities
+
+logger = logging.getLogger(__name__)
+
+# Same hysteresis as silero VADIterator, a window is silence only well below the speech threshold
+SILENCE_THRESHOLD_OFFSET = 0.15
+
+
+def compact_speech(
+    pcm_audio: bytes,
+    from_sample: int,
+    speech_probs: SpeechProbabilities | None,
+    audio_config: Config.Audio,
+) -> bytes:
+    """
+    :param pcm_audio: speech audio, its first sample is `from_sample` on the VAD timeline
+    :return: audio with edge silence trimmed and internal pauses capped
+    """
+    if speech_probs is None or not speech_probs.probs:
+        return pcm_audio
+
+    bytes_per_sample = audio_config.bytes_per_sample
+    samples_count = len(pcm_audio) // bytes_per_sample
+    silence = _silence_mask(
+        speech_probs,
+        from_sample,
+        samples_count,
+        audio_config.silero_threshold - SILENCE_THRESHOLD_OFFSET,
+    )
+    speech_idx = np.flatnonzero(~silence)
+    if len(speech_idx) == 0:
+        return pcm_audio
+
+    padding = audio_config.stt_compaction_padding_ms * audio_config.sample_rate // 1000
+    max_pause = audio_config.stt_compaction_max_pause_ms * audio_config.sample_rate // 1000
+
+    keep = np.zeros(samples_count, dtype=bool)
+    keep[max(0, speech_idx[0] - padding) : speech_idx[-1] + 1 + padding] = True
+    for start, end in _silent_runs(silence[speech_idx[0] : speech_idx[-1] + 1]):
+        start, end = start + speech_idx[0], end + speech_idx[0]
+        if end - start > max_pause:
+            keep[start + max_pause // 2 : end - (max_pause - max_pause // 2)] = False
+
+    samples = np.frombuffer(
+        pcm_audio[: samples_count * bytes_per_sample], dtype=f"V{bytes_per_sample}"
+    )
+    compacted = samples[keep].tobytes()
+    logger.debug(
+        f"👩🏼🗣️ Compacted speech from {len(pcm_audio)} to {len(compacted)} bytes"
+    )
+    return compacted
+
+
+def _silence_mask(
+    speech_probs: SpeechProbabilities,
+    from_sample: int,
+    samples_count: int,
+    silence_threshold: float,
+) -> NDArray[np.bool_]:
+    """Per sample silence flag. Samples without known probability are treated as speech."""
+    silent_windows = np.array(speech_probs.probs) < silence_threshold
+    window_idx = (
+        np.arange(from_sample, from_sample + samples_count) - speech_probs.start_sample
+    ) // speech_probs.window_size
+    known = (window_idx >= 0) & (window_idx < len(silent_windows))
+    silence = np.zeros(samples_count, dtype=bool)
+    silence[known] = silent_windows[window_idx[known]]
+    return silence
+
+
+def _silent_runs(silence: NDArray[np.bool_]) -> list[tuple[int, int]]:
+    edges = np.diff(np.concatenate([[0], silence.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
@@ -2,21 +2,35 @@
 TODO This class needs refactoring!!!
 """
 
+import copy
 import logging
-from typing import Dict
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
 
 import numpy as np
-import torch
 from numpy.typing import NDArray
 from pydantic import BaseModel
-from silero_vad import VADIterator, load_silero_vad  # type: ignore
-from silero_vad.utils_vad import OnnxWrapper  # type: ignore
-from torch import Tensor
 
 from vsdk.config import Config
 
+if TYPE_CHECKING:
+    from silero_vad.utils_vad import OnnxWrapper  # type: ignore
+    from torch import Tensor
+
 logger = logging.getLogger(__name__)
 
+# Inferences until the TorchScript profiling executor has optimized the model
+WARMUP_INFERENCES = 3
+
+
+class SpeechProbabilities(BaseModel):
+    """Silero speech probability of each window, the first window starts at start_sample."""
+
+    start_sample: int
+    window_size: int
+    probs: List[float]
+
 
 class VADResult(BaseModel):
     start_sample: int
@@ -24,6 +38,8 @@ class VADResult(BaseModel):
     ended: bool
     interruption_duration_ms: int
     sample_rate: int
+    # Filled when speech ended
+    speech_probs: SpeechProbabilities | None = None
 
     def is_shorter_than(self, ms: int) -> bool:
         if self.end_sample is None:
@@ -43,17 +59,101 @@ class VADResult(BaseModel):
         return not self.is_short()
 
 
+class SpeechProbabilityRecorder:
+    """
+    Wraps the silero model to keep speech probabilities of processed windows,
+    as VADIterator only exposes speech start and end.
+    """
+
+    def __init__(self, model: "OnnxWrapper", window_size: int):
+        self.model = model
+        self.window_size = window_size
+        self.probs: List[float] = []
+        self.first_window = 0
+
+    def __call__(self, x: "Tensor", sr: int) -> "Tensor":
+        prob = self.model(x, sr)
+        self.probs.append(prob.item())
+        return prob
+
+    def reset_states(self):
+        self.model.reset_states()
+        self.probs = []
+        self.first_window = 0
+
+    def drop_before(self, sample: int):
+        window = sample // self.window_size
+        if window > self.first_window:
+            del self.probs[: window - self.first_window]
+            self.first_window = window
+
+    def get(self, from_sample: int, to_sample: int) -> SpeechProbabilities:
+        first = max(from_sample // self.window_size, self.first_window)
+        last = -(-to_sample // self.window_size)
+        return SpeechProbabilities(
+            start_sample=first * self.window_size,
+            window_size=self.window_size,
+            probs=self.probs[first - self.first_window : last - self.first_window],
+        )
+
+
+class _ModelTemplate:
+    """
+    Silero model loaded once and already run at the sample rates in use. Every VAD gets a copy:
+    loading the model and its first inferences take over 100ms, copying the warm one a few ms.
+    """
+
+    def __init__(self):
+        self.model: Optional["OnnxWrapper"] = None
+        self.warm_sample_rates: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def copy(self, audio_config: Config.Audio) -> "OnnxWrapper":
+        # Warmup runs in a worker thread, a call may start meanwhile
+        with self._lock:
+            if self.model is None:
+                # torch and silero take seconds to import, only processes running calls need them
+                from silero_vad import load_silero_vad  # type: ignore
+
+                self.model = load_silero_vad()
+            if audio_config.sample_rate not in self.warm_sample_rates:
+                import torch
+
+                silence = torch.zeros(audio_config.silero_samples_size)
+                for _ in range(WARMUP_INFERENCES):
+                    self.model(silence, audio_config.sample_rate)
+                self.model.reset_states()
+                self.warm_sample_rates.add(audio_config.sample_rate)
+            return copy.deepcopy(self.model)
+
+
+_model_template = _ModelTemplate()
+
+
+def preload_vad(audio_config: Config.Audio) -> float:
+    """Load and warm the silero model and run a VAD over silence. Returns seconds it took."""
+    start = time.monotonic()
+    silence = b"\x00" * audio_config.silero_samples_size_bytes * WARMUP_INFERENCES
+    VAD(id="warmup", audio_config=audio_config).silero_iterator(silence)
+    elapsed = time.monotonic() - start
+    logger.info(f"🔥 VAD warmed up at {audio_config.sample_rate}Hz in {elapsed:.2f}s")
+    return elapsed
+
+
 class VAD:
     def __init__(self, id: str, audio_config: Config.Audio):
+        from silero_vad import VADIterator  # type: ignore
+
         logger.debug(f"Creating NEW VADIterator for {id}")
 
         self.id = id
         self.audio_config = audio_config
-        model: OnnxWrapper = (  # type: ignore
-            load_silero_vad()
-        )  # Load the Silero VAD model
+        model = _model_template.copy(audio_config)
+        self.speech_probs = SpeechProbabilityRecorder(
+            model, window_size=self.audio_config.silero_samples_size
+        )
         self.vad_iterator = VADIterator(
-            model=model,
+            model=self.speech_probs,
             threshold=self.audio_config.silero_threshold,
             sampling_rate=self.audio_config.sample_rate,
             min_silence_duration_ms=self.audio_config.silero_min_silence_duration_ms,
@@ -66,11 +166,13 @@ class VAD:
         # So in our case (Twilio sends us 8KHz audio) it will be 256 samples
         # This corresponds to 32ms of data 256 samples for 8000 samples/second (256 samples/8000 sample rate* 1 second * 1000 ms)
         # 256 samples of 16-bit audio is 512 bytes, so this function should ingest only multiply of 512 bytes
+        import torch
+
         window_size = self.audio_config.silero_samples_size
         audio_array: NDArray[np.float32] = (
             np.frombuffer(pcm_audio, dtype=np.int16).astype(np.float32) / 32768.0
         )
-        audio_tensor: Tensor = torch.tensor(audio_array)
+        audio_tensor: "Tensor" = torch.tensor(audio_array)
 
         if len(audio_tensor) % window_size != 0:
             raise ValueError(
@@ -103,6 +205,9 @@ class VAD:
             )
 
             if "end" in self.speech_dict:
+                vad_result.speech_probs = self.speech_probs.get(
+                    self.speech_dict["start"], self.speech_dict["end"]
+                )
                 logger.debug(f"🧠Reset VADIterator for {self.id}")
 
                 self.vad_iterator.reset_states()
@@ -110,4 +215,8 @@ class VAD:
 
             return vad_result
         else:
+            # Keep probabilities only for the lookback VAD may still report as speech start
+            self.speech_probs.drop_before(
+                self.vad_iterator.current_sample - self.audio_config.sample_rate
+            )
             return None
@@ -1,29 +1,44 @@
+import asyncio
 import logging
 import time
 from collections.abc import Callable
-from typing import AsyncIterator
+from typing import AsyncIterator, List, Optional, Sequence, TypeVar
 
 from vsdk.config import Config
 from vsdk.domain import (
     RespondToHumanResult,
 )
-from vsdk.stt.base import BaseSTT
+from vsdk.pipeline import MapStage, Pipeline, Stage
+from vsdk.stt.base import BaseSTT, BaseSTTSession, SpeechSegment, STTResult
+from vsdk.stt.encoders import WavEncoder
+from vsdk.tasks import aclose_iterator
 from vsdk.tts.base import AudioChunk, BaseTTS, TTSResult
 from vsdk.ttt.base import BaseAgent, LLMResult
+from vsdk.ttt.gate import GenerationGate
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class VoiceAgent:
+    """
+    Responds to human speech with a pipeline of stages: STT -> agent -> TTS -> `audio_stages`.
+    Stages overlap, e.g. the agent keeps streaming while TTS synthesizes the previous sentence.
+    """
+
     def __init__(
         self,
         stt: BaseSTT,
         tts: BaseTTS,
         agent: BaseAgent,
+        audio_stages: Sequence[Stage[AudioChunk, AudioChunk]] = (),
     ) -> None:
         self.stt = stt
         self.tts = tts
         self.agent = agent
+        # Extra processing of the synthesized audio, e.g. a resampler or a filter
+        self.audio_stages = list(audio_stages)
 
     async def respond_to_human(
         self,
@@ -31,25 +46,75 @@ class VoiceAgent:
         id: str,
         callback: Callable[[RespondToHumanResult], None],
         audio_config: Config.Audio,
+        stt_session: Optional[BaseSTTSession] = None,
+        speech_segments: Optional[List[SpeechSegment]] = None,
+        generation_gate: Optional[GenerationGate] = None,
     ) -> AsyncIterator[AudioChunk]:
+        """
+        :param stt_session: streaming transcription of the last segment, if STT supports streaming
+        :param speech_segments: utterances of human_speech compacted for batch STT,
+            segments with cached transcript are not transcribed again
+        :param generation_gate: pauses the LLM stream while the human talks over the agent
+        """
         logger.info(
             f"Human speach detected, triggering response flow. PCM buffer duration {len(human_speech) // audio_config.bytes_per_sample / audio_config.sample_rate}s"
         )
 
-        stt_result = await self.stt(human_speech)
-        logger.info("STT results: %s", stt_result.transcript)
-
+        stt_results: List[STTResult] = []
         llm_result = LLMResult.empty()
-        output_llm_stream = self.agent(
-            stt_result,
-            conversation_id=id,
-            callback=lambda x: llm_result.update(x),
-        )
+        tts_result = TTSResult.empty()
+
+        async def transcribe(segments: List[SpeechSegment]) -> STTResult:
+            stt_result = await self._transcribe(
+                segments, human_speech, audio_config, stt_session
+            )
+            logger.info("STT results: %s", stt_result.transcript)
+            stt_results.append(stt_result)
+            return stt_result
 
-        voice_stream = self.tts(output_llm_stream)
+        async def respond(stt_results: AsyncIterator[STTResult]) -> AsyncIterator[str]:
+            async for result in stt_results:
+                output_llm_stream = self.agent(
+                    result,
+                    conversation_id=id,
+                    callback=lambda x: llm_result.update(x),
+                )
+                if generation_gate:
+                    # In the same stage as the agent, a queue in between would keep pulling the LLM
+                    output_llm_stream = generation_gate(output_llm_stream)
+                try:
+                    async for token in output_llm_stream:
+                        yield token
+                finally:
+                    await aclose_iterator(output_llm_stream)
+
+        async def timed(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+            # TTS starts with the first token, not while STT and the LLM are still busy
+            async for token in tokens:
+                if not tts_result.start_time:
+                    tts_result.start_time = time.time()
+                yield token
+
+        def speak(tokens: AsyncIterator[str]) -> AsyncIterator[AudioChunk]:
+            # Timings are measured here, on the audio that leaves the response, also when it's cut short
+            return self.tts(
+                timed(tokens), callback=lambda x: tts_result.update(x, timings=False)
+            )
+
+        pipeline = Pipeline(
+            [
+                MapStage("stt", transcribe, max_queue=1),
+                # A single token in flight: tokens the gate released don't pile up here, to be
+                # voiced after the human started talking over the agent
+                Stage("agent", respond, max_queue=1),
+                Stage("tts", speak, max_queue=16),
+                *self.audio_stages,
+            ]
+        )
+        voice_stream = pipeline(
+            _single(speech_segments or [SpeechSegment(human_speech)])
+        )
 
-        tts_result = TTSResult.empty()
-        tts_result.start_time = time.time()
         first_chunk = True
         try:
             async for chunk in voice_stream:
@@ -58,16 +123,102 @@ class VoiceAgent:
                     tts_result.first_chunk_time = time.time()
                 yield chunk
         except Exception as e:
+            if not stt_results:
+                raise
             logger.error(f"Exception in agent response: {e}", exc_info=True)
+        finally:
+            # Torn down with the response: cancels all stages, closing TTS and the LLM stream
+            await aclose_iterator(voice_stream)
         tts_result.end_time = time.time()
+        if not tts_result.start_time:
+            # No token reached TTS
+            tts_result.start_time = tts_result.end_time
+        if generation_gate:
+            llm_result.generation_pauses = generation_gate.stats.pauses
+            llm_result.generation_paused_time = generation_gate.stats.paused_time
 
         logger.info("LLM reulsts: %s", llm_result)
         logger.info("TTS results: %s", tts_result)
+        logger.info(
+            "Stages: %s",
+            ", ".join(
+                f"{stats.name} depth {stats.max_queue_depth} waited {stats.input_wait_time:.3f}s"
+                for stats in pipeline.stats
+            ),
+        )
 
         callback(
             RespondToHumanResult(
-                stt_result=stt_result,
+                stt_result=stt_results[-1],
                 llm_result=llm_result,
                 tts_result=tts_result,
+                stages=pipeline.stats,
             )
         )
+
+    def end_conversation(self, id: str) -> None:
+        self.agent.end_conversation(id)
+
+    async def warmup(self) -> None:
+        """Warm up STT, TTS and the agent concurrently, a failed warmup is logged, not raised."""
+        results = await asyncio.gather(
+            self.stt.warmup(),
+            self.tts.warmup(),
+            self.agent.warmup(),
+            return_exceptions=True,
+        )
+        for component, result in zip(("STT", "TTS", "agent"), results):
+            if isinstance(result, Exception):
+                logger.warning(f"🔥 {component} warmup failed: {result}")
+
+    async def _transcribe(
+        self,
+        segments: List[SpeechSegment],
+        human_speech: bytes,
+        audio_config: Config.Audio,
+        stt_session: Optional[BaseSTTSession] = None,
+    ) -> STTResult:
+        stt_start_time = time.time()
+        last_segment = segments[-1]
+
+        async def transcribe(segment: SpeechSegment):
+            if segment is last_segment and stt_session:
+                # Speech was streamed to STT while human was speaking, only finalization is left
+                try:
+                    segment.stt_result = await stt_session.finish()
+                finally:
+                    stt_session.cancel()
+            else:
+                segment.stt_result = await self.stt(segment.stt_speech)
+
+        pending = [segment for segment in segments if not segment.is_transcribed()]
+        if stt_session and last_segment not in pending:
+            stt_session.cancel()
+        await asyncio.gather(*(transcribe(segment) for segment in pending))
+
+        results = [segment.stt_result for segment in segments if segment.stt_result]
+        if len(results) == 1:
+            return results[0]
+
+        logger.info(
+            f"Transcribed {len(pending)} of {len(segments)} speech segments, rest was cached"
+        )
+        return STTResult(
+            stt_start_time=stt_start_time,
+            stt_end_time=time.time(),
+            transcript=" ".join(
+                result.transcript for result in results if result.transcript
+            ),
+            # Audio of the whole merged turn, not only of the last segment
+            speech_file=WavEncoder().encode(
+                human_speech,
+                sample_rate=audio_config.sample_rate,
+                channels=audio_config.channels,
+                bytes_per_sample=audio_config.bytes_per_sample,
+            ),
+            speech_file_format="wav",
+        )
+
+
+async def _single(item: T) -> AsyncIterator[T]:
+    yield item